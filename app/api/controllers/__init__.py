@@ -5,3 +5,6 @@ from .user_controller import UserController
 from .meal_controller import MealController
 from .portion_calculation_controller import PortionCalculationController
 from .alerts_controller import AlertsController
+from .report_controller import ReportController
+from .export_controller import ExportController
+from .import_controller import ImportController
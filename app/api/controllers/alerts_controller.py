@@ -19,18 +19,22 @@ class AlertsController:
         self.__ingredient_repository = ingredient_repository
 
     async def get_alerts(self, payload: AlertsQuery) -> AlertListSchema:
-        alters = await self.__alerts_repository.get_alerts(payload=payload)
-        if not alters:
+        page = await self.__alerts_repository.get_alerts(payload=payload)
+        if not page.items:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="There is no alerts available yet.",
             )
         return AlertListSchema(
-            total=len(alters),
+            total=page.total,
             search=payload.search,
             page=payload.page,
             size=payload.size,
-            items=[AlertReadSchema.model_validate(alter) for alter in alters],
+            cursor=payload.cursor,
+            count_mode=payload.count_mode,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            items=[AlertReadSchema.model_validate(alter) for alter in page.items],
         )
 
     async def get_alert_by_id(self, alert_id: int) -> AlertReadSchema:
@@ -12,9 +12,8 @@ from app.api.schemas.users_schemas import (
     UserReadSchemaWithToken,
     RefreshTokenSchema,
 )
-from app.api.tasks import send_warnings
+from app.api.tasks.backends import MailBackend, get_mail_backend
 from app.core.utils.security import jwt_handler, security, JWTHandler, Security
-from app.api.tasks.email import send_verification_email
 
 
 class AuthenticationController:
@@ -27,6 +26,7 @@ class AuthenticationController:
         self.__user_otp_controller = opt_controller
         self.__jwt_handler: JWTHandler = jwt_handler
         self.__security: Security = security
+        self.__mail: MailBackend = get_mail_backend()
 
     async def check_validation(self, payload: UserCreateSchema) -> None:
         if not self.__security.check_password_strength(payload.password):
@@ -51,10 +51,8 @@ class AuthenticationController:
         payload.password = self.__security.hash_password(payload.password)
         res = await self.__user_repository.register_user(payload)
         code = self.__security.generate_otp()
-        await self.__user_otp_controller.create_user_otp(
-            res.id, self.__security.generate_otp()
-        )
-        send_verification_email.delay(res.email, code)
+        await self.__user_otp_controller.create_user_otp(res.id, code)
+        self.__mail.submit("verification", res.email, code)
         return UserReadSchema.model_validate(res)
 
     async def confirm_otp(self, payload: UserConfirmationSchema) -> UserReadSchema:
@@ -82,7 +80,7 @@ class AuthenticationController:
             )
         code = self.__security.generate_otp()
         await self.__user_otp_controller.create_user_otp(user.id, code)
-        send_verification_email.delay(user.email, code)
+        self.__mail.submit("verification", user.email, code)
         return UserReadSchema.model_validate(user)
 
     async def login_user(self, payload: UserLoginSchema) -> UserReadSchemaWithToken:
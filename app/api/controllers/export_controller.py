@@ -0,0 +1,48 @@
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.api.repositories.export_repository import ExportDataset, ExportRepository
+from app.api.schemas.export_schema import ExportQuery
+from app.api.utils.export import csv_chunks, parquet_chunks
+from app.core.databases.postgres import get_session_without_depends
+
+FORMATS = {
+    "csv": (csv_chunks, "text/csv"),
+    "parquet": (parquet_chunks, "application/vnd.apache.parquet"),
+}
+
+
+class ExportController:
+    async def export(
+        self, dataset: ExportDataset, payload: ExportQuery
+    ) -> StreamingResponse:
+        if (
+            payload.date_from is not None
+            and payload.date_to is not None
+            and payload.date_from >= payload.date_to
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must be earlier than date_to.",
+            )
+        chunks, media_type = FORMATS[payload.format]
+
+        async def body():
+            # the request's session is closed before the response streams, so
+            # the export opens its own for as long as the download lasts
+            async with get_session_without_depends() as session:
+                batches = ExportRepository(session).stream(
+                    dataset, payload.date_from, payload.date_to
+                )
+                async for chunk in chunks(ExportRepository.columns(dataset), batches):
+                    yield chunk
+
+        return StreamingResponse(
+            body(),
+            media_type=media_type,
+            headers={
+                "Content-Disposition": (
+                    f'attachment; filename="{dataset}.{payload.format}"'
+                )
+            },
+        )
@@ -0,0 +1,165 @@
+from typing import Type, TypeVar
+
+from fastapi import Depends, HTTPException, status
+from pydantic import BaseModel, ValidationError
+
+from app.api.models import Ingredient, Meal, Unit
+from app.api.repositories import ImportRepository
+from app.api.schemas.import_schemas import (
+    ImportReadSchema,
+    ImportRowError,
+    ImportSchema,
+    IngredientImportRow,
+    MealImportRow,
+    RecipeImportRow,
+    UnitImportRow,
+)
+
+Row = TypeVar("Row", bound=BaseModel)
+
+
+class ImportController:
+    def __init__(self, import_repository: ImportRepository = Depends()):
+        self.__import_repository = import_repository
+
+    @staticmethod
+    def validate_rows(
+        section: str, rows: list[dict], schema: Type[Row], errors: list[ImportRowError]
+    ) -> list[tuple[int, Row]]:
+        valid = []
+        for number, row in enumerate(rows, start=1):
+            try:
+                valid.append((number, schema.model_validate(row)))
+            except ValidationError as error:
+                errors.append(
+                    ImportRowError(
+                        section=section,
+                        row=number,
+                        errors=[
+                            f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}"
+                            for detail in error.errors()
+                        ],
+                    )
+                )
+        return valid
+
+    async def known(self, key, imported: set[str], referenced: set[str]) -> set[str]:
+        # names given in the import itself or already stored, in one lookup
+        stored = await self.__import_repository.get_ids(key, referenced - imported)
+        return imported | set(stored)
+
+    async def import_data(self, payload: ImportSchema) -> ImportReadSchema:
+        errors: list[ImportRowError] = []
+        # a later row for the same unique key replaces an earlier one
+        units = {
+            row.code: row
+            for _, row in self.validate_rows(
+                "units", payload.units, UnitImportRow, errors
+            )
+        }
+        ingredients = {
+            row.name: (number, row)
+            for number, row in self.validate_rows(
+                "ingredients", payload.ingredients, IngredientImportRow, errors
+            )
+        }
+        meals = {
+            row.name: row
+            for _, row in self.validate_rows(
+                "meals", payload.meals, MealImportRow, errors
+            )
+        }
+        recipes = {
+            (row.meal, row.ingredient): (number, row)
+            for number, row in self.validate_rows(
+                "recipes", payload.recipes, RecipeImportRow, errors
+            )
+        }
+
+        unit_codes = await self.known(
+            Unit.code, set(units), {row.unit for _, row in ingredients.values()}
+        )
+        meal_names = await self.known(
+            Meal.name, set(meals), {row.meal for _, row in recipes.values()}
+        )
+        ingredient_names = await self.known(
+            Ingredient.name,
+            set(ingredients),
+            {row.ingredient for _, row in recipes.values()},
+        )
+        for number, row in ingredients.values():
+            if row.unit not in unit_codes:
+                errors.append(
+                    ImportRowError(
+                        section="ingredients",
+                        row=number,
+                        errors=[f"unit: unknown unit code {row.unit!r}"],
+                    )
+                )
+        for number, row in recipes.values():
+            missing = [
+                f"{field}: unknown {field} {name!r}"
+                for field, name, names in (
+                    ("meal", row.meal, meal_names),
+                    ("ingredient", row.ingredient, ingredient_names),
+                )
+                if name not in names
+            ]
+            if missing:
+                errors.append(
+                    ImportRowError(section="recipes", row=number, errors=missing)
+                )
+        if errors:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": "Nothing was imported, some rows are invalid.",
+                    "errors": [
+                        error.model_dump()
+                        for error in sorted(
+                            errors, key=lambda error: (error.section, error.row)
+                        )
+                    ],
+                },
+            )
+
+        repository = self.__import_repository
+        await repository.upsert_units([row.model_dump() for row in units.values()])
+        unit_ids = await repository.get_ids(
+            Unit.code, {row.unit for _, row in ingredients.values()}
+        )
+        await repository.upsert_ingredients(
+            [
+                {
+                    "name": row.name,
+                    "unit_id": unit_ids[row.unit],
+                    "min_threshold": row.min_threshold,
+                }
+                for _, row in ingredients.values()
+            ]
+        )
+        await repository.upsert_meals([row.model_dump() for row in meals.values()])
+        meal_ids = await repository.get_ids(
+            Meal.name, {row.meal for _, row in recipes.values()}
+        )
+        ingredient_ids = await repository.get_ids(
+            Ingredient.name, {row.ingredient for _, row in recipes.values()}
+        )
+        await repository.upsert_recipes(
+            [
+                {
+                    "meal_id": meal_ids[row.meal],
+                    "ingredient_id": ingredient_ids[row.ingredient],
+                    "required_qty": row.required_qty,
+                }
+                for _, row in recipes.values()
+            ]
+        )
+        await repository.commit(refresh_portions=bool(meals or recipes))
+
+        return ImportReadSchema(
+            units=len(units),
+            ingredients=len(ingredients),
+            meals=len(meals),
+            recipes=len(recipes),
+        )
@@ -1,4 +1,8 @@
+from decimal import ROUND_HALF_UP, Decimal
+from typing import AsyncIterator
+
 from fastapi import Depends, HTTPException, status
+from pydantic import ValidationError
 
 from app.api.repositories import IngredientRepository, UnitRepository
 from app.api.schemas.ingredients_schemas import (
@@ -7,6 +11,18 @@ from app.api.schemas.ingredients_schemas import (
     IngredientReadSchema,
     IngredientCreateSchema,
     IngredientUpdateSchema,
+    IngredientStateListSchema,
+    IngredientStateQuery,
+    IngredientStateSchema,
+    ReceiptLineSchema,
+    ReceiptReadSchema,
+    ReceiptSchema,
+)
+from app.api.utils.csv_stream import csv_rows
+from app.api.schemas.transactions_schemas import (
+    IngredientTransactionListSchema,
+    IngredientTransactionQuery,
+    IngredientTransactionReadSchema,
 )
 
 
@@ -22,23 +38,26 @@ class IngredientController:
     async def get_all_ingredients(
         self, payload: IngredientListQuery
     ) -> IngredientListSchema:
-        ingredients = await self.__ingredient_repository.get_all_ingredients(
+        page = await self.__ingredient_repository.get_all_ingredients(
             payload=payload,
         )
-        if not ingredients:
+        if not page.items:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="Ingredients are not available yet",
             )
         return IngredientListSchema(
-            total=len(ingredients),
+            total=page.total,
             page=payload.page,
             size=payload.size,
             items=[
                 IngredientReadSchema.model_validate(ingredient)
-                for ingredient in ingredients
+                for ingredient in page.items
             ],
             search=payload.search,
+            count_mode=payload.count_mode,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
         )
 
     async def get_ingredient(self, ingredient_id: int) -> IngredientReadSchema:
@@ -107,11 +126,107 @@ class IngredientController:
             ingredient_id=ingredient_id,
         )
 
-    async def low_stock_ingredients(self, limit, offset) -> IngredientListSchema:
-        res = await self.__ingredient_repository.low_stock_ingredients(limit, offset)
-        return IngredientListSchema(
-            total=len(res),
-            page=offset,
-            size=limit,
-            items=[IngredientReadSchema.model_validate(r) for r in res],
+    async def get_transactions(
+        self, payload: IngredientTransactionQuery
+    ) -> IngredientTransactionListSchema:
+        if (
+            payload.happened_from is not None
+            and payload.happened_to is not None
+            and payload.happened_from >= payload.happened_to
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="happened_from must be earlier than happened_to.",
+            )
+        page = await self.__ingredient_repository.get_transactions(payload=payload)
+        return IngredientTransactionListSchema(
+            total=page.total,
+            page=payload.page,
+            size=payload.size,
+            count_mode=payload.count_mode,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
+            items=[
+                IngredientTransactionReadSchema.model_validate(transaction)
+                for transaction in page.items
+            ],
+        )
+
+    async def get_ingredient_transactions(
+        self, ingredient_id: int, payload: IngredientTransactionQuery
+    ) -> IngredientTransactionListSchema:
+        await self.get_ingredient(ingredient_id=ingredient_id)
+        return await self.get_transactions(
+            payload.model_copy(update={"ingredient_id": ingredient_id})
         )
+
+    async def get_state(
+        self, payload: IngredientStateQuery
+    ) -> IngredientStateListSchema:
+        state = await self.__ingredient_repository.get_state(at=payload.at)
+        return IngredientStateListSchema(
+            at=state.at,
+            snapshot_at=state.snapshot_at,
+            items=[
+                IngredientStateSchema(
+                    ingredient_id=int(ingredient_id), quantity=int(amount) / 100
+                )
+                for ingredient_id, amount in zip(state.ingredient_ids, state.cents)
+            ],
+        )
+
+    async def receive_stock(self, payload: ReceiptSchema) -> ReceiptReadSchema:
+        # lines of the same ingredient are added up, rounded like the column
+        amounts: dict[int, Decimal] = {}
+        for line in payload.lines:
+            amounts[line.ingredient_id] = amounts.get(
+                line.ingredient_id, Decimal(0)
+            ) + Decimal(str(line.quantity))
+        ingredients = await self.__ingredient_repository.receive_stock(
+            amounts={
+                ingredient_id: amount.quantize(Decimal("0.01"), ROUND_HALF_UP)
+                for ingredient_id, amount in amounts.items()
+            },
+            note=payload.note,
+        )
+        return ReceiptReadSchema(
+            note=payload.note,
+            total_lines=len(payload.lines),
+            items=[
+                IngredientReadSchema.model_validate(ingredient)
+                for ingredient in ingredients
+            ],
+        )
+
+    async def receive_stock_csv(
+        self, chunks: AsyncIterator[bytes], note: str | None = None
+    ) -> ReceiptReadSchema:
+        lines, errors = [], []
+        async for number, row in csv_rows(chunks):
+            try:
+                lines.append(ReceiptLineSchema.model_validate(row))
+            except ValidationError as error:
+                errors.extend(
+                    f"line {number}, {'.'.join(map(str, detail['loc']))}: "
+                    f"{detail['msg']}"
+                    for detail in error.errors()
+                )
+        if errors or not lines:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": "The receipt has invalid lines.",
+                    "errors": errors or ["The receipt has no lines."],
+                },
+            )
+        try:
+            payload = ReceiptSchema(note=note, lines=lines)
+        except ValidationError as error:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": "The receipt is invalid.",
+                    "errors": [detail["msg"] for detail in error.errors()],
+                },
+            )
+        return await self.receive_stock(payload)
@@ -1,9 +1,14 @@
+from collections.abc import Iterable
+
 from fastapi import Depends, HTTPException, status
+from app.api.models import Ingredient, MealIngredient
 from app.api.repositories import MealRepository, IngredientRepository
-from datetime import datetime
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 from app.api.schemas.ingredients_schemas import (
     IngredientReadSchema,
 )
+from app.api.schemas.units_schemas import UnitReadSchema
 from app.api.schemas.meal_schemas import (
     MealListSchema,
     MealReadSchema,
@@ -11,10 +16,16 @@ from app.api.schemas.meal_schemas import (
     MealListQuery,
     MealUpdateSchema,
     MealReadWithIngredientSchema,
+    MealIngredientDetailSchema,
     AddIngredientToMealSchema,
     PortionQty,
     MealLogListSchema,
+    MealLogQuery,
     MealLogReadSchema,
+    MealServeBatchSchema,
+    MealServeBatchReadSchema,
+    MealServedSchema,
+    MealShortfallSchema,
 )
 from app.api.schemas.report_schema import (
     MealLogPortionStats,
@@ -22,7 +33,12 @@ from app.api.schemas.report_schema import (
     PortionByDay,
     PortionByMonth,
     PortionByYear,
+    PortionBreakdown,
+    PortionSeries,
+    PortionSeriesQuery,
+    PortionSeriesSchema,
 )
+from app.core.settings import get_settings
 
 
 class MealController:
@@ -35,18 +51,21 @@ class MealController:
         self.__ingredient_repository = ingredient_repository
 
     async def list_meals(self, payload: MealListQuery) -> MealListSchema:
-        meals = await self.__meal_repository.list_meals(payload=payload)
-        if not meals:
+        page = await self.__meal_repository.list_meals(payload=payload)
+        if not page.items:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="There is no meal available yet.",
             )
         return MealListSchema(
-            items=[MealReadSchema.model_validate(meal) for meal in meals],
-            total=len(meals),
+            items=[MealReadSchema.model_validate(meal) for meal in page.items],
+            total=page.total,
             page=payload.page,
             size=payload.size,
             search=payload.search,
+            count_mode=payload.count_mode,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
         )
 
     async def get_meal(self, meal_id: int) -> MealReadSchema:
@@ -78,21 +97,37 @@ class MealController:
     async def delete_meal(self, meal_id: int) -> None:
         await self.__meal_repository.delete_meal(meal_id=meal_id)
 
-    async def get_meal_ingredients(self, meal_id: int) -> list[IngredientReadSchema]:
-        meal_ingredients = await self.__meal_repository.get_meal_ingredients(meal_id)
-        if not meal_ingredients:
+    @staticmethod
+    def ingredient_details(
+        meal_ingredients: Iterable[tuple[MealIngredient, Ingredient]],
+    ) -> list[MealIngredientDetailSchema]:
+        return [
+            MealIngredientDetailSchema(
+                **IngredientReadSchema.model_validate(ingredient).model_dump(),
+                required_qty=meal_ingredient.required_qty,
+                unit=UnitReadSchema.model_validate(ingredient.unit),
+            )
+            for meal_ingredient, ingredient in meal_ingredients
+        ]
+
+    async def get_meal_ingredients(
+        self, meal_id: int
+    ) -> list[MealIngredientDetailSchema]:
+        meal = await self.__meal_repository.get_meal_with_ingredients(meal_id)
+        if not meal:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Meal not found.",
+            )
+        if not meal.ingredients:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="There is no ingredient available yet for this meal.",
             )
-        return [
-            IngredientReadSchema.model_validate(
-                await self.__ingredient_repository.get_ingredient(
-                    meal_ingredient.ingredient_id
-                )
-            )
-            for meal_ingredient in meal_ingredients
-        ]
+        return self.ingredient_details(
+            (meal_ingredient, meal_ingredient.ingredient)
+            for meal_ingredient in meal.ingredients
+        )
 
     async def add_ingredient_to_meal(
         self, meal_id: int, payload: AddIngredientToMealSchema
@@ -115,17 +150,13 @@ class MealController:
             meal_id=meal_id, payload=payload
         )
 
-        meal_ings = await self.__meal_repository.get_meal_ingredients(meal_id)
+        meal = await self.__meal_repository.get_meal_with_ingredients(meal_id)
         return MealReadWithIngredientSchema(
             **meal.to_dict(),
-            ingredients=[
-                IngredientReadSchema.model_validate(
-                    await self.__ingredient_repository.get_ingredient(
-                        meal_ing.ingredient_id
-                    )
-                )
-                for meal_ing in meal_ings
-            ],
+            ingredients=self.ingredient_details(
+                (meal_ingredient, meal_ingredient.ingredient)
+                for meal_ingredient in meal.ingredients
+            ),
         )
 
     async def remove_ingredient_from_meal(
@@ -144,68 +175,159 @@ class MealController:
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Meal not found.",
             )
-        meal_ingredients = await self.__meal_repository.get_meal_ingredients(meal_id)
+        meal_ingredients = await self.__meal_repository.get_meal_ingredients_with_stock(
+            meal_id, lock=True
+        )
         if not meal_ingredients:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="There is no ingredient available yet for this meal.",
             )
 
-        for meal_ingredient in meal_ingredients:
+        required: dict[int, float] = {}
+        for meal_ingredient, ingredient in meal_ingredients:
             required_amount = payload.portion_qty * meal_ingredient.required_qty
-            ingredient = await self.__ingredient_repository.get_ingredient(
-                meal_ingredient.ingredient_id
-            )
             if required_amount > ingredient.quantity:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Not enough {ingredient.name} in stock.",
                 )
-        for meal_ingredient in meal_ingredients:
-            required_amount = payload.portion_qty * meal_ingredient.required_qty
-            await self.__ingredient_repository.take_stock(
-                meal_ingredient.ingredient_id, required_amount
-            )
+            required[ingredient.id] = required_amount
 
-        await self.__meal_repository.write_meal_logs(
-            meal_id=meal_id, user_id=user_id, portion_qty=payload.portion_qty
+        await self.__meal_repository.serve_meal(
+            meal_id=meal_id,
+            user_id=user_id,
+            portion_qty=payload.portion_qty,
+            required=required,
         )
 
         return MealReadWithIngredientSchema(
             **meal.to_dict(),
-            ingredients=[
-                IngredientReadSchema.model_validate(
-                    await self.__ingredient_repository.get_ingredient(
-                        meal_ingredient.ingredient_id
-                    )
-                )
-                for meal_ingredient in meal_ingredients
-            ],
+            ingredients=self.ingredient_details(meal_ingredients),
         )
 
-    async def log_meal(self, meal_id: int, payload: MealListQuery) -> MealLogListSchema:
-        meal = await self.__meal_repository.get_meal(meal_id)
-        if meal is None:
+    async def serve_meals(
+        self, user_id: int, payload: MealServeBatchSchema
+    ) -> MealServeBatchReadSchema:
+        portions: dict[int, int] = {}
+        for item in payload.items:
+            portions[item.meal_id] = portions.get(item.meal_id, 0) + item.portion_qty
+
+        meals = {
+            meal.id: meal
+            for meal in await self.__meal_repository.get_meals(list(portions))
+        }
+        missing = sorted(set(portions) - set(meals))
+        if missing:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Meal not found.",
+                detail=f"Meals not found: {', '.join(map(str, missing))}.",
             )
 
-        meal_logs = await self.__meal_repository.log_meal(
-            meal_id=meal_id,
-            payload=payload,
+        meal_ingredients = (
+            await self.__meal_repository.get_meals_ingredients_with_stock(
+                list(portions), lock=True
+            )
         )
+        recipes: dict[int, list] = {meal_id: [] for meal_id in portions}
+        usage: dict[int, dict[int, float]] = {meal_id: {} for meal_id in portions}
+        required: dict[int, float] = {}
+        for meal_ingredient, ingredient in meal_ingredients:
+            amount = portions[meal_ingredient.meal_id] * meal_ingredient.required_qty
+            recipes[meal_ingredient.meal_id].append((meal_ingredient, ingredient))
+            usage[meal_ingredient.meal_id][ingredient.id] = amount
+            required[ingredient.id] = required.get(ingredient.id, 0) + amount
+
+        empty = [meals[meal_id].name for meal_id, rows in recipes.items() if not rows]
+        if empty:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"There is no ingredient available yet for: {', '.join(empty)}.",
+            )
+
+        shortfalls = [
+            MealShortfallSchema(
+                meal_id=meal_id,
+                meal_name=meals[meal_id].name,
+                ingredient_id=ingredient.id,
+                ingredient_name=ingredient.name,
+                required_qty=portions[meal_id] * meal_ingredient.required_qty,
+                total_required_qty=required[ingredient.id],
+                available_qty=ingredient.quantity,
+            )
+            for meal_id, rows in recipes.items()
+            for meal_ingredient, ingredient in rows
+            if required[ingredient.id] > ingredient.quantity
+        ]
+        if shortfalls:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail={
+                    "message": "Not enough stock to serve all meals.",
+                    "shortfalls": [shortfall.model_dump() for shortfall in shortfalls],
+                },
+            )
+
+        await self.__meal_repository.serve_meals(
+            user_id=user_id, portions=portions, required=usage
+        )
+        return MealServeBatchReadSchema(
+            total_portions=sum(portions.values()),
+            items=[
+                MealServedSchema(
+                    **meals[meal_id].to_dict(),
+                    portion_qty=portion_qty,
+                    ingredients=self.ingredient_details(recipes[meal_id]),
+                )
+                for meal_id, portion_qty in portions.items()
+            ],
+        )
+
+    async def list_meal_logs(self, payload: MealLogQuery) -> MealLogListSchema:
+        if (
+            payload.served_from is not None
+            and payload.served_to is not None
+            and payload.served_from >= payload.served_to
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="served_from must be earlier than served_to.",
+            )
+        if (
+            payload.min_portions is not None
+            and payload.max_portions is not None
+            and payload.min_portions > payload.max_portions
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="min_portions must not exceed max_portions.",
+            )
+
+        page = await self.__meal_repository.list_meal_logs(payload=payload)
 
         return MealLogListSchema(
-            total=len(meal_logs),
+            total=page.total,
             page=payload.page,
             size=payload.size,
-            search=payload.search,
+            count_mode=payload.count_mode,
+            next_cursor=page.next_cursor,
+            prev_cursor=page.prev_cursor,
             items=[
-                MealLogReadSchema.model_validate(meal_log) for meal_log in meal_logs
+                MealLogReadSchema.model_validate(meal_log) for meal_log in page.items
             ],
         )
 
+    async def log_meal(self, meal_id: int, payload: MealLogQuery) -> MealLogListSchema:
+        meal = await self.__meal_repository.get_meal(meal_id)
+        if meal is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Meal not found.",
+            )
+        return await self.list_meal_logs(
+            payload=payload.model_copy(update={"meal_id": meal_id})
+        )
+
     async def get_meal_log(self, meal_id: int, log_id: int) -> MealLogReadSchema:
         meal = await self.__meal_repository.get_meal(meal_id)
         if meal is None:
@@ -226,30 +348,98 @@ class MealController:
     async def get_meal_log_portion_stats(
         self, payload: MealLogQueryParams
     ) -> MealLogPortionStats:
-
-        day_portion_count, month_portion_count, year_portion_count = (
-            await self.__meal_repository.get_meal_portion_by_time(
-                payload.year, payload.month
-            )
+        totals = await self.__meal_repository.get_meal_portion_by_time(
+            payload.year, payload.month
         )
         return MealLogPortionStats(
-            daily=[
-                PortionByDay(
-                    date=datetime.now(),
-                    total_portions=day_portion_count,
-                )
-            ],
+            daily=(
+                [
+                    PortionByDay(
+                        date=datetime.combine(totals.last_day, time()),
+                        total_portions=totals.last_day_total,
+                    )
+                ]
+                if totals.last_day
+                else []
+            ),
             monthly=[
                 PortionByMonth(
                     month=payload.month,
                     year=payload.year,
-                    total_portions=month_portion_count,
+                    total_portions=totals.month,
                 )
             ],
             yearly=[
                 PortionByYear(
                     year=payload.year,
-                    total_portions=year_portion_count,
+                    total_portions=totals.year,
                 )
             ],
         )
+
+    @staticmethod
+    def utc_bound(day, zone: ZoneInfo) -> datetime:
+        local = datetime.combine(day, time(), tzinfo=zone)
+        return local.astimezone(timezone.utc).replace(tzinfo=None)
+
+    async def get_portion_series(
+        self, payload: PortionSeriesQuery
+    ) -> PortionSeriesSchema:
+        if payload.date_from > payload.date_to:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_from must not be later than date_to.",
+            )
+        name = payload.timezone or get_settings().TIMEZONE
+        try:
+            zone = ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown timezone: {name}.",
+            )
+
+        rows = await self.__meal_repository.get_portion_series(
+            start=self.utc_bound(payload.date_from, zone),
+            end=self.utc_bound(payload.date_to + timedelta(days=1), zone),
+            timezone=name,
+            granularity=payload.granularity,
+            breakdown=payload.breakdown,
+        )
+        series: dict[int | None, PortionSeries] = {None: PortionSeries()}
+        for row in rows:
+            key = row.key if payload.breakdown else None
+            if key not in series:
+                series[key] = PortionBreakdown(**{f"{payload.breakdown}_id": key})
+            # the rolled up columns are NULL, so the set ones give the level
+            entry, total = series[key], int(row.total or 0)
+            level = sum(
+                getattr(row, field, None) is not None
+                for field in ("year", "month", "day")
+            )
+            if level == 0:
+                entry.total_portions = total
+            elif level == 1:
+                entry.yearly.append(
+                    PortionByYear(year=row.year.year, total_portions=total)
+                )
+            elif level == 2:
+                entry.monthly.append(
+                    PortionByMonth(
+                        year=row.month.year,
+                        month=row.month.month,
+                        total_portions=total,
+                    )
+                )
+            else:
+                entry.daily.append(PortionByDay(date=row.day, total_portions=total))
+
+        overall = series.pop(None)
+        return PortionSeriesSchema(
+            **overall.model_dump(),
+            date_from=payload.date_from,
+            date_to=payload.date_to,
+            granularity=payload.granularity,
+            timezone=name,
+            breakdown=list(series.values()),
+        )
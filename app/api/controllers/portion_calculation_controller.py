@@ -1,19 +1,17 @@
-from collections.abc import Sequence
-
+import numpy as np
 from fastapi import Depends, HTTPException, status
-from math import floor
+from fastapi.concurrency import run_in_threadpool
 
-from app.api.repositories import (
-    PortionCalculationRepository,
-    MealRepository,
-    IngredientRepository,
-)
-from app.api.schemas.base import QueryList
-from app.api.schemas.meal_schemas import MealReadSchema, MealListQuery
+from app.api.repositories import MealRepository, PortionCalculationRepository
+from app.api.schemas.meal_schemas import MealReadSchema
 from app.api.schemas.portion_calculation_schema import (
+    MenuPlanReadSchema,
+    MenuPlanSchema,
     PortionCalculationListSchema,
+    PortionCalculationQuery,
     PortionCalculationReadSchema,
 )
+from app.api.utils.menu_planner import InfeasibleMenuError, plan_menu
 
 
 class PortionCalculationController:
@@ -21,72 +19,129 @@ class PortionCalculationController:
         self,
         portion_calculation_repository: PortionCalculationRepository = Depends(),
         meal_repository: MealRepository = Depends(),
-        ingredient_repository: IngredientRepository = Depends(),
     ):
         self.__portion_calculation_repository = portion_calculation_repository
         self.__meal_repository = meal_repository
-        self.__ingredient_repository = ingredient_repository
 
     async def get_portion_count(
-        self, payload: MealListQuery
+        self, payload: PortionCalculationQuery
     ) -> PortionCalculationListSchema:
-        meals = await self.__meal_repository.list_meals(payload=payload)
-        if not meals:
+        portions = await self.__portion_calculation_repository.list_portions(
+            payload=payload
+        )
+        if not portions:
             raise HTTPException(
                 status_code=status.HTTP_200_OK,
                 detail="There is no meal available yet.",
             )
 
-        items = []
-        for meal in meals:
-            meal_ingredients = await self.__meal_repository.get_meal_ingredients(
-                meal.id
-            )
-            possible: float = float("inf")
-            for meal_ingredient in meal_ingredients:
-                ingredient = await self.__ingredient_repository.get_ingredient(
-                    meal_ingredient.ingredient_id
-                )
-                possible = min(
-                    possible, ingredient.quantity / meal_ingredient.required_qty
-                )
-
-            items.append(
-                PortionCalculationReadSchema(
-                    meal=MealReadSchema.model_validate(meal),
-                    portion_count=floor(possible),
-                )
-            )
-
         return PortionCalculationListSchema(
             search=payload.search,
             page=payload.page,
             size=payload.size,
-            total=len(meals),
-            items=items,
+            items=[
+                PortionCalculationReadSchema(
+                    meal=MealReadSchema.model_validate(meal),
+                    portion_count=portion_count,
+                )
+                for meal, portion_count in portions
+            ],
         )
 
-    async def calculate_portions(self, meal_ingredients: Sequence | list) -> int:
-        possible: float = float("inf")
-        for meal_ingredient in meal_ingredients:
-            ingredient = await self.__ingredient_repository.get_ingredient(
-                meal_ingredient.ingredient_id
+    async def calculate_portions(self, meal_id: int) -> int:
+        portion = await self.__portion_calculation_repository.get_portion(meal_id)
+        if portion is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Meal not found.",
             )
-            possible = min(possible, ingredient.quantity / meal_ingredient.required_qty)
-        return floor(possible)
+        return int(portion.portion_count)
 
     async def get_portion_count_by_id(
         self, meal_id: int
     ) -> PortionCalculationReadSchema:
-        meal = await self.__meal_repository.get_meal(meal_id)
-        if meal is None:
+        portion = await self.__portion_calculation_repository.get_portion(meal_id)
+        if portion is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Meal not found.",
             )
-        meal_ingredients = await self.__meal_repository.get_meal_ingredients(meal_id)
-        portion_count = await self.calculate_portions(meal_ingredients)
+        meal, portion_count = portion
 
         return PortionCalculationReadSchema(
             meal=MealReadSchema.model_validate(meal), portion_count=portion_count
         )
+
+    async def plan_menu(self, payload: MenuPlanSchema) -> MenuPlanReadSchema:
+        items = {item.meal_id: item for item in payload.items}
+        meal_ids = list(items)
+        meals = {
+            meal.id: meal for meal in await self.__meal_repository.get_meals(meal_ids)
+        }
+        missing = [meal_id for meal_id in meal_ids if meal_id not in meals]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Meals not found: {', '.join(map(str, missing))}.",
+            )
+
+        rows = await self.__portion_calculation_repository.get_requirements(meal_ids)
+        meal_index = {meal_id: index for index, meal_id in enumerate(meal_ids)}
+        ingredient_index: dict[int, int] = {}
+        for row in rows:
+            ingredient_index.setdefault(row.ingredient_id, len(ingredient_index))
+
+        requirements = np.zeros((len(ingredient_index), len(meal_ids)))
+        stock = np.zeros(len(ingredient_index))
+        if rows:
+            rows_ingredients = [ingredient_index[row.ingredient_id] for row in rows]
+            requirements[
+                rows_ingredients, [meal_index[row.meal_id] for row in rows]
+            ] = [float(row.required_qty) for row in rows]
+            stock[rows_ingredients] = [float(row.quantity) for row in rows]
+
+        empty = [
+            meals[meal_id].name
+            for meal_id in meal_ids
+            if not requirements[:, meal_index[meal_id]].any()
+        ]
+        if empty:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"There is no ingredient available yet for: {', '.join(empty)}.",
+            )
+
+        try:
+            portions = await run_in_threadpool(
+                plan_menu,
+                requirements,
+                stock,
+                np.array([items[meal_id].min_portions for meal_id in meal_ids]),
+                np.array(
+                    [
+                        (
+                            np.nan
+                            if items[meal_id].max_portions is None
+                            else items[meal_id].max_portions
+                        )
+                        for meal_id in meal_ids
+                    ]
+                ),
+                np.array([items[meal_id].ratio for meal_id in meal_ids]),
+            )
+        except InfeasibleMenuError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The requested minimum portions exceed the available stock.",
+            )
+
+        return MenuPlanReadSchema(
+            total_portions=int(portions.sum()),
+            items=[
+                PortionCalculationReadSchema(
+                    meal=MealReadSchema.model_validate(meals[meal_id]),
+                    portion_count=int(portion_count),
+                )
+                for meal_id, portion_count in zip(meal_ids, portions)
+            ],
+        )
@@ -0,0 +1,22 @@
+from fastapi import Depends, HTTPException, status
+
+from app.api.repositories import ReportRepository
+from app.api.schemas.report_schema import ReportQuery, ReportReadSchema
+
+
+class ReportController:
+    def __init__(self, report_repository: ReportRepository = Depends()):
+        self.__report_repository = report_repository
+
+    async def get_reports(self, payload: ReportQuery) -> list[ReportReadSchema]:
+        reports = await self.__report_repository.get_reports(year=payload.year)
+        return [ReportReadSchema.model_validate(report) for report in reports]
+
+    async def get_report(self, year: int, month: int) -> ReportReadSchema:
+        report = await self.__report_repository.get_report(year, month)
+        if report is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Report not found.",
+            )
+        return ReportReadSchema.model_validate(report)
@@ -1,14 +1,19 @@
-from socket import send_fds
-
 from fastapi import Depends, HTTPException, status
 
-from app.api.repositories import UserOtpRepository, UserRepository
+from app.api.repositories import (
+    RedisOtpRepository,
+    UserOtpRepository,
+    UserRepository,
+    get_user_otp_repository,
+)
 
 
 class UserOTPController:
     def __init__(
         self,
-        user_otp_repository: UserOtpRepository = Depends(),
+        user_otp_repository: UserOtpRepository | RedisOtpRepository = Depends(
+            get_user_otp_repository
+        ),
         user_repository: UserRepository = Depends(),
     ):
         self.__user_otp_repository = user_otp_repository
@@ -24,20 +29,19 @@ class UserOTPController:
 
     async def create_user_otp(self, user_id: int, otp_code: int) -> int:
         await self.check_user_exists(user_id)
-        user_otp = await self.__user_otp_repository.create_user_otp(
+        return await self.__user_otp_repository.create_user_otp(
             user_id, otp_code=otp_code
         )
-        return user_otp.otp_code
 
     async def get_user_otp_by_user_id(self, user_id: int) -> int:
         await self.check_user_exists(user_id)
-        user_otp = await self.__user_otp_repository.get_user_otp_by_user_id(user_id)
-        if not user_otp:
+        otp_code = await self.__user_otp_repository.get_user_otp_by_user_id(user_id)
+        if otp_code is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User OTP not found",
             )
-        return user_otp.otp_code
+        return otp_code
 
     async def delete_user_otps(self, user_id: int) -> None:
         await self.check_user_exists(user_id)
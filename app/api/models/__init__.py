@@ -2,8 +2,15 @@ from app.core.models.base import Base, BaseModel
 from app.api.models.units import Unit
 from app.api.models.users import Role, User, UserOTP
 from app.api.models.ingredients import Ingredient
-from app.api.models.transactions import IngredientTransaction
-from app.api.models.meals import Meal, MealIngredient, MealLog
+from app.api.models.transactions import IngredientSnapshot, IngredientTransaction
+from app.api.models.meals import (
+    Meal,
+    MealIngredient,
+    MealLog,
+    MealPortion,
+    MealPortionDaily,
+    MealPortionMonthly,
+)
 from app.api.models.alerts import Alert
 from app.api.models.reports import Report
 
@@ -20,11 +27,15 @@ __all__ = [
     # stock
     "Ingredient",
     "IngredientTransaction",
+    "IngredientSnapshot",
     "Alert",
     # recipes
     "Meal",
     "MealIngredient",
     "MealLog",
+    "MealPortion",
+    "MealPortionDaily",
+    "MealPortionMonthly",
     # analytics
     "Report",
 ]
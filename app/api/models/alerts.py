@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.models.base import BaseModel
@@ -12,8 +12,22 @@ if TYPE_CHECKING:
     from app.api.models import Ingredient
 
 
+LOW_STOCK = "low_stock"
+# rendered literally so that ON CONFLICT can infer the partial index
+OPEN_LOW_STOCK = text(f"NOT is_resolved AND alert_type = '{LOW_STOCK}'")
+
+
 class Alert(BaseModel):
     __tablename__ = "alerts"
+    __table_args__ = (
+        # at most one open low-stock alert per ingredient
+        Index(
+            "uq_alerts_open_low_stock",
+            "ingredient_id",
+            unique=True,
+            postgresql_where=OPEN_LOW_STOCK,
+        ),
+    )
 
     ingredient_id: Mapped[int] = mapped_column(
         ForeignKey("ingredients.id", ondelete="CASCADE"), nullable=False
@@ -26,6 +40,7 @@ class Alert(BaseModel):
     message: Mapped[str] = mapped_column(String(255), nullable=False)
     is_resolved: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     resolved_at: Mapped[datetime | None] = mapped_column(DateTime)
+    notified_at: Mapped[datetime | None] = mapped_column(DateTime)
 
     def update(self, **kwargs) -> "Alert":
         for key, value in kwargs.items():
@@ -1,9 +1,19 @@
 from __future__ import annotations
 
 from typing import TYPE_CHECKING
-from datetime import datetime
-
-from sqlalchemy import ForeignKey, Integer, Numeric, String, DateTime, func
+from datetime import date, datetime
+
+from sqlalchemy import (
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.models.base import BaseModel
@@ -43,6 +53,7 @@ class Meal(BaseModel):
 
 class MealIngredient(BaseModel):
     __tablename__ = "meal_ingredients"
+    __table_args__ = (UniqueConstraint("meal_id", "ingredient_id"),)
 
     meal_id: Mapped[int] = mapped_column(
         ForeignKey("meals.id", ondelete="CASCADE"), nullable=False
@@ -71,6 +82,10 @@ class MealIngredient(BaseModel):
 
 class MealLog(BaseModel):
     __tablename__ = "meal_logs"
+    __table_args__ = (
+        Index("ix_meal_logs_meal_id_served_at", "meal_id", "served_at"),
+        Index("ix_meal_logs_user_id_served_at", "user_id", "served_at"),
+    )
 
     meal_id: Mapped[int] = mapped_column(ForeignKey("meals.id"), nullable=False)
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
@@ -103,3 +118,65 @@ class MealLog(BaseModel):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+
+
+class MealPortion(BaseModel):
+    __tablename__ = "meal_portions"
+
+    meal_id: Mapped[int] = mapped_column(
+        ForeignKey("meals.id", ondelete="CASCADE"), unique=True, nullable=False
+    )
+    portion_count: Mapped[int] = mapped_column(
+        Integer, default=0, nullable=False, index=True
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "meal_id": self.meal_id,
+            "portion_count": self.portion_count,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class MealPortionDaily(BaseModel):
+    __tablename__ = "meal_portion_daily"
+    __table_args__ = (UniqueConstraint("day", "meal_id"),)
+
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    meal_id: Mapped[int] = mapped_column(
+        ForeignKey("meals.id", ondelete="CASCADE"), nullable=False
+    )
+    total_portions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "day": self.day.isoformat(),
+            "meal_id": self.meal_id,
+            "total_portions": self.total_portions,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class MealPortionMonthly(BaseModel):
+    __tablename__ = "meal_portion_monthly"
+    __table_args__ = (UniqueConstraint("month", "meal_id"),)
+
+    month: Mapped[date] = mapped_column(Date, nullable=False)
+    meal_id: Mapped[int] = mapped_column(
+        ForeignKey("meals.id", ondelete="CASCADE"), nullable=False
+    )
+    total_portions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "month": self.month.isoformat(),
+            "meal_id": self.meal_id,
+            "total_portions": self.total_portions,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
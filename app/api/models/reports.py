@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 
-from sqlalchemy import Integer, Numeric
+from sqlalchemy import Integer, Numeric, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.core.models.base import BaseModel
@@ -9,6 +9,7 @@ from app.core.models.base import BaseModel
 
 class Report(BaseModel):
     __tablename__ = "reports"
+    __table_args__ = (UniqueConstraint("report_year", "report_month"),)
 
     report_month: Mapped[int] = mapped_column(Integer, nullable=False)
     report_year: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -4,7 +4,16 @@ from datetime import datetime
 from enum import Enum as PythonEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, Enum
+from sqlalchemy import (
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.models.base import BaseModel
@@ -20,6 +29,15 @@ class TransactionType(str, PythonEnum):
 
 class IngredientTransaction(BaseModel):
     __tablename__ = "ingredient_transactions"
+    __table_args__ = (
+        Index(
+            "ix_ingredient_transactions_ingredient_id_happened_at",
+            "ingredient_id",
+            "happened_at",
+        ),
+        Index("ix_ingredient_transactions_happened_at", "happened_at"),
+        Index("ix_ingredient_transactions_reference_id", "reference_id"),
+    )
 
     ingredient_id: Mapped[int] = mapped_column(
         ForeignKey("ingredients.id", ondelete="CASCADE"), nullable=False
@@ -52,3 +70,22 @@ class IngredientTransaction(BaseModel):
             "created_at": self.created_at.isoformat(),
             "updated_at": self.updated_at.isoformat(),
         }
+
+
+class IngredientSnapshot(BaseModel):
+    __tablename__ = "ingredient_snapshots"
+    __table_args__ = (UniqueConstraint("taken_at", "ingredient_id"),)
+
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    ingredient_id: Mapped[int] = mapped_column(
+        ForeignKey("ingredients.id", ondelete="CASCADE"), nullable=False
+    )
+    quantity: Mapped[float] = mapped_column(Numeric(12, 2), nullable=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "taken_at": self.taken_at.isoformat(),
+            "ingredient_id": self.ingredient_id,
+            "quantity": str(self.quantity),
+        }
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-from datetime import datetime, UTC, timedelta
+from datetime import datetime, timedelta
 from typing import TYPE_CHECKING
 from sqlalchemy import Boolean, DateTime, ForeignKey, String, BigInteger
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.core.models.base import BaseModel
+from app.core.settings import get_settings
 
 if TYPE_CHECKING:
     from app.api.models import MealLog
@@ -83,14 +84,16 @@ class UserOTP(BaseModel):
 
     otp_code: Mapped[int] = mapped_column(BigInteger, nullable=False)
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime, nullable=False, default=datetime.now() + timedelta(minutes=5)
+        DateTime,
+        nullable=False,
+        default=lambda: datetime.now() + timedelta(seconds=get_settings().OTP_TTL),
     )
 
     user: Mapped["User"] = relationship("User", back_populates="otp_codes")
 
     # helpers
     def is_expired(self) -> bool:
-        return datetime.now(UTC) >= self.expires_at
+        return datetime.now() >= self.expires_at
 
     def to_dict(self) -> dict:
         return {
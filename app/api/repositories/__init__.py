@@ -1,7 +1,17 @@
 from .ingredient_repository import IngredientRepository
 from .unit_repository import UnitRepository
 from .user_repository import UserRepository
-from .user_otp_repository import UserOtpRepository
+from .user_otp_repository import (
+    UserOtpRepository,
+    RedisOtpRepository,
+    get_user_otp_repository,
+)
 from .meal_repository import MealRepository
 from .portion_calculation_repository import PortionCalculationRepository
+from .portion_rollup_repository import PortionRollupRepository
 from .alerts_repository import AlertsRepository
+from .report_repository import ReportRepository
+from .export_repository import ExportRepository
+from .transaction_repository import IngredientTransactionRepository
+from .snapshot_repository import StockSnapshotRepository
+from .import_repository import ImportRepository
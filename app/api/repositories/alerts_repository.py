@@ -1,11 +1,20 @@
 from typing import Sequence
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import Row, false, func, literal, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
-from app.core.databases.postgres import get_general_session
-from app.api.models import Alert
+from app.core.databases.postgres import (
+    LOW_STOCK_CHANNEL,
+    get_general_session,
+    notify,
+)
+from app.api.utils.pagination import Page, paginate
+from app.api.utils.search import matches
+from app.api.models import Alert, Ingredient
+from app.api.models.alerts import LOW_STOCK, OPEN_LOW_STOCK
 from app.api.schemas.alerts_schemas import (
     AlertsQuery,
     AlertCreateSchema,
@@ -16,16 +25,23 @@ class AlertsRepository:
     def __init__(self, session: AsyncSession = Depends(get_general_session)):
         self.__session = session
 
-    async def get_alerts(self, payload: AlertsQuery) -> Sequence[Alert]:
-        query = (
-            select(Alert).offset((payload.page - 1) * payload.size).limit(payload.size)
-        )
+    async def get_alerts(self, payload: AlertsQuery) -> Page:
+        query = select(Alert)
         if payload.search:
-            query = query.where(Alert.ingredient.ilike(f"%{payload.search}%"))
+            query = query.where(
+                Alert.ingredient.has(matches(payload.search, Ingredient.name))
+            )
         if payload.is_resolved:
             query = query.filter(Alert.is_resolved == payload.is_resolved)
-        res = await self.__session.execute(query)
-        return res.scalars().all()
+        return await paginate(
+            self.__session,
+            query,
+            keys=(Alert.created_at, Alert.id),
+            size=payload.size,
+            cursor=payload.cursor,
+            page=payload.page,
+            count_mode=payload.count_mode,
+        )
 
     async def get_alert_by_id(self, alert_id: int) -> Alert | None:
         res = await self.__session.execute(select(Alert).where(Alert.id == alert_id))
@@ -60,3 +76,71 @@ class AlertsRepository:
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alert not found.",
         )
+
+    async def raise_low_stock(self, ingredient_ids: Sequence[int]) -> int:
+        # opens an alert for every given ingredient at or below its threshold
+        # that has none open yet; the caller owns the transaction, so the
+        # alert commits together with the stock change that caused it
+        low = select(
+            Ingredient.id,
+            literal(LOW_STOCK),
+            func.concat(
+                Ingredient.name,
+                " is running low: ",
+                Ingredient.quantity,
+                " left, minimum ",
+                Ingredient.min_threshold,
+            ),
+        ).where(
+            Ingredient.id.in_(ingredient_ids),
+            Ingredient.quantity <= Ingredient.min_threshold,
+        )
+        stmt = (
+            insert(Alert)
+            .from_select(["ingredient_id", "alert_type", "message"], low)
+            .on_conflict_do_nothing(
+                index_elements=[Alert.ingredient_id],
+                index_where=OPEN_LOW_STOCK,
+            )
+            .returning(Alert.id)
+        )
+        raised = len((await self.__session.execute(stmt)).all())
+        if raised:
+            await notify(self.__session, LOW_STOCK_CHANNEL)
+        return raised
+
+    async def resolve_restocked(self, ingredient_ids: Sequence[int]) -> None:
+        # a restock closes the open alert so the next crossing raises anew
+        await self.__session.execute(
+            update(Alert)
+            .where(
+                Alert.ingredient_id == Ingredient.id,
+                Alert.ingredient_id.in_(ingredient_ids),
+                Alert.alert_type == LOW_STOCK,
+                Alert.is_resolved == false(),
+                Ingredient.quantity > Ingredient.min_threshold,
+            )
+            .values(is_resolved=True, resolved_at=func.now(), updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+
+    async def claim_undelivered(self) -> Sequence[Row[tuple[int, str]]]:
+        # rows another worker is claiming are skipped rather than waited on;
+        # the claim is only kept if the caller commits
+        pending = (
+            select(Alert.id)
+            .where(
+                Alert.alert_type == LOW_STOCK,
+                Alert.is_resolved == false(),
+                Alert.notified_at.is_(None),
+            )
+            .with_for_update(skip_locked=True)
+        )
+        result = await self.__session.execute(
+            update(Alert)
+            .where(Alert.id.in_(pending), Alert.ingredient_id == Ingredient.id)
+            .values(notified_at=func.now())
+            .returning(Alert.id, Ingredient.name)
+            .execution_options(synchronize_session=False)
+        )
+        return sorted(result.all())
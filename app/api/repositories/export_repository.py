@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import AsyncIterator, Literal, Sequence
+
+from fastapi import Depends
+from sqlalchemy import String, cast
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.api.models import IngredientTransaction, MealLog
+from app.core.databases.postgres import get_general_session
+
+ExportDataset = Literal["meal_logs", "ingredient_transactions"]
+
+# exported columns of each dataset and the timestamp its date filters use
+EXPORTS: dict[str, tuple[list[ColumnElement], ColumnElement]] = {
+    "meal_logs": (
+        [
+            MealLog.id,
+            MealLog.meal_id,
+            MealLog.user_id,
+            MealLog.portion_qty,
+            MealLog.served_at,
+        ],
+        MealLog.served_at,
+    ),
+    "ingredient_transactions": (
+        [
+            IngredientTransaction.id,
+            IngredientTransaction.ingredient_id,
+            IngredientTransaction.quantity,
+            cast(IngredientTransaction.transaction_type, String).label(
+                "transaction_type"
+            ),
+            IngredientTransaction.reference_id,
+            IngredientTransaction.note,
+            IngredientTransaction.happened_at,
+        ],
+        IngredientTransaction.happened_at,
+    ),
+}
+
+
+class ExportRepository:
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+
+    @staticmethod
+    def columns(dataset: ExportDataset) -> list[ColumnElement]:
+        return EXPORTS[dataset][0]
+
+    async def stream(
+        self,
+        dataset: ExportDataset,
+        date_from: datetime | None = None,
+        date_to: datetime | None = None,
+        chunk_size: int = 10_000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        # plain rows from a server-side cursor, ``chunk_size`` at a time, so
+        # memory stays flat however long the history is
+        columns, happened_at = EXPORTS[dataset]
+        query = select(*columns).order_by(columns[0])
+        if date_from is not None:
+            query = query.where(happened_at >= date_from)
+        if date_to is not None:
+            query = query.where(happened_at < date_to)
+        result = await self.__session.stream(
+            query.execution_options(yield_per=chunk_size)
+        )
+        async for rows in result.partitions():
+            yield rows
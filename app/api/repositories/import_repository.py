@@ -0,0 +1,116 @@
+from typing import Iterable, Sequence
+
+from fastapi import Depends
+from sqlalchemy import String, any_, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.api.models import Ingredient, Meal, MealIngredient, Unit
+from app.api.repositories.alerts_repository import AlertsRepository
+from app.api.repositories.portion_calculation_repository import (
+    PortionCalculationRepository,
+)
+from app.core.databases.postgres import get_general_session, notify
+
+
+class ImportRepository:
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+        self.__portions = PortionCalculationRepository(session)
+        self.__alerts = AlertsRepository(session)
+
+    async def get_ids(
+        self, key: InstrumentedAttribute, values: Iterable[str]
+    ) -> dict[str, int]:
+        # a single array parameter, however many values are looked up
+        values = list(values)
+        if not values:
+            return {}
+        result = await self.__session.execute(
+            select(key, key.class_.id).where(
+                key == any_(bindparam("values", values, type_=ARRAY(String)))
+            )
+        )
+        return dict(result.all())
+
+    async def __upsert(
+        self,
+        model,
+        rows: Sequence[dict],
+        keys: list[str],
+        columns: list[str],
+        defaults: dict | None = None,
+    ) -> None:
+        if not rows:
+            return
+        # a column a row leaves out (None) keeps its stored value on update;
+        # excluded.* cannot tell, since it already carries the insert default
+        defaults = defaults or {}
+        given = {
+            column: bindparam(f"given_{column}", type_=model.__table__.c[column].type)
+            for column in columns
+        }
+        stmt = insert(model).values(
+            {
+                column: (
+                    func.coalesce(given[column], defaults[column])
+                    if column in defaults
+                    else given[column]
+                )
+                for column in columns
+            }
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                **{
+                    column: func.coalesce(given[column], getattr(model, column))
+                    for column in columns
+                },
+                "updated_at": func.now(),
+            },
+        )
+        await self.__session.execute(
+            stmt,
+            [
+                {
+                    (f"given_{key}" if key in given else key): value
+                    for key, value in row.items()
+                }
+                for row in rows
+            ],
+        )
+
+    async def upsert_units(self, rows: Sequence[dict]) -> None:
+        await self.__upsert(Unit, rows, ["code"], ["description"])
+
+    async def upsert_ingredients(self, rows: Sequence[dict]) -> None:
+        await self.__upsert(
+            Ingredient,
+            rows,
+            ["name"],
+            ["unit_id", "min_threshold"],
+            defaults={"min_threshold": 0},
+        )
+        if rows:
+            # a new minimum can put stock at or below it, or lift it back above
+            names = [row["name"] for row in rows]
+            ids = list((await self.get_ids(Ingredient.name, names)).values())
+            await self.__alerts.resolve_restocked(ids)
+            await self.__alerts.raise_low_stock(ids)
+            await notify(self.__session)
+
+    async def upsert_meals(self, rows: Sequence[dict]) -> None:
+        await self.__upsert(Meal, rows, ["name"], ["picture"])
+
+    async def upsert_recipes(self, rows: Sequence[dict]) -> None:
+        await self.__upsert(
+            MealIngredient, rows, ["meal_id", "ingredient_id"], ["required_qty"]
+        )
+
+    async def commit(self, refresh_portions: bool) -> None:
+        if refresh_portions:
+            await self.__portions.refresh_portions()
+        await self.__session.commit()
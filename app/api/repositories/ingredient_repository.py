@@ -1,3 +1,6 @@
+from datetime import datetime
+
+from sqlalchemy import Integer, Numeric, column, update, values
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import Depends
@@ -10,13 +13,32 @@ from app.api.schemas.ingredients_schemas import (
     IngredientCreateSchema,
     IngredientUpdateSchema,
 )
-from app.core.databases.postgres import get_general_session
-from app.api.models import Ingredient
+from app.api.repositories.alerts_repository import AlertsRepository
+from app.api.repositories.portion_calculation_repository import (
+    PortionCalculationRepository,
+)
+from app.api.repositories.snapshot_repository import (
+    StockSnapshotRepository,
+    StockState,
+)
+from app.api.repositories.transaction_repository import (
+    IngredientTransactionRepository,
+)
+from app.api.schemas.transactions_schemas import IngredientTransactionQuery
+from app.api.utils.pagination import Page, paginate
+from app.api.utils.search import matches, relevance
+from app.core.databases.postgres import get_general_session, notify
+from app.api.models import Ingredient, Meal, MealIngredient
+from app.api.models.transactions import TransactionType
 
 
 class IngredientRepository:
     def __init__(self, session: AsyncSession = Depends(get_general_session)):
         self.__session = session
+        self.__portions = PortionCalculationRepository(session)
+        self.__ledger = IngredientTransactionRepository(session)
+        self.__snapshots = StockSnapshotRepository(session)
+        self.__alerts = AlertsRepository(session)
 
     async def get_ingredient_by_name(self, name: str) -> Ingredient | None:
         result = await self.__session.execute(
@@ -24,18 +46,23 @@ class IngredientRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_all_ingredients(
-        self, payload: IngredientListQuery
-    ) -> Sequence[Ingredient]:
-        query = (
-            select(Ingredient)
-            .offset((payload.page - 1) * payload.size)
-            .limit(payload.size)
-        )
+    async def get_all_ingredients(self, payload: IngredientListQuery) -> Page:
+        query = select(Ingredient)
+        rank = None
         if payload.search:
-            query = query.where(Ingredient.name.ilike(f"%{payload.search}%"))
-        result = await self.__session.execute(query)
-        return result.scalars().all()
+            query = query.where(matches(payload.search, Ingredient.name))
+            if payload.sort == "relevance":
+                rank = relevance(payload.search, Ingredient.name)
+        return await paginate(
+            self.__session,
+            query,
+            keys=(Ingredient.id,),
+            size=payload.size,
+            cursor=payload.cursor,
+            page=payload.page,
+            count_mode=payload.count_mode,
+            rank=rank,
+        )
 
     async def get_ingredient(self, ingredient_id: int) -> Ingredient | None:
         result = await self.__session.execute(
@@ -48,6 +75,19 @@ class IngredientRepository:
     ) -> Ingredient | None:
         ingredient = Ingredient(**payload.model_dump())
         self.__session.add(ingredient)
+        await self.__session.flush()
+        await notify(self.__session)
+        if payload.quantity:
+            await self.__ledger.record(
+                [
+                    {
+                        "ingredient_id": ingredient.id,
+                        "quantity": payload.quantity,
+                        "transaction_type": TransactionType.IN,
+                        "note": "initial stock",
+                    }
+                ]
+            )
         await self.__session.commit()
         await self.__session.refresh(ingredient)
         return ingredient
@@ -55,11 +95,42 @@ class IngredientRepository:
     async def update_ingredient(
         self, ingredient_id: int, payload: IngredientUpdateSchema
     ) -> Ingredient | None:
-        ingredient = await self.get_ingredient(ingredient_id=ingredient_id)
+        # the row stays locked until commit so the recorded change is exact
+        result = await self.__session.execute(
+            select(Ingredient)
+            .where(Ingredient.id == ingredient_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        ingredient = result.scalar_one_or_none()
         if ingredient:
+            previous = ingredient.quantity
             ingredient.update(**payload.model_dump())
             try:
                 self.__session.add(ingredient)
+                await self.__session.flush()
+                # the stored value, rounded by the column, gives the movement
+                await self.__session.refresh(ingredient, ["quantity"])
+                await notify(self.__session)
+                change = ingredient.quantity - previous
+                if change:
+                    await self.__ledger.record(
+                        [
+                            {
+                                "ingredient_id": ingredient_id,
+                                "quantity": abs(change),
+                                "transaction_type": (
+                                    TransactionType.IN
+                                    if change > 0
+                                    else TransactionType.OUT
+                                ),
+                                "note": "manual edit",
+                            }
+                        ]
+                    )
+                await self.__portions.refresh_portions(ingredient_ids=[ingredient_id])
+                await self.__alerts.resolve_restocked([ingredient_id])
+                await self.__alerts.raise_low_stock([ingredient_id])
                 await self.__session.commit()
                 await self.__session.refresh(ingredient)
                 return ingredient
@@ -72,30 +143,129 @@ class IngredientRepository:
         return None
 
     async def delete_ingredient(self, ingredient_id: int) -> None:
-        ingredient = await self.get_ingredient(ingredient_id=ingredient_id)
+        # the lock keeps a recipe from picking the ingredient up meanwhile
+        result = await self.__session.execute(
+            select(Ingredient).where(Ingredient.id == ingredient_id).with_for_update()
+        )
+        ingredient = result.scalar_one_or_none()
         if ingredient:
+            result = await self.__session.execute(
+                select(Meal.id, Meal.name)
+                .join(MealIngredient, MealIngredient.meal_id == Meal.id)
+                .where(MealIngredient.ingredient_id == ingredient_id)
+                .order_by(Meal.id)
+            )
+            meals = result.all()
+            if meals:
+                await self.__session.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={
+                        "message": "The ingredient is used by meals.",
+                        "meals": [{"id": id, "name": name} for id, name in meals],
+                    },
+                )
             await self.__session.delete(ingredient)
+            await notify(self.__session)
             await self.__session.commit()
 
     async def take_stock(self, ingredient_id: int, quantity: float) -> Ingredient:
-        ingredient = await self.get_ingredient(ingredient_id=ingredient_id)
+        result = await self.__session.execute(
+            update(Ingredient)
+            .where(Ingredient.id == ingredient_id, Ingredient.quantity >= quantity)
+            .values(quantity=Ingredient.quantity - quantity)
+            .returning(Ingredient)
+            .execution_options(populate_existing=True)
+        )
+        ingredient = result.scalar_one_or_none()
         if ingredient is None:
+            await self.__session.rollback()
+            if await self.get_ingredient(ingredient_id=ingredient_id) is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Ingredient not found",
+                )
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Ingredient not found",
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Not enough stock",
             )
-        ingredient.update(quantity=ingredient.quantity - quantity)
-        self.__session.add(ingredient)
+        await self.__ledger.record(
+            [
+                {
+                    "ingredient_id": ingredient_id,
+                    "quantity": quantity,
+                    "transaction_type": TransactionType.OUT,
+                    "note": "take stock",
+                }
+            ]
+        )
+        await self.__portions.refresh_portions(ingredient_ids=[ingredient_id])
+        await self.__alerts.raise_low_stock([ingredient_id])
         await self.__session.commit()
-        await self.__session.refresh(ingredient)
         return ingredient
 
-    async def low_stock_ingredients(self, limit, offset) -> Sequence[Ingredient]:
-        query = (
-            select(Ingredient)
-            .offset((offset - 1) * limit)
-            .limit(limit)
-            .where(Ingredient.quantity <= Ingredient.min_threshold)
+    async def receive_stock(
+        self, amounts: dict[int, float], note: str | None = None
+    ) -> Sequence[Ingredient]:
+        # rows are locked in id order, like serving does, so concurrent
+        # deliveries and serves never deadlock and every increment is kept
+        ingredient_ids = sorted(amounts)
+        result = await self.__session.execute(
+            select(Ingredient.id)
+            .where(Ingredient.id.in_(ingredient_ids))
+            .order_by(Ingredient.id)
+            .with_for_update()
+        )
+        missing = sorted(set(ingredient_ids) - set(result.scalars().all()))
+        if missing:
+            await self.__session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Ingredients not found: {', '.join(map(str, missing))}.",
+            )
+
+        lines = values(
+            column("ingredient_id", Integer),
+            column("amount", Numeric(12, 2)),
+            name="lines",
+        ).data(
+            [
+                (ingredient_id, amounts[ingredient_id])
+                for ingredient_id in ingredient_ids
+            ]
+        )
+        result = await self.__session.execute(
+            update(Ingredient)
+            .where(Ingredient.id == lines.c.ingredient_id)
+            .values(quantity=Ingredient.quantity + lines.c.amount)
+            .returning(Ingredient)
+            .execution_options(synchronize_session="fetch")
+        )
+        ingredients = result.scalars().all()
+        await self.__ledger.record(
+            [
+                {
+                    "ingredient_id": ingredient_id,
+                    "quantity": amounts[ingredient_id],
+                    "transaction_type": TransactionType.IN,
+                    "note": note or "receipt",
+                }
+                for ingredient_id in ingredient_ids
+            ]
+        )
+        await self.__portions.refresh_portions(ingredient_ids=ingredient_ids)
+        await self.__alerts.resolve_restocked(ingredient_ids)
+        await self.__session.commit()
+        return sorted(ingredients, key=lambda ingredient: ingredient.id)
+
+    async def get_transactions(self, payload: IngredientTransactionQuery) -> Page:
+        return await self.__ledger.get_transactions(payload)
+
+    async def get_state(self, at: datetime) -> StockState:
+        return await self.__snapshots.get_state(at)
+
+    async def get_stock_levels(self) -> Sequence[Ingredient]:
+        result = await self.__session.execute(
+            select(Ingredient).order_by(Ingredient.id)
         )
-        result = await self.__session.execute(query)
         return result.scalars().all()
@@ -1,43 +1,101 @@
-from typing import Sequence, Tuple, Optional
+from datetime import datetime
+from typing import Literal, Sequence, Tuple, Optional
 
 from fastapi import Depends, HTTPException, status
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import func, extract, cast, Date
+from sqlalchemy.sql import Select
+from sqlalchemy.orm import joinedload, selectinload
+from sqlalchemy import (
+    column,
+    func,
+    update,
+    values,
+    Integer,
+    Numeric,
+)
 
 from app.api.schemas.meal_schemas import (
     MealListQuery,
+    MealLogQuery,
     MealCreateSchema,
     MealUpdateSchema,
     AddIngredientToMealSchema,
 )
+from app.api.repositories.portion_calculation_repository import (
+    PortionCalculationRepository,
+)
+from app.api.repositories.alerts_repository import AlertsRepository
+from app.api.repositories.portion_rollup_repository import (
+    PortionRollupRepository,
+    PortionTotals,
+)
+from app.api.repositories.transaction_repository import (
+    IngredientTransactionRepository,
+)
+from app.api.utils.pagination import Page, paginate
+from app.api.utils.search import matches, relevance
 from app.core.databases.postgres import get_general_session
-from app.api.models import Meal, MealIngredient, MealLog
+from app.api.models import Ingredient, Meal, MealIngredient, MealLog
+from app.api.models.transactions import TransactionType
 
 
 class MealRepository:
     def __init__(self, session: AsyncSession = Depends(get_general_session)):
         self.__session = session
+        self.__portions = PortionCalculationRepository(session)
+        self.__rollups = PortionRollupRepository(session)
+        self.__ledger = IngredientTransactionRepository(session)
+        self.__alerts = AlertsRepository(session)
 
     async def get_meal_by_name(self, name: str) -> Meal | None:
         query = select(Meal).where(Meal.name == name)
         result = await self.__session.execute(query)
         return result.scalar_one_or_none()
 
-    async def list_meals(self, payload: MealListQuery) -> Sequence[Meal]:
-        query = (
-            select(Meal).offset((payload.page - 1) * payload.size).limit(payload.size)
-        )
+    async def list_meals(self, payload: MealListQuery) -> Page:
+        query = select(Meal)
+        rank = None
         if payload.search:
-            query = query.where(Meal.name.ilike(f"%{payload.search}%"))
-        result = await self.__session.execute(query)
-        return result.scalars().all()
+            query = query.where(matches(payload.search, Meal.name))
+            if payload.sort == "relevance":
+                rank = relevance(payload.search, Meal.name)
+        return await paginate(
+            self.__session,
+            query,
+            keys=(Meal.id,),
+            size=payload.size,
+            cursor=payload.cursor,
+            page=payload.page,
+            count_mode=payload.count_mode,
+            rank=rank,
+        )
 
     async def get_meal(self, meal_id: int) -> Meal | None:
         query = select(Meal).where(Meal.id == meal_id)
         result = await self.__session.execute(query)
         return result.scalar_one_or_none()
 
+    async def get_meal_with_ingredients(self, meal_id: int) -> Meal | None:
+        query = (
+            select(Meal)
+            .where(Meal.id == meal_id)
+            .options(
+                selectinload(Meal.ingredients)
+                .joinedload(MealIngredient.ingredient, innerjoin=True)
+                .joinedload(Ingredient.unit, innerjoin=True)
+            )
+            .execution_options(populate_existing=True)
+        )
+        result = await self.__session.execute(query)
+        return result.scalar_one_or_none()
+
+    async def get_meals(self, meal_ids: Sequence[int]) -> Sequence[Meal]:
+        query = select(Meal).where(Meal.id.in_(meal_ids)).order_by(Meal.id)
+        result = await self.__session.execute(query)
+        return result.scalars().all()
+
     async def create_meal(self, payload: MealCreateSchema) -> Meal:
         existing_meal = await self.get_meal_by_name(name=payload.name)
         if existing_meal:
@@ -47,6 +105,8 @@ class MealRepository:
             )
         meal = Meal(**payload.model_dump())
         self.__session.add(meal)
+        await self.__session.flush()
+        await self.__portions.refresh_portions(meal_ids=[meal.id])
         await self.__session.commit()
         await self.__session.refresh(meal)
         return meal
@@ -97,6 +157,30 @@ class MealRepository:
         result = await self.__session.execute(query)
         return result.scalars().all()
 
+    async def get_meal_ingredients_with_stock(
+        self, meal_id: int, lock: bool = False
+    ) -> Sequence[Row[Tuple[MealIngredient, Ingredient]]]:
+        return await self.get_meals_ingredients_with_stock([meal_id], lock=lock)
+
+    async def get_meals_ingredients_with_stock(
+        self, meal_ids: Sequence[int], lock: bool = False
+    ) -> Sequence[Row[Tuple[MealIngredient, Ingredient]]]:
+        query = (
+            select(MealIngredient, Ingredient)
+            .join(Ingredient, Ingredient.id == MealIngredient.ingredient_id)
+            .where(MealIngredient.meal_id.in_(meal_ids))
+            .order_by(Ingredient.id, MealIngredient.meal_id)
+            .options(joinedload(Ingredient.unit, innerjoin=True))
+        )
+        if lock:
+            # rows are locked in ingredient id order so that concurrent serves
+            # of meals sharing ingredients can never deadlock each other
+            query = query.with_for_update(of=Ingredient).execution_options(
+                populate_existing=True
+            )
+        result = await self.__session.execute(query)
+        return result.all()
+
     async def add_ingredient_to_meal(
         self, meal_id: int, payload: AddIngredientToMealSchema
     ):
@@ -114,6 +198,8 @@ class MealRepository:
             required_qty=payload.required_qty,
         )
         self.__session.add(meal_ingredient)
+        await self.__session.flush()
+        await self.__portions.refresh_portions(meal_ids=[meal_id])
         await self.__session.commit()
         await self.__session.refresh(meal_ingredient)
         return meal_ingredient
@@ -128,6 +214,8 @@ class MealRepository:
                 detail="Meal ingredient not found.",
             )
         await self.__session.delete(meal_ingredient)
+        await self.__session.flush()
+        await self.__portions.refresh_portions(meal_ids=[meal_id])
         await self.__session.commit()
 
     async def write_meal_logs(
@@ -135,57 +223,161 @@ class MealRepository:
     ) -> None:
         meal_log = MealLog(meal_id=meal_id, user_id=user_id, portion_qty=portion_qty)
         self.__session.add(meal_log)
+        await self.__session.flush()
+        await self.__rollups.add_logs([meal_log.id])
         await self.__session.commit()
         await self.__session.refresh(meal_log)
 
-    async def log_meal(self, meal_id: int, payload: MealListQuery) -> Sequence[MealLog]:
-        query = (
-            select(MealLog)
-            .where(MealLog.meal_id == meal_id)
-            .offset((payload.page - 1) * payload.size)
-            .limit(payload.size)
+    async def serve_meal(
+        self,
+        /,
+        *,
+        meal_id: int,
+        user_id: int,
+        portion_qty: int,
+        required: dict[int, float],
+    ) -> Sequence[Ingredient]:
+        return await self.serve_meals(
+            user_id=user_id,
+            portions={meal_id: portion_qty},
+            required={meal_id: required},
+        )
+
+    async def serve_meals(
+        self,
+        /,
+        *,
+        user_id: int,
+        portions: dict[int, int],
+        required: dict[int, dict[int, float]],
+    ) -> Sequence[Ingredient]:
+        # ``required`` maps each meal to the amount of every ingredient it uses
+        totals: dict[int, float] = {}
+        for amounts in required.values():
+            for ingredient_id, amount in amounts.items():
+                totals[ingredient_id] = totals.get(ingredient_id, 0) + amount
+        amounts = values(
+            column("ingredient_id", Integer),
+            column("amount", Numeric(12, 2)),
+            name="amounts",
+        ).data(list(totals.items()))
+        stmt = (
+            update(Ingredient)
+            .where(
+                Ingredient.id == amounts.c.ingredient_id,
+                Ingredient.quantity >= amounts.c.amount,
+            )
+            .values(quantity=Ingredient.quantity - amounts.c.amount)
+            .returning(Ingredient)
+            .execution_options(synchronize_session="fetch")
+        )
+        result = await self.__session.execute(stmt)
+        ingredients = result.scalars().all()
+        if len(ingredients) != len(totals):
+            await self.__session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Stock changed while serving, please try again.",
+            )
+        logs = [
+            MealLog(meal_id=meal_id, user_id=user_id, portion_qty=portion_qty)
+            for meal_id, portion_qty in portions.items()
+        ]
+        self.__session.add_all(logs)
+        await self.__session.flush()
+        await self.__ledger.record(
+            [
+                {
+                    "ingredient_id": ingredient_id,
+                    "quantity": amount,
+                    "transaction_type": TransactionType.OUT,
+                    "reference_id": log.id,
+                    "note": "serve",
+                }
+                for log in logs
+                for ingredient_id, amount in required[log.meal_id].items()
+            ]
+        )
+        await self.__rollups.add_logs([log.id for log in logs])
+        await self.__portions.refresh_portions(ingredient_ids=list(totals))
+        await self.__alerts.raise_low_stock(list(totals))
+        await self.__session.commit()
+        return sorted(ingredients, key=lambda ingredient: ingredient.id)
+
+    @staticmethod
+    def meal_logs_query(payload: MealLogQuery) -> Select:
+        query = select(MealLog)
+        if payload.meal_id is not None:
+            query = query.where(MealLog.meal_id == payload.meal_id)
+        if payload.user_id is not None:
+            query = query.where(MealLog.user_id == payload.user_id)
+        if payload.served_from is not None:
+            query = query.where(MealLog.served_at >= payload.served_from)
+        if payload.served_to is not None:
+            query = query.where(MealLog.served_at < payload.served_to)
+        if payload.min_portions is not None:
+            query = query.where(MealLog.portion_qty >= payload.min_portions)
+        if payload.max_portions is not None:
+            query = query.where(MealLog.portion_qty <= payload.max_portions)
+        return query
+
+    async def list_meal_logs(self, payload: MealLogQuery) -> Page:
+        return await paginate(
+            self.__session,
+            self.meal_logs_query(payload),
+            keys=(MealLog.served_at, MealLog.id),
+            size=payload.size,
+            cursor=payload.cursor,
+            page=payload.page,
+            count_mode=payload.count_mode,
+            descending=payload.order == "desc",
         )
-        if payload.search:
-            query = query.where(MealLog.user_id.ilike(f"%{payload.search}%"))
-        result = await self.__session.execute(query)
-        return result.scalars().all()
 
     async def get_log(self, meal_id: int, log_id) -> MealLog | None:
         query = select(MealLog).where(MealLog.meal_id == meal_id, MealLog.id == log_id)
         result = await self.__session.execute(query)
         return result.scalar_one_or_none()
 
-    async def get_meal_portion_by_time(
-        self, year: int, month: Optional[int] = None
-    ) -> Tuple[int, Optional[int], int]:
-        stmt_year = select(func.coalesce(func.sum(MealLog.portion_qty), 0)).where(
-            extract("year", MealLog.served_at) == year
-        )
-        total_for_year = (await self.__session.execute(stmt_year)).scalar_one()
-
-        total_for_month: Optional[int] = None
-        if month is not None:
-            stmt_month = select(func.coalesce(func.sum(MealLog.portion_qty), 0)).where(
-                extract("year", MealLog.served_at) == year,
-                extract("month", MealLog.served_at) == month,
+    async def get_portion_series(
+        self,
+        start: datetime,
+        end: datetime,
+        timezone: str,
+        granularity: Literal["day", "month", "year"],
+        breakdown: Literal["meal", "user"] | None = None,
+    ) -> Sequence[Row]:
+        # one row per bucket of every level, the coarser levels and the grand
+        # total coming from ROLLUP; with a breakdown the same rows repeat per
+        # meal or user. served_at is stored in UTC and only the range bound
+        # touches it, so the served_at indexes stay usable. The buckets are
+        # local, unlike the UTC months of the rollups the reports read
+        local = func.timezone(timezone, func.timezone("UTC", MealLog.served_at))
+        fields = ("year", "month", "day")
+        buckets = [
+            func.date_trunc(field, local).label(field)
+            for field in fields[: fields.index(granularity) + 1]
+        ]
+        key = {"meal": MealLog.meal_id, "user": MealLog.user_id, None: None}[breakdown]
+        groups = [func.rollup(*buckets)]
+        columns = [*buckets, func.sum(MealLog.portion_qty).label("total")]
+        if key is not None:
+            groups.insert(0, func.rollup(key))
+            columns.insert(0, key.label("key"))
+        query = (
+            select(*columns)
+            .where(MealLog.served_at >= start, MealLog.served_at < end)
+            .group_by(*groups)
+            .order_by(
+                *(
+                    expression.nulls_first()
+                    for expression in ([key] if key is not None else []) + buckets
+                )
             )
-            total_for_month = (await self.__session.execute(stmt_month)).scalar_one()
-
-        stmt_max_date = select(func.max(MealLog.served_at)).where(
-            extract("year", MealLog.served_at) == year
         )
-        if month is not None:
-            stmt_max_date = stmt_max_date.where(
-                extract("month", MealLog.served_at) == month
-            )
-        last_dt = (await self.__session.execute(stmt_max_date)).scalar_one_or_none()
-
-        total_for_last_day = 0
-        if last_dt is not None:
-            last_date = last_dt.date()
-            stmt_day = select(func.coalesce(func.sum(MealLog.portion_qty), 0)).where(
-                cast(MealLog.served_at, Date) == last_date
-            )
-            total_for_last_day = (await self.__session.execute(stmt_day)).scalar_one()
+        result = await self.__session.execute(query)
+        return result.all()
 
-        return total_for_year, total_for_month, total_for_last_day
+    async def get_meal_portion_by_time(
+        self, year: int, month: Optional[int] = None
+    ) -> PortionTotals:
+        return await self.__rollups.get_totals(year, month)
@@ -1,2 +1,125 @@
+from typing import Sequence, Tuple
+
+from fastapi import Depends
+from sqlalchemy import Select, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.api.models import Ingredient, Meal, MealIngredient, MealPortion
+from app.api.schemas.portion_calculation_schema import PortionCalculationQuery
+from app.api.utils.search import matches
+from app.core.databases.postgres import get_general_session
+
+PORTION_COUNT = func.coalesce(MealPortion.portion_count, 0).label("portion_count")
+
+
 class PortionCalculationRepository:
-    pass
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+
+    @staticmethod
+    def possible_portions_query() -> Select:
+        possible = (
+            select(
+                MealIngredient.meal_id,
+                func.min(
+                    func.floor(Ingredient.quantity / MealIngredient.required_qty)
+                ).label("portion_count"),
+            )
+            .join(Ingredient, Ingredient.id == MealIngredient.ingredient_id)
+            .group_by(MealIngredient.meal_id)
+            .subquery("possible")
+        )
+        return select(
+            Meal.id.label("meal_id"),
+            func.coalesce(possible.c.portion_count, 0).label("portion_count"),
+        ).outerjoin(possible, possible.c.meal_id == Meal.id)
+
+    @staticmethod
+    def portions_query() -> Select:
+        # a meal whose row was not stored yet has no portions
+        return select(Meal, PORTION_COUNT).outerjoin(
+            MealPortion, MealPortion.meal_id == Meal.id
+        )
+
+    async def list_portions(
+        self, payload: PortionCalculationQuery
+    ) -> Sequence[Row[Tuple[Meal, int]]]:
+        query = self.portions_query()
+        if payload.search:
+            query = query.where(matches(payload.search, Meal.name))
+        if payload.min_portions is not None:
+            query = query.where(PORTION_COUNT >= payload.min_portions)
+        if payload.max_portions is not None:
+            query = query.where(PORTION_COUNT <= payload.max_portions)
+
+        order_column = {
+            "id": Meal.id,
+            "name": Meal.name,
+            "portion_count": PORTION_COUNT,
+        }[payload.order_by.lstrip("-")]
+        order = (
+            order_column.desc() if payload.order_by.startswith("-") else order_column
+        )
+        query = (
+            query.order_by(order, Meal.id)
+            .offset((payload.page - 1) * payload.size)
+            .limit(payload.size)
+        )
+        result = await self.__session.execute(query)
+        return result.all()
+
+    async def get_portion(self, meal_id: int) -> Row[Tuple[Meal, int]] | None:
+        query = self.portions_query().where(Meal.id == meal_id)
+        result = await self.__session.execute(query)
+        return result.one_or_none()
+
+    async def get_requirements(
+        self, meal_ids: Sequence[int]
+    ) -> Sequence[Row[Tuple[int, int, float, float]]]:
+        query = (
+            select(
+                MealIngredient.meal_id,
+                MealIngredient.ingredient_id,
+                MealIngredient.required_qty,
+                Ingredient.quantity,
+            )
+            .join(Ingredient, Ingredient.id == MealIngredient.ingredient_id)
+            .where(MealIngredient.meal_id.in_(meal_ids))
+        )
+        result = await self.__session.execute(query)
+        return result.all()
+
+    async def refresh_portions(
+        self,
+        ingredient_ids: Sequence[int] | None = None,
+        meal_ids: Sequence[int] | None = None,
+    ) -> None:
+        # recomputes only the meals touched by a stock or recipe change; the
+        # caller owns the transaction so the stored value commits with it
+        query = self.possible_portions_query()
+        if ingredient_ids is not None:
+            query = query.where(
+                Meal.id.in_(
+                    select(MealIngredient.meal_id).where(
+                        MealIngredient.ingredient_id.in_(ingredient_ids)
+                    )
+                )
+            )
+        if meal_ids is not None:
+            query = query.where(Meal.id.in_(meal_ids))
+        stmt = insert(MealPortion).from_select(["meal_id", "portion_count"], query)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[MealPortion.meal_id],
+            set_={
+                "portion_count": stmt.excluded.portion_count,
+                "updated_at": func.now(),
+            },
+        )
+        await self.__session.execute(stmt)
+
+    async def rebuild_portions(self) -> None:
+        await self.refresh_portions()
+        await self.__session.commit()
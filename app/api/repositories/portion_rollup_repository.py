@@ -0,0 +1,115 @@
+from datetime import date
+from typing import NamedTuple, Sequence
+
+from fastapi import Depends
+from sqlalchemy import Date, Select, cast, delete, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.api.models import MealLog, MealPortionDaily, MealPortionMonthly
+from app.core.databases.postgres import get_general_session
+
+# rollup model, its bucket column and the date_trunc field it is keyed on;
+# buckets are UTC days and months, matching the stock ledger the monthly
+# reports compare against, while /report/series buckets in local time
+ROLLUPS = (
+    (MealPortionDaily, MealPortionDaily.day, "day"),
+    (MealPortionMonthly, MealPortionMonthly.month, "month"),
+)
+
+
+class PortionTotals(NamedTuple):
+    year: int
+    month: int | None
+    last_day: date | None
+    last_day_total: int
+
+
+class PortionRollupRepository:
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+
+    @staticmethod
+    def rollup_query(field: str) -> Select:
+        bucket = cast(func.date_trunc(field, MealLog.served_at), Date)
+        return (
+            select(bucket, MealLog.meal_id, func.sum(MealLog.portion_qty))
+            .group_by(bucket, MealLog.meal_id)
+            .order_by(bucket, MealLog.meal_id)
+        )
+
+    async def add_logs(self, log_ids: Sequence[int]) -> None:
+        # adds freshly flushed logs to the totals; the caller owns the
+        # transaction, and rows are upserted in (bucket, meal) order so that
+        # concurrent writers lock them in the same order
+        for model, bucket, field in ROLLUPS:
+            query = self.rollup_query(field).where(MealLog.id.in_(log_ids))
+            stmt = insert(model).from_select(
+                [bucket.key, "meal_id", "total_portions"], query
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[bucket, model.meal_id],
+                set_={
+                    "total_portions": model.total_portions
+                    + stmt.excluded.total_portions,
+                    "updated_at": func.now(),
+                },
+            )
+            await self.__session.execute(stmt)
+
+    async def rebuild(self, since: date | None = None) -> None:
+        # compaction: recomputes the totals from meal_logs, for every period
+        # from the one containing ``since`` on, or for the whole history
+        for model, bucket, field in ROLLUPS:
+            query = self.rollup_query(field)
+            clear = delete(model)
+            if since is not None:
+                start = func.date_trunc(field, since)
+                query = query.where(MealLog.served_at >= start)
+                clear = clear.where(bucket >= cast(start, Date))
+            await self.__session.execute(clear)
+            await self.__session.execute(
+                insert(model).from_select(
+                    [bucket.key, "meal_id", "total_portions"], query
+                )
+            )
+        await self.__session.commit()
+
+    async def get_totals(self, year: int, month: int | None = None) -> PortionTotals:
+        months = select(
+            func.coalesce(func.sum(MealPortionMonthly.total_portions), 0)
+        ).where(
+            MealPortionMonthly.month >= date(year, 1, 1),
+            MealPortionMonthly.month < date(year + 1, 1, 1),
+        )
+        year_total = (await self.__session.execute(months)).scalar_one()
+
+        month_total = None
+        if month is not None:
+            start = date(year, month, 1)
+            month_total = (
+                await self.__session.execute(
+                    months.where(MealPortionMonthly.month == start)
+                )
+            ).scalar_one()
+            end = date(year + month // 12, month % 12 + 1, 1)
+        else:
+            start, end = date(year, 1, 1), date(year + 1, 1, 1)
+
+        last_day = (
+            await self.__session.execute(
+                select(MealPortionDaily.day, func.sum(MealPortionDaily.total_portions))
+                .where(MealPortionDaily.day >= start, MealPortionDaily.day < end)
+                .group_by(MealPortionDaily.day)
+                .order_by(MealPortionDaily.day.desc())
+                .limit(1)
+            )
+        ).first()
+
+        return PortionTotals(
+            year=year_total,
+            month=month_total,
+            last_day=last_day[0] if last_day else None,
+            last_day_total=last_day[1] if last_day else 0,
+        )
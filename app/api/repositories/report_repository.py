@@ -0,0 +1,203 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Sequence
+
+from fastapi import Depends
+from sqlalchemy import exists, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.api.models import (
+    IngredientTransaction,
+    MealIngredient,
+    MealLog,
+    MealPortionMonthly,
+    Report,
+)
+from app.api.models.transactions import TransactionType
+from app.api.repositories.snapshot_repository import StockSnapshotRepository
+from app.core.databases.postgres import get_general_session
+
+# largest magnitude a Numeric(5, 2) column can hold
+MAX_PERCENTAGE = Decimal("999.99")
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def difference_percentage(served: int, possible: int) -> Decimal:
+    # share of the possible portions that were not served
+    if not possible:
+        return Decimal("0.00")
+    percentage = Decimal((possible - served) * 100) / possible
+    return max(
+        -MAX_PERCENTAGE, min(MAX_PERCENTAGE, percentage.quantize(Decimal("0.01")))
+    )
+
+
+class ReportRepository:
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+        self.__snapshots = StockSnapshotRepository(session)
+
+    async def get_reports(self, year: int | None = None) -> Sequence[Report]:
+        query = select(Report).order_by(Report.report_year, Report.report_month)
+        if year is not None:
+            query = query.where(Report.report_year == year)
+        result = await self.__session.execute(query)
+        return result.scalars().all()
+
+    async def get_report(self, year: int, month: int) -> Report | None:
+        result = await self.__session.execute(
+            select(Report).where(
+                Report.report_year == year, Report.report_month == month
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def covered_since(self) -> date | None:
+        # the first month whose stock movements all went through the ledger;
+        # the opening stock of earlier months cannot be replayed
+        start: datetime | None = (
+            await self.__session.execute(
+                select(func.min(IngredientTransaction.happened_at))
+            )
+        ).scalar_one()
+        if start is None:
+            return None
+        month = date(start.year, start.month, 1)
+        served_before = (
+            await self.__session.execute(
+                select(
+                    exists().where(
+                        MealLog.served_at >= month, MealLog.served_at < start
+                    )
+                )
+            )
+        ).scalar_one()
+        return next_month(month) if served_before else month
+
+    async def missing_months(
+        self, until: date, since: date | None = None
+    ) -> list[date]:
+        # complete months before ``until`` that have no stored report yet,
+        # starting with the first month anything was served
+        if since is None:
+            since = (
+                await self.__session.execute(select(func.min(MealPortionMonthly.month)))
+            ).scalar_one()
+            if since is None:
+                return []
+        covered = await self.covered_since()
+        if covered is None:
+            return []
+        since = max(since, covered)
+        stored = {
+            (year, month)
+            for year, month in await self.__session.execute(
+                select(Report.report_year, Report.report_month)
+            )
+        }
+        months, month = [], date(since.year, since.month, 1)
+        while month < date(until.year, until.month, 1):
+            if (month.year, month.month) not in stored:
+                months.append(month)
+            month = next_month(month)
+        return months
+
+    async def served_portions(self, month: date) -> int:
+        result = await self.__session.execute(
+            select(func.coalesce(func.sum(MealPortionMonthly.total_portions), 0)).where(
+                MealPortionMonthly.month == month
+            )
+        )
+        return result.scalar_one()
+
+    async def possible_portions(self, month: date, served: int) -> int:
+        # how many portions the stock on hand during the month, the opening
+        # stock plus what was received, could have produced at the month's
+        # meal mix: the recipes give each ingredient's expected use and the
+        # scarcest ingredient bounds the total. Recipes are not versioned, so
+        # past months are measured with today's
+        expected = dict(
+            (
+                await self.__session.execute(
+                    select(
+                        MealIngredient.ingredient_id,
+                        func.sum(
+                            MealPortionMonthly.total_portions
+                            * MealIngredient.required_qty
+                        ),
+                    )
+                    .join(
+                        MealPortionMonthly,
+                        MealPortionMonthly.meal_id == MealIngredient.meal_id,
+                    )
+                    .where(MealPortionMonthly.month == month)
+                    .group_by(MealIngredient.ingredient_id)
+                )
+            ).all()
+        )
+        expected = {key: value for key, value in expected.items() if value}
+        if not served or not expected:
+            return 0
+        state = await self.__snapshots.get_state(datetime(month.year, month.month, 1))
+        opening = dict(zip(state.ingredient_ids.tolist(), state.cents.tolist()))
+        received = dict(
+            (
+                await self.__session.execute(
+                    select(
+                        IngredientTransaction.ingredient_id,
+                        func.sum(IngredientTransaction.quantity),
+                    )
+                    .where(
+                        IngredientTransaction.transaction_type == TransactionType.IN,
+                        IngredientTransaction.ingredient_id.in_(expected),
+                        IngredientTransaction.happened_at >= month,
+                        IngredientTransaction.happened_at < next_month(month),
+                    )
+                    .group_by(IngredientTransaction.ingredient_id)
+                )
+            ).all()
+        )
+        scale = min(
+            max(
+                Decimal(opening.get(ingredient_id, 0)) / 100
+                + received.get(ingredient_id, 0),
+                0,
+            )
+            / quantity
+            for ingredient_id, quantity in expected.items()
+        )
+        return int(served * scale)
+
+    async def create_report(self, month: date) -> Report | None:
+        served = await self.served_portions(month)
+        possible = await self.possible_portions(month, served)
+        stmt = (
+            insert(Report)
+            .values(
+                report_year=month.year,
+                report_month=month.month,
+                total_served_portions=served,
+                possible_served_portions=possible,
+                difference_percentage=difference_percentage(served, possible),
+            )
+            .on_conflict_do_nothing(index_elements=["report_year", "report_month"])
+            .returning(Report)
+        )
+        report = (await self.__session.execute(stmt)).scalar_one_or_none()
+        await self.__session.commit()
+        return report
+
+    async def generate_reports(
+        self, until: date, since: date | None = None
+    ) -> list[Report]:
+        reports = []
+        for month in await self.missing_months(until, since):
+            report = await self.create_report(month)
+            if report is not None:
+                reports.append(report)
+        return reports
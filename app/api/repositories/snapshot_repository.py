@@ -0,0 +1,107 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import NamedTuple
+
+import numpy as np
+from fastapi import Depends
+from sqlalchemy import BigInteger, Select, case, cast, func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.api.models import Ingredient, IngredientSnapshot, IngredientTransaction
+from app.api.models.transactions import TransactionType
+from app.api.utils.stock import replay
+from app.core.databases.postgres import get_general_session
+
+
+def cents(quantity):
+    return cast(func.round(quantity * 100), BigInteger)
+
+
+class StockState(NamedTuple):
+    at: datetime
+    snapshot_at: datetime | None
+    ingredient_ids: np.ndarray
+    cents: np.ndarray
+
+
+class StockSnapshotRepository:
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+
+    async def __fetch(self, query: Select) -> np.ndarray:
+        rows = (await self.__session.execute(query)).all()
+        return np.array(rows, dtype=np.int64).reshape(-1, 2)
+
+    async def snapshot(self, taken_at: datetime) -> np.ndarray:
+        return await self.__fetch(
+            select(
+                IngredientSnapshot.ingredient_id, cents(IngredientSnapshot.quantity)
+            ).where(IngredientSnapshot.taken_at == taken_at)
+        )
+
+    async def current_stock(self) -> np.ndarray:
+        return await self.__fetch(select(Ingredient.id, cents(Ingredient.quantity)))
+
+    async def ledger(self, start: datetime, end: datetime | None = None) -> np.ndarray:
+        signed = case(
+            (
+                IngredientTransaction.transaction_type == TransactionType.IN,
+                cents(IngredientTransaction.quantity),
+            ),
+            else_=-cents(IngredientTransaction.quantity),
+        )
+        query = select(IngredientTransaction.ingredient_id, signed).where(
+            IngredientTransaction.happened_at >= start
+        )
+        if end is not None:
+            query = query.where(IngredientTransaction.happened_at < end)
+        return await self.__fetch(query)
+
+    async def get_state(self, at: datetime) -> StockState:
+        # starts from the nearest snapshot and replays only the ledger between
+        # it and ``at``: forwards from an earlier one, backwards from a later
+        # one, or backwards from the live stock when there is none
+        before = (
+            await self.__session.execute(
+                select(func.max(IngredientSnapshot.taken_at)).where(
+                    IngredientSnapshot.taken_at <= at
+                )
+            )
+        ).scalar_one()
+        if before is not None:
+            ids, stock = replay(
+                await self.snapshot(before), await self.ledger(before, at)
+            )
+            return StockState(at, before, ids, stock)
+
+        after = (
+            await self.__session.execute(
+                select(func.min(IngredientSnapshot.taken_at)).where(
+                    IngredientSnapshot.taken_at > at
+                )
+            )
+        ).scalar_one()
+        base = await (self.snapshot(after) if after else self.current_stock())
+        ids, stock = replay(base, await self.ledger(at, after), sign=-1)
+        return StockState(at, after, ids, stock)
+
+    async def take_snapshot(self, taken_at: datetime) -> int:
+        state = await self.get_state(taken_at)
+        if len(state.ingredient_ids):
+            await self.__session.execute(
+                insert(IngredientSnapshot).on_conflict_do_nothing(
+                    index_elements=["taken_at", "ingredient_id"]
+                ),
+                [
+                    {
+                        "taken_at": taken_at,
+                        "ingredient_id": int(ingredient_id),
+                        "quantity": Decimal(int(amount)) / 100,
+                    }
+                    for ingredient_id, amount in zip(state.ingredient_ids, state.cents)
+                ],
+            )
+        await self.__session.commit()
+        return len(state.ingredient_ids)
@@ -0,0 +1,58 @@
+from typing import Sequence
+
+from fastapi import Depends
+from sqlalchemy import Select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.api.models import IngredientTransaction
+from app.api.schemas.transactions_schemas import IngredientTransactionQuery
+from app.api.utils.pagination import Page, paginate
+from app.core.databases.postgres import get_general_session, notify
+
+
+class IngredientTransactionRepository:
+    def __init__(self, session: AsyncSession = Depends(get_general_session)):
+        self.__session = session
+
+    async def record(self, entries: Sequence[dict]) -> None:
+        # one multi-row INSERT for every movement of a change; the caller owns
+        # the transaction so the ledger commits together with the stock
+        if entries:
+            await self.__session.execute(insert(IngredientTransaction).values(entries))
+            await notify(self.__session)
+
+    @staticmethod
+    def transactions_query(payload: IngredientTransactionQuery) -> Select:
+        query = select(IngredientTransaction)
+        if payload.ingredient_id is not None:
+            query = query.where(
+                IngredientTransaction.ingredient_id == payload.ingredient_id
+            )
+        if payload.transaction_type is not None:
+            query = query.where(
+                IngredientTransaction.transaction_type == payload.transaction_type
+            )
+        if payload.reference_id is not None:
+            query = query.where(
+                IngredientTransaction.reference_id == payload.reference_id
+            )
+        if payload.happened_from is not None:
+            query = query.where(
+                IngredientTransaction.happened_at >= payload.happened_from
+            )
+        if payload.happened_to is not None:
+            query = query.where(IngredientTransaction.happened_at < payload.happened_to)
+        return query
+
+    async def get_transactions(self, payload: IngredientTransactionQuery) -> Page:
+        return await paginate(
+            self.__session,
+            self.transactions_query(payload),
+            keys=(IngredientTransaction.happened_at, IngredientTransaction.id),
+            size=payload.size,
+            cursor=payload.cursor,
+            page=payload.page,
+            count_mode=payload.count_mode,
+            descending=payload.order == "desc",
+        )
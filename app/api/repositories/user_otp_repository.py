@@ -1,49 +1,164 @@
+from datetime import datetime
+from typing import AsyncGenerator
+
 from fastapi import Depends, HTTPException, status
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+from sqlalchemy import delete, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 
 from app.api.models import UserOTP
 from app.core.databases.postgres import get_general_session
+from app.core.databases.redis import acquire_redis, get_redis
+from app.core.settings import get_settings, Settings
+
+settings: Settings = get_settings()
+
+
+def otp_not_found() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="User OTP not found",
+    )
+
+
+def invalid_otp() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid OTP code",
+    )
 
 
 class UserOtpRepository:
+    """Keeps codes as user_otp rows; the fallback when Redis is not used."""
+
     def __init__(self, session: AsyncSession = Depends(get_general_session)):
         self.__session = session
 
-    async def get_user_otp_by_user_id(self, user_id: int) -> UserOTP | None:
+    async def get_user_otp_by_user_id(self, user_id: int) -> int | None:
         query = await self.__session.execute(
-            select(UserOTP).where(UserOTP.user_id == user_id)
+            select(UserOTP.otp_code).where(
+                UserOTP.user_id == user_id, UserOTP.expires_at > datetime.now()
+            )
         )
-        return query.scalar_one_or_none()
+        return query.scalars().first()
 
     async def delete_user_otps(self, user_id: int) -> None:
-        query = await self.__session.execute(
-            select(UserOTP).where(UserOTP.user_id == user_id)
-        )
-        user_otps = query.scalars().all()
-        for user_otp in user_otps:
-            await self.__session.delete(user_otp)
+        await self.__session.execute(delete(UserOTP).where(UserOTP.user_id == user_id))
         await self.__session.commit()
 
-    async def create_user_otp(self, user_id: int, otp_code: int) -> UserOTP:
-        await self.delete_user_otps(user_id=user_id)
-        user_otp = UserOTP(user_id=user_id, otp_code=otp_code)
-        self.__session.add(user_otp)
+    async def create_user_otp(self, user_id: int, otp_code: int) -> int:
+        # replacing the previous code and adding the new one is one commit
+        await self.__session.execute(delete(UserOTP).where(UserOTP.user_id == user_id))
+        self.__session.add(UserOTP(user_id=user_id, otp_code=otp_code))
         await self.__session.commit()
-        await self.__session.refresh(user_otp)
-        return user_otp
+        return otp_code
 
     async def check_user_otp(self, user_id: int, otp_code: int) -> bool:
-        user_otp = await self.get_user_otp_by_user_id(user_id)
-        if not user_otp:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User OTP not found",
+        # deleting the matching code is what uses it, so it works only once
+        used = await self.__session.execute(
+            delete(UserOTP)
+            .where(
+                UserOTP.user_id == user_id,
+                UserOTP.otp_code == otp_code,
+                UserOTP.expires_at > datetime.now(),
             )
-        if user_otp.otp_code != otp_code:
+            .returning(UserOTP.id)
+        )
+        if used.first() is not None:
+            await self.__session.commit()
+            return True
+        pending = await self.__session.scalar(
+            select(
+                exists().where(
+                    UserOTP.user_id == user_id, UserOTP.expires_at > datetime.now()
+                )
+            )
+        )
+        if not pending:
+            raise otp_not_found()
+        raise invalid_otp()
+
+
+class RedisOtpRepository:
+    """Keeps codes in Redis under a TTL, with per-user rate limits.
+
+    A code is checked and deleted in one WATCH/MULTI transaction, and only
+    when it matches, so it can be used once and a wrong guess never hides
+    it from a right one. Wrong guesses count towards the attempt limit,
+    which burns the code.
+    """
+
+    def __init__(self, redis: Redis = Depends(get_redis)):
+        self.__redis = redis
+
+    @staticmethod
+    def key(user_id: int, kind: str = "code") -> str:
+        return f"otp:{kind}:{user_id}"
+
+    async def __count(self, key: str, window: int) -> int:
+        # the window starts with the first hit and is never extended
+        async with self.__redis.pipeline(transaction=True) as pipe:
+            count, _ = await pipe.incr(key).expire(key, window, nx=True).execute()
+        return count
+
+    async def get_user_otp_by_user_id(self, user_id: int) -> int | None:
+        value = await self.__redis.get(self.key(user_id))
+        return int(value) if value else None
+
+    async def delete_user_otps(self, user_id: int) -> None:
+        await self.__redis.delete(self.key(user_id), self.key(user_id, "attempts"))
+
+    async def create_user_otp(self, user_id: int, otp_code: int) -> int:
+        sent = await self.__count(self.key(user_id, "sent"), settings.OTP_SEND_WINDOW)
+        if sent > settings.OTP_SEND_LIMIT:
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid OTP code",
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many OTP requests, try again later",
             )
-        await self.delete_user_otps(user_id=user_id)
+        async with self.__redis.pipeline(transaction=True) as pipe:
+            await (
+                pipe.set(self.key(user_id), otp_code, ex=settings.OTP_TTL)
+                .delete(self.key(user_id, "attempts"))
+                .execute()
+            )
+        return otp_code
+
+    async def check_user_otp(self, user_id: int, otp_code: int) -> bool:
+        code_key, attempts_key = self.key(user_id), self.key(user_id, "attempts")
+        async with self.__redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(code_key, attempts_key)
+                    code = await pipe.get(code_key)
+                    if code is None:
+                        raise otp_not_found()
+                    matches = int(code) == otp_code
+                    attempts = int(await pipe.get(attempts_key) or 0) + 1
+                    pipe.multi()
+                    if matches:
+                        pipe.delete(code_key, attempts_key)
+                    else:
+                        pipe.incr(attempts_key)
+                        pipe.expire(attempts_key, settings.OTP_TTL, nx=True)
+                        if attempts >= settings.OTP_ATTEMPT_LIMIT:
+                            pipe.delete(code_key)
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    # the code or its attempts changed meanwhile: check again
+                    continue
+        if not matches:
+            raise invalid_otp()
         return True
+
+
+async def get_user_otp_repository(
+    session: AsyncSession = Depends(get_general_session),
+) -> AsyncGenerator[UserOtpRepository | RedisOtpRepository, None]:
+    if settings.OTP_BACKEND == "postgres":
+        yield UserOtpRepository(session)
+        return
+    async with acquire_redis() as redis:
+        yield RedisOtpRepository(redis)
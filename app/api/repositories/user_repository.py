@@ -10,6 +10,8 @@ from app.api.schemas.users_schemas import (
     UserListQuery,
     UserUpdateSchema,
 )
+from app.api.utils.pagination import Page, paginate
+from app.api.utils.search import matches, relevance
 from app.core.databases.postgres import get_general_session
 
 
@@ -49,14 +51,25 @@ class UserRepository:
         await self.__session.refresh(user)
         return user
 
-    async def get_all_users(self, payload: UserListQuery) -> Sequence[User]:
-        query = (
-            select(User).offset((payload.page - 1) * payload.size).limit(payload.size)
-        )
+    async def get_all_users(self, payload: UserListQuery) -> Page:
+        query = select(User)
+        rank = None
         if payload.search:
-            query = query.where(User.first_name.ilike(f"%{payload.search}%"))
-        res = await self.__session.execute(query)
-        return res.scalars().all()
+            query = query.where(
+                matches(payload.search, User.first_name, User.last_name)
+            )
+            if payload.sort == "relevance":
+                rank = relevance(payload.search, User.first_name, User.last_name)
+        return await paginate(
+            self.__session,
+            query,
+            keys=(User.id,),
+            size=payload.size,
+            cursor=payload.cursor,
+            page=payload.page,
+            count_mode=payload.count_mode,
+            rank=rank,
+        )
 
     async def update_user(self, user_id: int, payload: UserUpdateSchema) -> User:
         user = await self.get_user_by_id(user_id)
@@ -7,6 +7,8 @@ from app.api.routers.meal_router import router as meal_router
 from app.api.routers.position_calculation_router import router as ps_cal_router
 from app.api.routers.alerts_router import router as alerts_router
 from app.api.routers.report_router import router as report_router
+from app.api.routers.export_router import router as export_router
+from app.api.routers.import_router import router as import_router
 
 
 def get_api_v1_router() -> APIRouter:
@@ -19,6 +21,8 @@ def get_api_v1_router() -> APIRouter:
     api_v1_router.include_router(ps_cal_router)
     api_v1_router.include_router(alerts_router)
     api_v1_router.include_router(report_router)
+    api_v1_router.include_router(export_router)
+    api_v1_router.include_router(import_router)
     return api_v1_router
 
 
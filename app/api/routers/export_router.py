@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.api.controllers import ExportController
+from app.api.models import User
+from app.api.repositories.export_repository import ExportDataset
+from app.api.schemas.export_schema import ExportQuery
+from app.core.utils.security import get_current_user
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+)
+
+
+@router.get("/{dataset}", status_code=status.HTTP_200_OK)
+async def export_dataset(
+    dataset: ExportDataset,
+    params: ExportQuery = Depends(),
+    current_user: User = Depends(get_current_user),
+    export_controller: ExportController = Depends(),
+) -> StreamingResponse:
+    if current_user.role_id not in (1, 2):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await export_controller.export(dataset=dataset, payload=params)
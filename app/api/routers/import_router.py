@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.controllers import ImportController
+from app.api.models import User
+from app.api.schemas.import_schemas import ImportReadSchema, ImportSchema
+from app.core.utils.security import get_current_user
+
+router = APIRouter(
+    prefix="/import",
+    tags=["import"],
+)
+
+
+@router.post(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=ImportReadSchema,
+    description=(
+        "Create or update units, ingredients, meals and recipes in bulk. "
+        "Ingredients refer to units by code and recipes to meals and "
+        "ingredients by name; invalid rows are reported and nothing is saved."
+    ),
+)
+async def import_data(
+    payload: ImportSchema,
+    current_user: User = Depends(get_current_user),
+    import_controller: ImportController = Depends(),
+) -> ImportReadSchema:
+    if current_user.role_id not in (1, 2):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await import_controller.import_data(payload=payload)
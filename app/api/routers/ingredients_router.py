@@ -1,9 +1,7 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Query, Request, status, HTTPException
 
 from app.api.controllers import IngredientController
 from app.api.models import User
-from app.api.repositories import UserRepository, IngredientRepository, UnitRepository
-from app.core.databases.postgres import get_session_without_depends
 
 from app.api.schemas.ingredients_schemas import (
     IngredientCreateSchema,
@@ -11,8 +9,15 @@ from app.api.schemas.ingredients_schemas import (
     IngredientUpdateSchema,
     IngredientListSchema,
     IngredientReadSchema,
+    IngredientStateListSchema,
+    IngredientStateQuery,
+    ReceiptReadSchema,
+    ReceiptSchema,
+)
+from app.api.schemas.transactions_schemas import (
+    IngredientTransactionListSchema,
+    IngredientTransactionQuery,
 )
-from app.api.tasks import send_warnings
 from app.core.utils.security import get_current_user
 
 router = APIRouter(
@@ -41,6 +46,63 @@ async def get_all_ingredients(
     )
 
 
+@router.get(
+    "/state",
+    status_code=status.HTTP_200_OK,
+    response_model=IngredientStateListSchema,
+)
+async def get_state(
+    params: IngredientStateQuery = Depends(),
+    current_user: User = Depends(get_current_user),
+    ingredient_controller: IngredientController = Depends(),
+) -> IngredientStateListSchema:
+    if current_user.role_id not in (1, 2, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await ingredient_controller.get_state(payload=params)
+
+
+@router.get(
+    "/transactions",
+    status_code=status.HTTP_200_OK,
+    response_model=IngredientTransactionListSchema,
+)
+async def get_transactions(
+    params: IngredientTransactionQuery = Depends(),
+    current_user: User = Depends(get_current_user),
+    ingredient_controller: IngredientController = Depends(),
+) -> IngredientTransactionListSchema:
+    if current_user.role_id not in (1, 2, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await ingredient_controller.get_transactions(payload=params)
+
+
+@router.get(
+    "/{ingredient_id}/transactions",
+    status_code=status.HTTP_200_OK,
+    response_model=IngredientTransactionListSchema,
+)
+async def get_ingredient_transactions(
+    ingredient_id: int,
+    params: IngredientTransactionQuery = Depends(),
+    current_user: User = Depends(get_current_user),
+    ingredient_controller: IngredientController = Depends(),
+) -> IngredientTransactionListSchema:
+    if current_user.role_id not in (1, 2, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await ingredient_controller.get_ingredient_transactions(
+        ingredient_id=ingredient_id, payload=params
+    )
+
+
 @router.get(
     "/{ingredient_id}",
     status_code=status.HTTP_200_OK,
@@ -79,6 +141,52 @@ async def create_ingredient(
     )
 
 
+@router.post(
+    "/receipts",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ReceiptReadSchema,
+)
+async def receive_stock(
+    payload: ReceiptSchema,
+    current_user: User = Depends(get_current_user),
+    ingredient_controller: IngredientController = Depends(),
+) -> ReceiptReadSchema:
+    if current_user.role_id not in (1, 2, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await ingredient_controller.receive_stock(payload=payload)
+
+
+@router.post(
+    "/receipts/csv",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ReceiptReadSchema,
+    description="Receive stock from a CSV body with an ingredient_id,quantity header.",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"text/csv": {"schema": {"type": "string"}}},
+        }
+    },
+)
+async def receive_stock_csv(
+    request: Request,
+    note: str | None = Query(None, max_length=255),
+    current_user: User = Depends(get_current_user),
+    ingredient_controller: IngredientController = Depends(),
+) -> ReceiptReadSchema:
+    if current_user.role_id not in (1, 2, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await ingredient_controller.receive_stock_csv(
+        chunks=request.stream(), note=note
+    )
+
+
 @router.put(
     "/{ingredient_id}/",
     status_code=status.HTTP_200_OK,
@@ -117,28 +225,3 @@ async def delete_ingredient(
     return await ingredient_controller.delete_ingredient(
         ingredient_id=ingredient_id,
     )
-
-
-async def low_stock_ingredients() -> None:
-    async with get_session_without_depends() as session:
-        ingredient_repository = IngredientRepository(session)
-        unit_repository = UnitRepository(session)
-        ingredient_controller = IngredientController(
-            ingredient_repository=ingredient_repository,
-            unit_repository=unit_repository,
-        )
-        users_repository = UserRepository(session)
-
-        limit, offset = 10, 1
-        while 1:
-            res = (
-                await ingredient_controller.low_stock_ingredients(limit, offset)
-            ).model_dump()
-            if res["total"] == 0:
-                break
-            for ingredient in res["items"]:
-                if ingredient["quantity"] <= ingredient["min_threshold"]:
-                    users = await users_repository.get_admin_users()
-                    for user in users:
-                        send_warnings.delay(user.email, ingredient["name"])
-            offset += 1
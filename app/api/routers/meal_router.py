@@ -2,9 +2,6 @@ from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.api.controllers import MealController
 from app.api.models import User
-from app.api.schemas.ingredients_schemas import (
-    IngredientReadSchema,
-)
 from app.api.schemas.meal_schemas import (
     MealListSchema,
     MealReadSchema,
@@ -12,10 +9,14 @@ from app.api.schemas.meal_schemas import (
     MealListQuery,
     MealUpdateSchema,
     MealReadWithIngredientSchema,
+    MealIngredientDetailSchema,
     AddIngredientToMealSchema,
     PortionQty,
     MealLogListSchema,
+    MealLogQuery,
     MealLogReadSchema,
+    MealServeBatchSchema,
+    MealServeBatchReadSchema,
 )
 from app.core.utils.security import get_current_user
 
@@ -39,6 +40,20 @@ async def list_meals(
     return await meal_controller.list_meals(payload=payload)
 
 
+@router.get("/logs", status_code=status.HTTP_200_OK, response_model=MealLogListSchema)
+async def list_meal_logs(
+    meal_controller: MealController = Depends(),
+    current_user: User = Depends(get_current_user),
+    payload: MealLogQuery = Depends(),
+) -> MealLogListSchema:
+    if current_user.role_id not in (1, 2, 3, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await meal_controller.list_meal_logs(payload=payload)
+
+
 @router.get("/{meal_id}", status_code=status.HTTP_200_OK, response_model=MealReadSchema)
 async def get_meal(
     meal_id: int,
@@ -101,13 +116,13 @@ async def delete_meal(
 @router.get(
     "/{meal_id}/ingredients",
     status_code=status.HTTP_200_OK,
-    response_model=list[IngredientReadSchema],
+    response_model=list[MealIngredientDetailSchema],
 )
 async def get_meal_ingredients(
     meal_id: int,
     meal_controller: MealController = Depends(),
     current_user: User = Depends(get_current_user),
-) -> list[IngredientReadSchema]:
+) -> list[MealIngredientDetailSchema]:
     if current_user.role_id not in (1, 2, 3, 4):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -180,6 +195,24 @@ async def serve_meal(
     )
 
 
+@router.post(
+    "/serve/batch",
+    status_code=status.HTTP_201_CREATED,
+    response_model=MealServeBatchReadSchema,
+)
+async def serve_meals(
+    payload: MealServeBatchSchema,
+    current_user: User = Depends(get_current_user),
+    meal_controller: MealController = Depends(),
+) -> MealServeBatchReadSchema:
+    if current_user.role_id not in (1, 2, 3):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await meal_controller.serve_meals(user_id=current_user.id, payload=payload)
+
+
 @router.get(
     "/{meal_id}/logs", status_code=status.HTTP_200_OK, response_model=MealLogListSchema
 )
@@ -187,7 +220,7 @@ async def log_meal(
     meal_id: int,
     meal_controller: MealController = Depends(),
     current_user: User = Depends(get_current_user),
-    payload: MealListQuery = Depends(),
+    payload: MealLogQuery = Depends(),
 ) -> MealLogListSchema:
     if current_user.role_id not in (1, 2, 3, 4):
         raise HTTPException(
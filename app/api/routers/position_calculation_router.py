@@ -2,11 +2,13 @@ from fastapi import APIRouter, HTTPException, status, Depends
 
 from app.api.models import User
 from app.api.controllers import PortionCalculationController
-from app.api.schemas.meal_schemas import MealListQuery
 from app.core.utils.security import get_current_user
 from app.api.schemas.portion_calculation_schema import (
     PortionCalculationReadSchema,
     PortionCalculationListSchema,
+    PortionCalculationQuery,
+    MenuPlanSchema,
+    MenuPlanReadSchema,
 )
 
 router = APIRouter(
@@ -19,7 +21,7 @@ router = APIRouter(
     "", status_code=status.HTTP_200_OK, response_model=PortionCalculationListSchema
 )
 async def get_portion_count(
-    payload: MealListQuery = Depends(),
+    payload: PortionCalculationQuery = Depends(),
     current_user: User = Depends(get_current_user),
     portion_calculation_controller: PortionCalculationController = Depends(),
 ) -> PortionCalculationListSchema:
@@ -31,6 +33,20 @@ async def get_portion_count(
     return await portion_calculation_controller.get_portion_count(payload=payload)
 
 
+@router.post("/plan", status_code=status.HTTP_200_OK, response_model=MenuPlanReadSchema)
+async def plan_menu(
+    payload: MenuPlanSchema,
+    current_user: User = Depends(get_current_user),
+    portion_calculation_controller: PortionCalculationController = Depends(),
+) -> MenuPlanReadSchema:
+    if current_user.role_id not in (1, 2, 3, 4):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await portion_calculation_controller.plan_menu(payload=payload)
+
+
 @router.get(
     "/{meal_id}",
     status_code=status.HTTP_200_OK,
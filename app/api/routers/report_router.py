@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Path, status
 
 from app.api.models import User
-from app.api.schemas.report_schema import MealLogPortionStats, MealLogQueryParams
-from app.api.controllers import MealController
+from app.api.schemas.report_schema import (
+    MealLogPortionStats,
+    MealLogQueryParams,
+    PortionSeriesQuery,
+    PortionSeriesSchema,
+    ReportQuery,
+    ReportReadSchema,
+)
+from app.api.controllers import MealController, ReportController
 from app.core.utils.security import get_current_user
 
 router = APIRouter(
@@ -23,3 +30,63 @@ async def get_meal_log_portion_stats(
             detail="You do not have permission to access this resource.",
         )
     return await meal_controller.get_meal_log_portion_stats(payload=payload)
+
+
+@router.get(
+    "/monthly",
+    status_code=status.HTTP_200_OK,
+    response_model=list[ReportReadSchema],
+)
+async def get_monthly_reports(
+    params: ReportQuery = Depends(),
+    current_user: User = Depends(get_current_user),
+    report_controller: ReportController = Depends(),
+) -> list[ReportReadSchema]:
+    if current_user.role_id not in (1, 2):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await report_controller.get_reports(payload=params)
+
+
+@router.get(
+    "/monthly/{year}/{month}",
+    status_code=status.HTTP_200_OK,
+    response_model=ReportReadSchema,
+)
+async def get_monthly_report(
+    year: int = Path(..., ge=1),
+    month: int = Path(..., ge=1, le=12),
+    current_user: User = Depends(get_current_user),
+    report_controller: ReportController = Depends(),
+) -> ReportReadSchema:
+    if current_user.role_id not in (1, 2):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await report_controller.get_report(year=year, month=month)
+
+
+@router.get(
+    "/series",
+    status_code=status.HTTP_200_OK,
+    response_model=PortionSeriesSchema,
+    description=(
+        "Portions served per day, month or year of the given timezone. The "
+        "stored monthly reports and POST /report/ totals use UTC months, so "
+        "a month here can differ from them by the serves near its edges."
+    ),
+)
+async def get_portion_series(
+    params: PortionSeriesQuery = Depends(),
+    current_user: User = Depends(get_current_user),
+    meal_controller: MealController = Depends(),
+) -> PortionSeriesSchema:
+    if current_user.role_id not in (1, 2):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="You do not have permission to access this resource.",
+        )
+    return await meal_controller.get_portion_series(payload=params)
@@ -31,5 +31,7 @@ class AlertsQuery(QueryList):
 
 class AlertListSchema(QueryList):
     total: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
     items: list[AlertReadSchema] = Field(default_factory=list)
     model_config = ConfigDict(from_attributes=True)
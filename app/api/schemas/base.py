@@ -1,9 +1,16 @@
+from typing import Literal
+
 from pydantic import BaseModel, Field, ConfigDict
 
+CountMode = Literal["exact", "estimated"]
+SearchSort = Literal["id", "relevance"]
+
 
 class QueryList(BaseModel):
     search: str | None = None
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=100)
+    cursor: str | None = None
+    count_mode: CountMode = "exact"
 
     model_config = ConfigDict(from_attributes=True)
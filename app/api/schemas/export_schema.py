@@ -0,0 +1,9 @@
+from typing import Literal
+
+from pydantic import BaseModel, Field, NaiveDatetime
+
+
+class ExportQuery(BaseModel):
+    date_from: NaiveDatetime | None = None
+    date_to: NaiveDatetime | None = Field(None, description="exclusive")
+    format: Literal["csv", "parquet"] = "csv"
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+
+
+class UnitImportRow(BaseModel):
+    code: str = Field(..., min_length=1, max_length=10)
+    description: str | None = Field(None, max_length=50)
+
+
+class IngredientImportRow(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    unit: str = Field(..., max_length=10, description="unit code")
+    min_threshold: float | None = Field(None, ge=0)
+
+
+class MealImportRow(BaseModel):
+    name: str = Field(..., min_length=1, max_length=100)
+    picture: str | None = Field(None, max_length=100)
+
+
+class RecipeImportRow(BaseModel):
+    meal: str = Field(..., max_length=100, description="meal name")
+    ingredient: str = Field(..., max_length=100, description="ingredient name")
+    required_qty: float = Field(..., ge=0.01, le=10000.0)
+
+
+class ImportSchema(BaseModel):
+    # rows stay raw here so that each one is validated and reported on its own
+    units: list[dict] = Field(default_factory=list)
+    ingredients: list[dict] = Field(default_factory=list)
+    meals: list[dict] = Field(default_factory=list)
+    recipes: list[dict] = Field(default_factory=list)
+
+
+class ImportRowError(BaseModel):
+    section: str
+    row: int
+    errors: list[str]
+
+
+class ImportReadSchema(BaseModel):
+    units: int = 0
+    ingredients: int = 0
+    meals: int = 0
+    recipes: int = 0
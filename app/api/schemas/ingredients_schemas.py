@@ -1,6 +1,8 @@
-from pydantic import BaseModel, Field, ConfigDict
+from datetime import datetime
 
-from app.api.schemas.base import QueryList
+from pydantic import BaseModel, Field, ConfigDict, NaiveDatetime
+
+from app.api.schemas.base import CountMode, QueryList, SearchSort
 
 
 class IngredientBaseSchema(BaseModel):
@@ -31,6 +33,7 @@ class IngredientReadSchema(IngredientBaseSchema):
 
 
 class IngredientListQuery(QueryList):
+    sort: SearchSort = "id"
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -41,5 +44,39 @@ class IngredientListSchema(BaseModel):
     items: list[IngredientReadSchema]
 
     search: str | None = None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class IngredientStateQuery(BaseModel):
+    at: NaiveDatetime = Field(..., description="UTC point in time")
+
+
+class IngredientStateSchema(BaseModel):
+    ingredient_id: int
+    quantity: float
+
+
+class IngredientStateListSchema(BaseModel):
+    at: datetime
+    snapshot_at: datetime | None = None
+    items: list[IngredientStateSchema]
+
+
+class ReceiptLineSchema(BaseModel):
+    ingredient_id: int
+    quantity: float = Field(..., gt=0)
+
+
+class ReceiptSchema(BaseModel):
+    note: str | None = Field(None, max_length=255, description="e.g. invoice number")
+    lines: list[ReceiptLineSchema] = Field(..., min_length=1)
+
+
+class ReceiptReadSchema(BaseModel):
+    note: str | None = None
+    total_lines: int
+    items: list[IngredientReadSchema]
@@ -1,7 +1,11 @@
-from pydantic import BaseModel, Field, ConfigDict
+from typing import Literal
+
+from pydantic import BaseModel, Field, ConfigDict, NaiveDatetime
 from datetime import datetime
 
+from app.api.schemas.base import CountMode, SearchSort
 from app.api.schemas.ingredients_schemas import IngredientReadSchema
+from app.api.schemas.units_schemas import UnitReadSchema
 
 
 class PortionQty(BaseModel):
@@ -36,6 +40,9 @@ class MealListQuery(BaseModel):
     search: str | None = None
     page: int = Field(1, ge=1)
     size: int = Field(10, ge=1, le=100)
+    cursor: str | None = None
+    count_mode: CountMode = "exact"
+    sort: SearchSort = "id"
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -72,8 +79,40 @@ class AddIngredientToMealSchema(BaseModel):
     required_qty: float
 
 
+class MealIngredientDetailSchema(IngredientReadSchema):
+    required_qty: float
+    unit: UnitReadSchema
+
+
 class MealReadWithIngredientSchema(MealReadSchema):
-    ingredients: list[IngredientReadSchema] = Field(default_factory=list)
+    ingredients: list[MealIngredientDetailSchema] = Field(default_factory=list)
+
+
+class MealServeItemSchema(PortionQty):
+    meal_id: int
+
+
+class MealServeBatchSchema(BaseModel):
+    items: list[MealServeItemSchema] = Field(..., min_length=1)
+
+
+class MealServedSchema(MealReadWithIngredientSchema):
+    portion_qty: int
+
+
+class MealServeBatchReadSchema(BaseModel):
+    total_portions: int
+    items: list[MealServedSchema]
+
+
+class MealShortfallSchema(BaseModel):
+    meal_id: int
+    meal_name: str
+    ingredient_id: int
+    ingredient_name: str
+    required_qty: float
+    total_required_qty: float
+    available_qty: float
 
 
 class MealUpdateSchema(BaseModel):
@@ -86,6 +125,9 @@ class MealListSchema(BaseModel):
     page: int
     size: int
     search: str | None = None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
     items: list[MealReadSchema]
 
     model_config = ConfigDict(from_attributes=True)
@@ -110,11 +152,30 @@ class MealLogReadSchema(MealLogBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class MealLogQuery(BaseModel):
+    meal_id: int | None = None
+    user_id: int | None = None
+    served_from: NaiveDatetime | None = None
+    served_to: NaiveDatetime | None = Field(None, description="exclusive")
+    min_portions: int | None = Field(None, ge=1)
+    max_portions: int | None = Field(None, ge=1)
+    order: Literal["asc", "desc"] = "desc"
+    page: int = Field(1, ge=1)
+    size: int = Field(10, ge=1, le=100)
+    cursor: str | None = None
+    count_mode: CountMode = "estimated"
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class MealLogListSchema(BaseModel):
     total: int
     page: int
     size: int
     search: str | None = None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
     items: list[MealLogReadSchema]
 
     model_config = ConfigDict(from_attributes=True)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic import BaseModel, ConfigDict, Field
 from app.api.schemas.base import QueryList
 from app.api.schemas.meal_schemas import MealReadSchema
@@ -9,6 +11,36 @@ class PortionCalculationReadSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class PortionCalculationQuery(BaseModel):
+    # offset pages only, since the order can be by name or portion count
+    search: str | None = None
+    page: int = Field(1, ge=1)
+    size: int = Field(10, ge=1, le=100)
+    min_portions: int | None = Field(None, ge=0)
+    max_portions: int | None = Field(None, ge=0)
+    order_by: Literal[
+        "id", "-id", "name", "-name", "portion_count", "-portion_count"
+    ] = "id"
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class PortionCalculationListSchema(QueryList):
     items: list[PortionCalculationReadSchema]
     model_config = ConfigDict(from_attributes=True)
+
+
+class MenuPlanItemSchema(BaseModel):
+    meal_id: int
+    ratio: float = Field(0, ge=0)
+    min_portions: int = Field(0, ge=0)
+    max_portions: int | None = Field(None, ge=0)
+
+
+class MenuPlanSchema(BaseModel):
+    items: list[MenuPlanItemSchema] = Field(..., min_length=1, max_length=1000)
+
+
+class MenuPlanReadSchema(BaseModel):
+    total_portions: int
+    items: list[PortionCalculationReadSchema]
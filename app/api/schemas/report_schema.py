@@ -1,5 +1,7 @@
-from pydantic import BaseModel, Field
-from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+from datetime import date, datetime
 
 
 class PortionByDay(BaseModel):
@@ -27,3 +29,48 @@ class MealLogPortionStats(BaseModel):
 class MealLogQueryParams(BaseModel):
     year: int = Field(..., ge=1, description="Year to summarize")
     month: int = Field(1, ge=1, le=12, description="Month to summarize (optional)")
+
+
+class ReportReadSchema(BaseModel):
+    id: int
+    report_year: int
+    report_month: int
+    total_served_portions: int
+    possible_served_portions: int
+    difference_percentage: float
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ReportQuery(BaseModel):
+    year: int | None = Field(None, ge=1, description="Only reports of this year")
+
+
+class PortionSeriesQuery(BaseModel):
+    date_from: date
+    date_to: date = Field(..., description="inclusive")
+    granularity: Literal["day", "month", "year"] = "day"
+    timezone: str | None = Field(
+        None,
+        description="IANA name, the server's if empty; buckets are local to it",
+    )
+    breakdown: Literal["meal", "user"] | None = None
+
+
+class PortionSeries(MealLogPortionStats):
+    total_portions: int = 0
+
+
+class PortionBreakdown(PortionSeries):
+    meal_id: int | None = None
+    user_id: int | None = None
+
+
+class PortionSeriesSchema(PortionSeries):
+    date_from: date
+    date_to: date
+    granularity: Literal["day", "month", "year"]
+    timezone: str
+    breakdown: list[PortionBreakdown] = Field(default_factory=list)
@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field, NaiveDatetime
+
+from app.api.models.transactions import TransactionType
+from app.api.schemas.base import CountMode
+
+
+class IngredientTransactionReadSchema(BaseModel):
+    id: int
+    ingredient_id: int
+    quantity: float
+    transaction_type: TransactionType
+    reference_id: int | None = None
+    note: str | None = None
+    happened_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class IngredientTransactionQuery(BaseModel):
+    ingredient_id: int | None = None
+    transaction_type: TransactionType | None = None
+    reference_id: int | None = None
+    happened_from: NaiveDatetime | None = None
+    happened_to: NaiveDatetime | None = Field(None, description="exclusive")
+    order: Literal["asc", "desc"] = "desc"
+    page: int = Field(1, ge=1)
+    size: int = Field(10, ge=1, le=100)
+    cursor: str | None = None
+    count_mode: CountMode = "estimated"
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class IngredientTransactionListSchema(BaseModel):
+    total: int
+    page: int
+    size: int
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    items: list[IngredientTransactionReadSchema]
+
+    model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from pydantic import BaseModel, Field, ConfigDict
 
-from app.api.schemas.base import QueryList
+from app.api.schemas.base import CountMode, QueryList, SearchSort
 
 
 class UserResendSchema(BaseModel):
@@ -59,6 +59,7 @@ class RefreshTokenSchema(BaseModel):
 
 
 class UserListQuery(QueryList):
+    sort: SearchSort = "id"
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -67,6 +68,9 @@ class UserListSchema(BaseModel):
     page: int
     size: int
     search: str | None = None
+    count_mode: CountMode = "exact"
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
     items: list[UserReadSchema]
 
     model_config = ConfigDict(from_attributes=True)
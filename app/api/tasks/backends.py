@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from functools import cache
+from pathlib import Path
+from typing import Callable, Literal
+from uuid import uuid4
+
+from app.api.tasks.email import send_verification_email
+from app.api.tasks.mailer import SMTPMailer, mailer_from_settings
+from app.api.tasks.messages import verification_message, warnings_message
+from app.api.tasks.send_warnings import send_warnings
+from app.api.tasks.templates import RenderedMail
+from app.core.settings import get_settings, Settings
+
+logger = logging.getLogger(__name__)
+settings: Settings = get_settings()
+
+MailKind = Literal["verification", "warnings"]
+
+MESSAGES: dict[MailKind, Callable[..., RenderedMail]] = {
+    "verification": verification_message,
+    "warnings": warnings_message,
+}
+TASKS = {
+    "verification": send_verification_email,
+    "warnings": send_warnings,
+}
+
+
+class MailBackend(ABC):
+    def __init__(self):
+        self.__pending: set[asyncio.Task] = set()
+
+    @abstractmethod
+    async def send(self, kind: MailKind, email: str, *args) -> None: ...
+
+    def submit(self, kind: MailKind, email: str, *args) -> asyncio.Task:
+        # fire and forget: the caller does not wait on delivery
+        task = asyncio.create_task(self.__send_logged(kind, email, *args))
+        self.__pending.add(task)
+        task.add_done_callback(self.__pending.discard)
+        return task
+
+    async def __send_logged(self, kind: MailKind, email: str, *args) -> None:
+        try:
+            await self.send(kind, email, *args)
+        except Exception:
+            logger.exception("Sending %s mail to %s failed", kind, email)
+
+    async def close(self) -> None:
+        await asyncio.gather(*self.__pending, return_exceptions=True)
+
+
+class InlineBackend(MailBackend):
+    """Sends from the API process's event loop over pooled connections."""
+
+    def __init__(self, mailer: SMTPMailer | None = None):
+        super().__init__()
+        self.__mailer = mailer or mailer_from_settings()
+
+    async def send(self, kind: MailKind, email: str, *args) -> None:
+        await self.__mailer.send(MESSAGES[kind](email, *args))
+
+    async def close(self) -> None:
+        await super().close()
+        await self.__mailer.close()
+
+
+class CeleryBackend(MailBackend):
+    """Queues the message for the Celery worker."""
+
+    async def send(self, kind: MailKind, email: str, *args) -> None:
+        # publishing to the broker blocks, so it runs off the event loop
+        await asyncio.to_thread(TASKS[kind].delay, email, *args)
+
+
+class FileBackend(MailBackend):
+    """Writes every message as an .eml file, for development and tests."""
+
+    def __init__(self, directory: str | Path):
+        super().__init__()
+        self.__directory = Path(directory)
+
+    async def send(self, kind: MailKind, email: str, *args) -> None:
+        mail = MESSAGES[kind](email, *args)
+        path = self.__directory / f"{kind}-{uuid4().hex}.eml"
+        await asyncio.to_thread(self.__write, path, mail.data)
+
+    def __write(self, path: Path, content: bytes) -> None:
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+
+
+@cache
+def get_mail_backend() -> MailBackend:
+    if settings.MAIL_BACKEND == "inline":
+        return InlineBackend()
+    if settings.MAIL_BACKEND == "file":
+        return FileBackend(settings.MAIL_FILE_DIR)
+    return CeleryBackend()
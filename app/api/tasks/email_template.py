@@ -151,8 +151,8 @@ EMAIL_TEMPLATE_FOR_WARNINGS = """<!DOCTYPE html>
           <tr>
             <td class="content">
               <p>Hello,</p>
-              <p>The product <strong>{{PRODUCT_NAME}}</strong> is running low in our warehouse stock.</p>
-              <p>Please restock it as soon as possible to avoid any interruptions.</p>
+              <p>Running low in our warehouse stock: <strong>{{PRODUCT_NAME}}</strong>.</p>
+              <p>Please restock as soon as possible to avoid any interruptions.</p>
               <a href="https://shaxzodbek.com" class="button">View Inventory</a>
             </td>
           </tr>
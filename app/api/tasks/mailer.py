@@ -0,0 +1,163 @@
+import asyncio
+from functools import cache
+from typing import Awaitable, TypeVar
+
+import aiosmtplib
+from celery.signals import worker_process_shutdown
+
+from app.api.tasks.templates import RenderedMail
+from app.core.settings import get_settings, Settings
+
+settings: Settings = get_settings()
+
+T = TypeVar("T")
+
+# failures worth a fresh connection rather than giving up on the message
+TRANSIENT = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError, OSError)
+# replies about one message, after which the connection is still usable
+REFUSED = (aiosmtplib.SMTPResponseException, aiosmtplib.SMTPRecipientsRefused)
+
+
+class TemporaryMailError(Exception):
+    """The server answered 4xx: the message may go through later."""
+
+
+# what the Celery tasks retry with backoff; 5xx replies are final
+RETRY_FOR = (TemporaryMailError, *TRANSIENT)
+
+
+def is_temporary(error: Exception) -> bool:
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(is_temporary(refused) for refused in error.recipients)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and error.code < 500
+
+
+class SMTPMailer:
+    """Sends messages over a small pool of SMTP connections kept open.
+
+    At most ``concurrency`` messages are in flight, one per connection; a
+    connection is only opened when every open one is busy.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        starttls: bool = True,
+        timeout: float = 30,
+        concurrency: int = 4,
+        retries: int = 2,
+        backoff: float = 0.5,
+    ):
+        self.__host = host
+        self.__port = port
+        self.__username = username
+        self.__password = password
+        self.__starttls = starttls
+        self.__timeout = timeout
+        self.__retries = retries
+        self.__backoff = backoff
+        self.__semaphore = asyncio.Semaphore(concurrency)
+        self.__idle: list[aiosmtplib.SMTP] = []
+        self.connections = 0
+
+    async def __connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.__host,
+            port=self.__port,
+            timeout=self.__timeout,
+            start_tls=self.__starttls,
+        )
+        await smtp.connect()
+        try:
+            if self.__username and smtp.supports_extension("auth"):
+                await smtp.login(self.__username, self.__password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connections += 1
+        return smtp
+
+    async def send(self, mail: RenderedMail) -> None:
+        async with self.__semaphore:
+            smtp = self.__idle.pop() if self.__idle else None
+            for attempt in range(self.__retries + 1):
+                try:
+                    if smtp is None or not smtp.is_connected:
+                        smtp = await self.__connect()
+                    await smtp.sendmail(mail.sender, [mail.recipient], mail.data)
+                    self.__idle.append(smtp)
+                    return
+                except TRANSIENT:
+                    # the server may have dropped an idle connection
+                    if smtp is not None:
+                        smtp.close()
+                        smtp = None
+                    if attempt == self.__retries:
+                        raise
+                    await asyncio.sleep(self.__backoff * 2**attempt)
+                except REFUSED:
+                    # the server refused this message and aiosmtplib reset the
+                    # envelope, so the connection is still good for the next
+                    if smtp is not None and smtp.is_connected:
+                        self.__idle.append(smtp)
+                    raise
+                except BaseException:
+                    if smtp is not None:
+                        smtp.close()
+                    raise
+
+    async def close(self) -> None:
+        while self.__idle:
+            smtp = self.__idle.pop()
+            try:
+                await smtp.quit()
+            except (aiosmtplib.SMTPException, OSError):
+                smtp.close()
+
+
+def mailer_from_settings() -> SMTPMailer:
+    return SMTPMailer(
+        settings.SMTP_SERVER,
+        settings.SMTP_PORT,
+        username=settings.EMAIL,
+        password=settings.EMAIL_PASSWORD,
+        starttls=settings.SMTP_STARTTLS,
+        timeout=settings.SMTP_TIMEOUT,
+        concurrency=settings.MAIL_CONCURRENCY,
+    )
+
+
+# Celery workers are synchronous; every worker process runs the mailer on an
+# event loop of its own, created lazily so that each forked process gets one
+
+
+@cache
+def worker_loop() -> asyncio.AbstractEventLoop:
+    return asyncio.new_event_loop()
+
+
+@cache
+def get_mailer() -> SMTPMailer:
+    return mailer_from_settings()
+
+
+def run(coroutine: Awaitable[T]) -> T:
+    return worker_loop().run_until_complete(coroutine)
+
+
+def deliver(mail: RenderedMail) -> None:
+    try:
+        run(get_mailer().send(mail))
+    except aiosmtplib.SMTPException as error:
+        if is_temporary(error):
+            raise TemporaryMailError(str(error)) from error
+        raise
+
+
+@worker_process_shutdown.connect
+def close_mailer(**kwargs) -> None:
+    if get_mailer.cache_info().currsize:
+        run(get_mailer().close())
@@ -0,0 +1,56 @@
+from app.api.tasks.email_template import (
+    EMAIL_TEMPLATE_FOR_CODE,
+    EMAIL_TEMPLATE_FOR_WARNINGS,
+)
+from app.api.tasks.templates import MailTemplate, RenderedMail
+from app.core.settings import get_settings, Settings
+
+settings: Settings = get_settings()
+
+# compiled once per process; other locales register their own variants
+TEMPLATES: dict[tuple[str, str], MailTemplate] = {
+    ("verification", "en"): MailTemplate(
+        "Your verification code: {{CODE}}", EMAIL_TEMPLATE_FOR_CODE
+    ),
+    ("warnings", "en"): MailTemplate(
+        "⚠️ Low Stock Alert: {{SUMMARY}}", EMAIL_TEMPLATE_FOR_WARNINGS
+    ),
+}
+
+
+def register_template(kind: str, locale: str, template: MailTemplate) -> None:
+    TEMPLATES[(kind, locale)] = template
+
+
+def get_template(kind: str, locale: str | None = None) -> MailTemplate:
+    return (
+        TEMPLATES.get((kind, locale or settings.MAIL_LOCALE))
+        or TEMPLATES[(kind, settings.MAIL_LOCALE)]
+    )
+
+
+def verification_message(
+    email: str, code: int, locale: str | None = None
+) -> RenderedMail:
+    return get_template("verification", locale).render(
+        settings.EMAIL, email, CODE=code, EMAIL=email
+    )
+
+
+def warnings_message(
+    email: str, product_names: list[str], locale: str | None = None
+) -> RenderedMail:
+    # one digest naming every ingredient that ran low; a line per name keeps
+    # long digests under the SMTP line length limit
+    summary = (
+        product_names[0]
+        if len(product_names) == 1
+        else f"{len(product_names)} ingredients"
+    )
+    return get_template("warnings", locale).render(
+        settings.EMAIL,
+        email,
+        PRODUCT_NAME=",\n".join(product_names),
+        SUMMARY=summary,
+        EMAIL=email,
+    )
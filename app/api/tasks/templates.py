@@ -0,0 +1,136 @@
+import re
+from email.header import Header
+from html import escape
+from html.parser import HTMLParser
+from typing import NamedTuple
+from uuid import uuid4
+
+PLACEHOLDER = re.compile(r"{{(\w+)}}")
+BLOCKS = {"p", "div", "br", "tr", "table", "li", "h1", "h2", "h3", "h4"}
+HIDDEN = {"head", "style", "script", "title"}
+
+
+class RenderedMail(NamedTuple):
+    sender: str
+    recipient: str
+    data: bytes
+
+
+class CompiledTemplate:
+    """A template split once into static segments and placeholder names.
+
+    Static text is encoded ahead of time; rendering encodes only the values
+    and joins everything in one pass.
+    """
+
+    def __init__(self, source: str):
+        parts = PLACEHOLDER.split(source.replace("\r\n", "\n").replace("\n", "\r\n"))
+        # even items are static text, odd items placeholder names
+        self.segments: list[bytes | str] = [
+            part.encode() if index % 2 == 0 else part
+            for index, part in enumerate(parts)
+        ]
+        self.placeholders = frozenset(parts[1::2])
+
+    def render(self, values: dict[str, bytes]) -> bytes:
+        return b"".join(
+            segment if isinstance(segment, bytes) else values[segment]
+            for segment in self.segments
+        )
+
+
+class TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.lines: list[str] = [""]
+        self.hidden = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HIDDEN:
+            self.hidden += 1
+        elif tag in BLOCKS:
+            self.lines.append("")
+
+    def handle_endtag(self, tag):
+        if tag in HIDDEN:
+            self.hidden -= 1
+        elif tag in BLOCKS:
+            self.lines.append("")
+
+    def handle_data(self, data):
+        if not self.hidden:
+            self.lines[-1] += data
+
+    def text(self) -> str:
+        lines = [" ".join(line.split()) for line in self.lines]
+        paragraphs, previous = [], ""
+        for line in lines:
+            if line or previous:
+                paragraphs.append(line)
+            previous = line
+        return "\n".join(paragraphs).strip() + "\n"
+
+
+def html_to_text(html: str) -> str:
+    extractor = TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.text()
+
+
+class MailTemplate:
+    """A multipart/alternative message with everything static prebuilt.
+
+    Only the subject, the recipient and the placeholder values change per
+    message; the MIME skeleton with its part headers and boundary is built
+    once. Bodies go out as 8bit UTF-8, so values are never re-encoded.
+    """
+
+    def __init__(self, subject: str, html: str, text: str | None = None):
+        boundary = f"=============={uuid4().hex}=="
+        self.subject = CompiledTemplate(subject)
+        self.html = CompiledTemplate(html)
+        self.text = CompiledTemplate(text if text is not None else html_to_text(html))
+        self.placeholders = (
+            self.subject.placeholders | self.html.placeholders | self.text.placeholders
+        )
+        part = (
+            "--{boundary}\r\n"
+            'Content-Type: text/{subtype}; charset="utf-8"\r\n'
+            "Content-Transfer-Encoding: 8bit\r\n\r\n"
+        )
+        self.head = (
+            'Content-Type: multipart/alternative; boundary="'
+            f'{boundary}"\r\nMIME-Version: 1.0\r\n'
+        ).encode()
+        self.text_head = part.format(boundary=boundary, subtype="plain").encode()
+        self.html_head = (
+            ("\r\n" + part).format(boundary=boundary, subtype="html").encode()
+        )
+        self.tail = f"\r\n--{boundary}--\r\n".encode()
+
+    def render(self, sender: str, recipient: str, **values: str) -> RenderedMail:
+        # headers get values folded onto one line so they cannot inject more
+        # headers; bodies keep their line breaks, as CRLF
+        inline = {key: " ".join(str(value).split()) for key, value in values.items()}
+        body = {
+            key: "\r\n".join(str(value).splitlines()) for key, value in values.items()
+        }
+        subject = self.subject.render({k: v.encode() for k, v in inline.items()})
+        headers = (
+            f"Subject: {Header(subject.decode(), 'utf-8').encode()}\r\n"
+            f"From: {sender}\r\n"
+            f"To: {''.join(recipient.split())}\r\n\r\n"
+        ).encode()
+        data = b"".join(
+            (
+                self.head,
+                headers,
+                self.text_head,
+                self.text.render({k: v.encode() for k, v in body.items()}),
+                self.html_head,
+                self.html.render({k: escape(v).encode() for k, v in body.items()}),
+                self.tail,
+            )
+        )
+        return RenderedMail(sender, recipient, data)
@@ -0,0 +1,34 @@
+import codecs
+import csv
+from typing import AsyncIterator
+
+
+async def csv_rows(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, dict]]:
+    """Parses a CSV body chunk by chunk, yielding (line number, row) pairs.
+
+    The first line is the header. Only complete lines are parsed, so a row
+    split across chunks waits for the rest of it; quoted fields may not
+    contain line breaks.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    header: list[str] | None = None
+    pending, number = "", 0
+
+    def parse(lines: list[str]):
+        nonlocal header, number
+        for values in csv.reader(lines):
+            number += 1
+            if header is None:
+                header = [value.strip() for value in values]
+            elif any(value.strip() for value in values):
+                yield number, dict(zip(header, values))
+
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for row in parse(lines):
+            yield row
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        for row in parse([pending]):
+            yield row
@@ -0,0 +1,80 @@
+import csv
+import io
+from typing import AsyncIterator, Sequence
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import DateTime, Integer, Numeric
+from sqlalchemy.engine import Row
+from sqlalchemy.sql.elements import ColumnElement
+
+
+class ChunkSink(io.RawIOBase):
+    """File object that hands back whatever was written since the last drain."""
+
+    def __init__(self):
+        super().__init__()
+        self.__chunks: list[bytes] = []
+        self.__position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.__chunks.append(bytes(data))
+        self.__position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.__position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.__chunks)
+        self.__chunks.clear()
+        return data
+
+
+def arrow_type(column: ColumnElement) -> pa.DataType:
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Numeric):
+        return pa.decimal128(column.type.precision, column.type.scale)
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+async def csv_chunks(
+    columns: Sequence[ColumnElement], batches: AsyncIterator[Sequence[Row]]
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([column.key for column in columns])
+    async for rows in batches:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def parquet_chunks(
+    columns: Sequence[ColumnElement], batches: AsyncIterator[Sequence[Row]]
+) -> AsyncIterator[bytes]:
+    # every batch becomes one row group that is sent as soon as it is written
+    schema = pa.schema([(column.key, arrow_type(column)) for column in columns])
+    sink = ChunkSink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        async for rows in batches:
+            writer.write_batch(
+                pa.RecordBatch.from_arrays(
+                    [
+                        pa.array(values, type=field.type)
+                        for values, field in zip(zip(*rows), schema)
+                    ],
+                    schema=schema,
+                )
+            )
+            yield sink.drain()
+    yield sink.drain()
@@ -0,0 +1,63 @@
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+
+class InfeasibleMenuError(Exception):
+    pass
+
+
+def _solve(cost, bounds, constraints) -> np.ndarray:
+    res = milp(cost, bounds=bounds, constraints=constraints)
+    if not res.success:
+        raise InfeasibleMenuError(res.message)
+    return res.x
+
+
+def plan_menu(
+    requirements: np.ndarray,
+    stock: np.ndarray,
+    minimums: np.ndarray,
+    maximums: np.ndarray,
+    ratios: np.ndarray,
+) -> np.ndarray:
+    """Jointly feasible whole portions per meal under shared stock.
+
+    ``requirements`` is the ingredient-by-meal matrix of quantity per portion
+    and ``stock`` the available quantity per ingredient. Meals with a positive
+    ratio are scaled up together first, then the remaining stock is spent on
+    the largest total number of portions. The LP relaxation is solved and
+    rounded down, which stays feasible because requirements are non-negative,
+    and the leftovers are filled greedily.
+    """
+    ingredients, meals = requirements.shape
+    upper = np.where(np.isnan(maximums), np.inf, maximums)
+    bounds = Bounds(np.append(minimums, 0), np.append(upper, np.inf))
+    constraints = [
+        LinearConstraint(
+            np.hstack([requirements, np.zeros((ingredients, 1))]), -np.inf, stock
+        )
+    ]
+
+    rated = np.flatnonzero(ratios > 0)
+    if rated.size:
+        ratio_rows = np.zeros((rated.size, meals + 1))
+        ratio_rows[np.arange(rated.size), rated] = 1
+        ratio_rows[:, -1] = -ratios[rated]
+        constraints.append(LinearConstraint(ratio_rows, 0, np.inf))
+        scale = _solve(np.append(np.zeros(meals), -1), bounds, constraints)[-1]
+        bounds = Bounds(np.append(minimums, scale), np.append(upper, scale))
+
+    relaxed = _solve(np.append(-np.ones(meals), 0), bounds, constraints)[:-1]
+    portions = np.floor(relaxed + 1e-9)
+    if (portions < minimums).any():
+        raise InfeasibleMenuError("Minimum portions exceed the available stock.")
+
+    remaining = stock - requirements @ portions
+    for meal in np.argsort(portions - relaxed):
+        used = requirements[:, meal]
+        needed = used > 0
+        extra = np.floor(remaining[needed] / used[needed] + 1e-9).min()
+        extra = max(min(extra, upper[meal] - portions[meal]), 0)
+        portions[meal] += extra
+        remaining -= used * extra
+    return portions.astype(int)
@@ -0,0 +1,179 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Select,
+    func,
+    literal,
+    select,
+    text,
+    tuple_,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.api.schemas.base import CountMode
+
+
+class Page(NamedTuple):
+    items: Sequence[Any]
+    total: int
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+def encode_cursor(values: Sequence[Any], direction: str) -> str:
+    payload = {
+        "k": [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ],
+        "d": direction,
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, keys: Sequence[InstrumentedAttribute]
+) -> tuple[list[Any], str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded))
+        values, direction = payload["k"], payload["d"]
+        if direction not in ("next", "prev") or len(values) != len(keys):
+            raise ValueError(cursor)
+        return [
+            (datetime.fromisoformat(value) if isinstance(key.type, DateTime) else value)
+            for key, value in zip(keys, values)
+        ], direction
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor.",
+        )
+
+
+async def exact_count(session: AsyncSession, query: Select) -> int:
+    counted = select(func.count()).select_from(query.order_by(None).subquery())
+    return (await session.execute(counted)).scalar_one()
+
+
+async def estimated_count(session: AsyncSession, query: Select) -> int:
+    """Planner row estimate, falling back to an exact count before ANALYZE.
+
+    Unfiltered queries read ``pg_class.reltuples`` of the table; filtered ones
+    take the top-level row estimate from ``EXPLAIN``.
+    """
+    connection = await session.connection()
+    if query.whereclause is None:
+        table = query.column_descriptions[0]["entity"].__table__
+        estimate = (
+            await session.execute(
+                text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:table)"
+                ),
+                {"table": table.name},
+            )
+        ).scalar_one_or_none()
+    else:
+        compiled = query.compile(
+            dialect=connection.dialect, compile_kwargs={"literal_binds": True}
+        )
+        plan = (
+            await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+        ).scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = plan[0]["Plan"]["Plan Rows"]
+    if estimate is None or estimate < 0:
+        return await exact_count(session, query)
+    return int(estimate)
+
+
+async def paginate(
+    session: AsyncSession,
+    query: Select,
+    keys: Sequence[InstrumentedAttribute],
+    size: int,
+    cursor: str | None = None,
+    page: int = 1,
+    count_mode: CountMode = "exact",
+    rank: ColumnElement | None = None,
+    descending: bool = False,
+) -> Page:
+    """Keyset page over ``keys``, or an offset page without a cursor.
+
+    One extra row is fetched to tell whether another page follows, and the
+    cursors returned point just past the first and last rows of this page.
+    In ``exact`` mode offset pages take the total from ``COUNT(*) OVER()`` in
+    the same statement. Cursor pages count in a separate statement, since
+    wrapping the window would keep the keyset condition off the index.
+    A ``rank`` orders the rows by it, descending, before the keys; such pages
+    are offset based only and carry no cursors.
+    """
+    if rank is not None and cursor:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursors are not supported when sorting by relevance.",
+        )
+    filtered = query
+    exact = count_mode == "exact"
+    if exact and not cursor:
+        query = query.add_columns(func.count().over().label("total"))
+
+    if cursor:
+        values, direction = decode_cursor(cursor, keys)
+        bound = tuple_(*(literal(value, key.type) for key, value in zip(keys, values)))
+        if (direction == "next") != descending:
+            query = query.where(tuple_(*keys) > bound).order_by(*keys)
+        else:
+            query = query.where(tuple_(*keys) < bound).order_by(
+                *(key.desc() for key in keys)
+            )
+    else:
+        direction = "next"
+        if rank is not None:
+            query = query.order_by(rank.desc())
+        query = query.order_by(
+            *(key.desc() if descending else key for key in keys)
+        ).offset((page - 1) * size)
+
+    result = await session.execute(query.limit(size + 1))
+    rows = result.all()
+    has_more = len(rows) > size
+    rows = rows[:size]
+    if direction == "prev":
+        rows.reverse()
+    items = [row[0] for row in rows]
+
+    if not exact:
+        total = await estimated_count(session, filtered)
+    elif cursor:
+        total = await exact_count(session, filtered)
+    elif rows:
+        total = rows[0].total
+    elif page > 1:
+        total = await exact_count(session, filtered)
+    else:
+        total = 0
+    if not items or rank is not None:
+        return Page(items=items, total=total)
+
+    def key_of(item: Any) -> list[Any]:
+        return [getattr(item, key.key) for key in keys]
+
+    has_next = has_more if direction == "next" else True
+    has_prev = (has_more if direction == "prev" else True) if cursor else page > 1
+    return Page(
+        items=items,
+        total=total,
+        next_cursor=encode_cursor(key_of(items[-1]), "next") if has_next else None,
+        prev_cursor=encode_cursor(key_of(items[0]), "prev") if has_prev else None,
+    )
@@ -0,0 +1,40 @@
+import re
+
+from sqlalchemy import ColumnElement, case, func, literal, literal_column, or_
+
+# the text search configuration is rendered inline so that the expressions
+# below match the GIN expression indexes created by the search migration
+SIMPLE = literal_column("'simple'::regconfig")
+SPACE = literal_column("' '")
+
+
+def document(*columns: ColumnElement) -> ColumnElement:
+    text = columns[0]
+    for column in columns[1:]:
+        text = text.op("||")(SPACE).op("||")(column)
+    return func.to_tsvector(SIMPLE, text)
+
+
+def prefix_query(term: str) -> ColumnElement | None:
+    words = re.findall(r"\w+", term)
+    if not words:
+        return None
+    return func.to_tsquery(SIMPLE, " & ".join(f"{word}:*" for word in words))
+
+
+def matches(term: str, *columns: ColumnElement) -> ColumnElement:
+    conditions = [column.ilike(f"%{term}%") for column in columns]
+    query = prefix_query(term)
+    if query is not None:
+        conditions.append(document(*columns).bool_op("@@")(query))
+    return or_(*conditions)
+
+
+def relevance(term: str, *columns: ColumnElement) -> ColumnElement:
+    query = prefix_query(term)
+    rank = (
+        func.ts_rank(document(*columns), query) if query is not None else literal(0.0)
+    )
+    for column in columns:
+        rank = rank + case((column.ilike(f"{term}%"), 1.0), else_=0.0)
+    return rank
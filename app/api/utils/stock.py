@@ -0,0 +1,18 @@
+import numpy as np
+
+
+def replay(
+    base: np.ndarray, delta: np.ndarray, sign: int = 1
+) -> tuple[np.ndarray, np.ndarray]:
+    """Applies ledger movements to a stock level.
+
+    ``base`` holds one (ingredient_id, cents) row per ingredient and ``delta``
+    one (ingredient_id, signed cents) row per movement; ``sign`` is -1 when
+    the movements are undone to walk back in time. Returns the ingredient ids
+    in ascending order with their stock in cents.
+    """
+    ids = np.union1d(base[:, 0], delta[:, 0])
+    cents = np.zeros(len(ids), dtype=np.int64)
+    cents[np.searchsorted(ids, base[:, 0])] = base[:, 1]
+    np.add.at(cents, np.searchsorted(ids, delta[:, 0]), sign * delta[:, 1])
+    return ids, cents
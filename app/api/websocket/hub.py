@@ -0,0 +1,150 @@
+import asyncio
+from contextlib import AbstractAsyncContextManager
+from typing import Callable, Literal
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.api.repositories import IngredientRepository
+from app.api.schemas.ingredients_schemas import IngredientReadSchema
+from app.core.databases.listener import ChannelListener
+from app.core.databases.postgres import WAREHOUSE_CHANNEL, get_session_without_depends
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+Feed = Literal["state", "warnings"]
+
+
+class Subscriber:
+    def __init__(self, feed: Feed, queue_size: int):
+        self.feed = feed
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = asyncio.Event()
+
+
+class WarehouseHub(ChannelListener):
+    """Computes the warehouse state once per change and fans it out.
+
+    Every worker LISTENs on the channel the repositories NOTIFY on commit, so
+    a change made through any worker reaches the clients of all of them.
+    """
+
+    def __init__(
+        self,
+        dsn: str = "postgresql://" + settings.get_postgres_url,
+        session_factory: Callable[
+            [], AbstractAsyncContextManager
+        ] = get_session_without_depends,
+        queue_size: int = settings.WAREHOUSE_FEED_QUEUE_SIZE,
+    ):
+        super().__init__(WAREHOUSE_CHANNEL, dsn=dsn)
+        self.__session_factory = session_factory
+        self.__queue_size = queue_size
+        self.__subscribers: set[Subscriber] = set()
+        self.__state: dict[Feed, dict[int, dict]] = {"state": {}, "warnings": {}}
+        self.__ready = asyncio.Event()
+
+    @property
+    def subscribers(self) -> int:
+        return len(self.__subscribers)
+
+    async def start(self) -> None:
+        self.__ready = asyncio.Event()
+        await super().start()
+
+    async def stop(self) -> None:
+        await super().stop()
+        for subscriber in list(self.__subscribers):
+            self.drop(subscriber)
+
+    async def wait_ready(self) -> None:
+        await self.__ready.wait()
+
+    async def handle(self) -> None:
+        await self.refresh()
+
+    async def refresh(self) -> None:
+        async with self.__session_factory() as session:
+            ingredients = await IngredientRepository(session).get_stock_levels()
+        state = {
+            ingredient.id: IngredientReadSchema.model_validate(ingredient).model_dump()
+            for ingredient in ingredients
+        }
+        current: dict[Feed, dict[int, dict]] = {
+            "state": state,
+            "warnings": {
+                key: row
+                for key, row in state.items()
+                if row["quantity"] <= row["min_threshold"]
+            },
+        }
+        for feed, rows in current.items():
+            message = self.diff(self.__state[feed], rows)
+            self.__state[feed] = rows
+            if message is not None:
+                self.publish(feed, message)
+        self.__ready.set()
+
+    @staticmethod
+    def diff(previous: dict[int, dict], current: dict[int, dict]) -> dict | None:
+        changed = [row for key, row in current.items() if previous.get(key) != row]
+        removed = [key for key in previous if key not in current]
+        if not changed and not removed:
+            return None
+        return {"type": "diff", "changed": changed, "removed": removed}
+
+    def snapshot(self, feed: Feed) -> dict:
+        return {"type": "snapshot", "items": list(self.__state[feed].values())}
+
+    def subscribe(self, feed: Feed) -> Subscriber:
+        subscriber = Subscriber(feed, self.__queue_size)
+        subscriber.queue.put_nowait(self.snapshot(feed))
+        self.__subscribers.add(subscriber)
+        return subscriber
+
+    def publish(self, feed: Feed, message: dict) -> None:
+        for subscriber in list(self.__subscribers):
+            if subscriber.feed != feed:
+                continue
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # a client this far behind would only get stale diffs
+                self.drop(subscriber)
+
+    def drop(self, subscriber: Subscriber) -> None:
+        self.__subscribers.discard(subscriber)
+        subscriber.dropped.set()
+
+    async def serve(self, websocket: WebSocket, feed: Feed) -> None:
+        await self.wait_ready()
+        subscriber = self.subscribe(feed)
+
+        async def send():
+            while True:
+                await websocket.send_json(await subscriber.queue.get())
+
+        async def receive():
+            while True:
+                await websocket.receive_text()
+
+        tasks = [
+            asyncio.create_task(send()),
+            asyncio.create_task(receive()),
+            asyncio.create_task(subscriber.dropped.wait()),
+        ]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.__subscribers.discard(subscriber)
+        if subscriber.dropped.is_set():
+            try:
+                await websocket.close(code=1013, reason="Client too slow")
+            except (RuntimeError, WebSocketDisconnect):
+                pass
+
+
+hub = WarehouseHub()
@@ -15,6 +15,6 @@ celery.conf.update(
     task_serializer="json",
     accept_content=["json"],
     result_serializer="json",
-    timezone="Asia/Tashkent",
+    timezone=settings.TIMEZONE,
     enable_utc=True,
 )
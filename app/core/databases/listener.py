@@ -0,0 +1,80 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+
+import asyncpg
+
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ChannelListener(ABC):
+    """Runs ``handle`` after NOTIFYs on a channel, once per burst of them.
+
+    The listener reconnects when its connection is lost and handles once
+    more right after, so nothing committed in between is missed.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        dsn: str = "postgresql://" + settings.get_postgres_url,
+        debounce: float = 0.1,
+        heartbeat: float = 30,
+    ):
+        self.__channel = channel
+        self.__dsn = dsn
+        self.__debounce = debounce
+        self.__heartbeat = heartbeat
+        self.__changed = asyncio.Event()
+        self.__connection: asyncpg.Connection | None = None
+        self.__task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        self.__changed = asyncio.Event()
+        self.__task = asyncio.create_task(self.__run())
+
+    async def stop(self) -> None:
+        if self.__task is not None:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+        if self.__connection is not None:
+            await self.__connection.close()
+            self.__connection = None
+
+    def changed(self, *args) -> None:
+        self.__changed.set()
+
+    @abstractmethod
+    async def handle(self) -> None: ...
+
+    async def idle(self) -> None:
+        # called when nothing was notified for a whole heartbeat
+        pass
+
+    async def __run(self) -> None:
+        while True:
+            try:
+                if self.__connection is None or self.__connection.is_closed():
+                    self.__connection = await asyncpg.connect(self.__dsn)
+                    await self.__connection.add_listener(self.__channel, self.changed)
+                    self.__changed.set()
+                try:
+                    await asyncio.wait_for(self.__changed.wait(), self.__heartbeat)
+                except asyncio.TimeoutError:
+                    await self.idle()
+                    continue
+                await asyncio.sleep(self.__debounce)
+                self.__changed.clear()
+                await self.handle()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Handling %s failed", self.__channel)
+                await asyncio.sleep(self.__heartbeat / 10)
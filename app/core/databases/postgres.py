@@ -2,6 +2,7 @@ from contextlib import asynccontextmanager
 from functools import cache
 from typing import AsyncGenerator
 
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
@@ -53,3 +54,12 @@ async def get_session_without_depends() -> AsyncGenerator[AsyncSession, None]:
             yield session
         finally:
             await session.close()
+
+
+# NOTIFY is delivered on commit and dropped on rollback
+WAREHOUSE_CHANNEL = "warehouse_changed"
+LOW_STOCK_CHANNEL = "low_stock_alerts"
+
+
+async def notify(session: AsyncSession, channel: str = WAREHOUSE_CHANNEL) -> None:
+    await session.execute(select(func.pg_notify(channel, "")))
@@ -11,7 +11,7 @@ settings = get_settings()
 @lru_cache()
 def get_redis_pool() -> redis.ConnectionPool:
     return redis.ConnectionPool.from_url(
-        settings.redis_url,
+        settings.get_redis_url,
         encoding="utf-8",
         decode_responses=True,
         max_connections=10,
@@ -24,4 +24,9 @@ async def acquire_redis() -> AsyncGenerator[redis.Redis, None]:
     try:
         yield client
     finally:
-        await client.close()
+        await client.aclose()
+
+
+async def get_redis() -> AsyncGenerator[redis.Redis, None]:
+    async with acquire_redis() as client:
+        yield client
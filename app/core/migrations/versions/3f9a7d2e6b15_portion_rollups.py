@@ -0,0 +1,55 @@
+"""portion rollups
+
+Revision ID: 3f9a7d2e6b15
+Revises: e8b24c6a1f37
+Create Date: 2026-10-18 14:12:08.774120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3f9a7d2e6b15"
+down_revision: Union[str, None] = "e8b24c6a1f37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, bucket in (
+        ("meal_portion_daily", "day"),
+        ("meal_portion_monthly", "month"),
+    ):
+        op.create_table(
+            table,
+            sa.Column(bucket, sa.Date(), nullable=False),
+            sa.Column("meal_id", sa.Integer(), nullable=False),
+            sa.Column("total_portions", sa.Integer(), nullable=False),
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["meal_id"], ["meals.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(bucket, "meal_id"),
+        )
+        op.execute(
+            f"""
+            INSERT INTO {table}
+                ({bucket}, meal_id, total_portions, created_at, updated_at)
+            SELECT CAST(date_trunc('{bucket}', served_at) AS DATE), meal_id,
+                   SUM(portion_qty), now(), now()
+            FROM meal_logs
+            GROUP BY 1, meal_id
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("meal_portion_monthly")
+    op.drop_table("meal_portion_daily")
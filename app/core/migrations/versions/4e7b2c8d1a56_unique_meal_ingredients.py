@@ -0,0 +1,46 @@
+"""unique meal ingredients
+
+Revision ID: 4e7b2c8d1a56
+Revises: 9d2a6e5b7c31
+Create Date: 2026-10-18 17:44:05.583920
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "4e7b2c8d1a56"
+down_revision: Union[str, None] = "9d2a6e5b7c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the API never added an ingredient to a meal twice; keep the newest row
+    # of anything entered around it
+    op.execute(
+        """
+        DELETE FROM meal_ingredients
+        WHERE id NOT IN (
+            SELECT max(id) FROM meal_ingredients GROUP BY meal_id, ingredient_id
+        )
+        """
+    )
+    op.create_unique_constraint(
+        "meal_ingredients_meal_id_ingredient_id_key",
+        "meal_ingredients",
+        ["meal_id", "ingredient_id"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "meal_ingredients_meal_id_ingredient_id_key",
+        "meal_ingredients",
+        type_="unique",
+    )
@@ -0,0 +1,50 @@
+"""search indexes
+
+Revision ID: 5c1e0f7b9d42
+Revises: a036375d4983
+Create Date: 2026-10-18 13:05:42.318604
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1e0f7b9d42"
+down_revision: Union[str, None] = "a036375d4983"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# the expressions must stay identical to app.api.utils.search.document
+TRIGRAM_INDEXES = {
+    "ix_meals_name_trgm": ("meals", "name"),
+    "ix_ingredients_name_trgm": ("ingredients", "name"),
+    "ix_users_first_name_trgm": ("users", "first_name"),
+    "ix_users_last_name_trgm": ("users", "last_name"),
+}
+FULL_TEXT_INDEXES = {
+    "ix_meals_name_fts": ("meals", "name"),
+    "ix_ingredients_name_fts": ("ingredients", "name"),
+    "ix_users_full_name_fts": ("users", "(first_name || ' ') || last_name"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)")
+    for name, (table, expression) in FULL_TEXT_INDEXES.items():
+        op.execute(
+            f"CREATE INDEX {name} ON {table} "
+            f"USING gin (to_tsvector('simple'::regconfig, {expression}))"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in (*FULL_TEXT_INDEXES, *TRIGRAM_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
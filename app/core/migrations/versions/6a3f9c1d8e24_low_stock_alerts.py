@@ -0,0 +1,49 @@
+"""low stock alerts
+
+Revision ID: 6a3f9c1d8e24
+Revises: 4e7b2c8d1a56
+Create Date: 2026-10-18 19:02:37.415820
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6a3f9c1d8e24"
+down_revision: Union[str, None] = "4e7b2c8d1a56"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("alerts", sa.Column("notified_at", sa.DateTime(), nullable=True))
+    # alerts raised before had their emails sent by the scan job
+    op.execute("UPDATE alerts SET notified_at = created_at")
+    op.execute(
+        """
+        UPDATE alerts SET is_resolved = true, resolved_at = now()
+        WHERE NOT is_resolved AND alert_type = 'low_stock' AND id NOT IN (
+            SELECT max(id) FROM alerts
+            WHERE NOT is_resolved AND alert_type = 'low_stock'
+            GROUP BY ingredient_id
+        )
+        """
+    )
+    op.create_index(
+        "uq_alerts_open_low_stock",
+        "alerts",
+        ["ingredient_id"],
+        unique=True,
+        postgresql_where=sa.text("NOT is_resolved AND alert_type = 'low_stock'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_alerts_open_low_stock", table_name="alerts")
+    op.drop_column("alerts", "notified_at")
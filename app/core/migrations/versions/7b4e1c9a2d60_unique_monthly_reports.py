@@ -0,0 +1,43 @@
+"""unique monthly reports
+
+Revision ID: 7b4e1c9a2d60
+Revises: 3f9a7d2e6b15
+Create Date: 2026-10-18 15:02:51.406218
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7b4e1c9a2d60"
+down_revision: Union[str, None] = "3f9a7d2e6b15"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # nothing wrote reports before, but keep the newest row of any duplicate
+    op.execute(
+        """
+        DELETE FROM reports
+        WHERE id NOT IN (
+            SELECT max(id) FROM reports GROUP BY report_year, report_month
+        )
+        """
+    )
+    op.create_unique_constraint(
+        "reports_report_year_report_month_key",
+        "reports",
+        ["report_year", "report_month"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint(
+        "reports_report_year_report_month_key", "reports", type_="unique"
+    )
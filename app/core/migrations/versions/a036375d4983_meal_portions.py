@@ -0,0 +1,61 @@
+"""meal portions
+
+Revision ID: a036375d4983
+Revises: bd7f7b2ffd0f
+Create Date: 2026-10-18 12:40:11.204917
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a036375d4983"
+down_revision: Union[str, None] = "bd7f7b2ffd0f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "meal_portions",
+        sa.Column("meal_id", sa.Integer(), nullable=False),
+        sa.Column("portion_count", sa.Integer(), nullable=False),
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["meal_id"], ["meals.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("meal_id"),
+    )
+    op.create_index(
+        op.f("ix_meal_portions_portion_count"),
+        "meal_portions",
+        ["portion_count"],
+        unique=False,
+    )
+    op.execute(
+        """
+        INSERT INTO meal_portions (meal_id, portion_count, created_at, updated_at)
+        SELECT meals.id, COALESCE(possible.portion_count, 0), now(), now()
+        FROM meals
+        LEFT JOIN (
+            SELECT meal_ingredients.meal_id,
+                   MIN(FLOOR(ingredients.quantity / meal_ingredients.required_qty))
+                       AS portion_count
+            FROM meal_ingredients
+            JOIN ingredients ON ingredients.id = meal_ingredients.ingredient_id
+            GROUP BY meal_ingredients.meal_id
+        ) AS possible ON possible.meal_id = meals.id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_meal_portions_portion_count"), table_name="meal_portions")
+    op.drop_table("meal_portions")
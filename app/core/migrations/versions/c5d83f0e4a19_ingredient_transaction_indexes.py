@@ -0,0 +1,56 @@
+"""ingredient transaction indexes
+
+Revision ID: c5d83f0e4a19
+Revises: 7b4e1c9a2d60
+Create Date: 2026-10-18 16:21:13.904452
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d83f0e4a19"
+down_revision: Union[str, None] = "7b4e1c9a2d60"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_ingredient_transactions_ingredient_id_happened_at",
+        "ingredient_transactions",
+        ["ingredient_id", "happened_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_ingredient_transactions_happened_at",
+        "ingredient_transactions",
+        ["happened_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_ingredient_transactions_reference_id",
+        "ingredient_transactions",
+        ["reference_id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_ingredient_transactions_reference_id",
+        table_name="ingredient_transactions",
+    )
+    op.drop_index(
+        "ix_ingredient_transactions_happened_at",
+        table_name="ingredient_transactions",
+    )
+    op.drop_index(
+        "ix_ingredient_transactions_ingredient_id_happened_at",
+        table_name="ingredient_transactions",
+    )
@@ -0,0 +1,40 @@
+"""meal log indexes
+
+Revision ID: e8b24c6a1f37
+Revises: 5c1e0f7b9d42
+Create Date: 2026-10-18 13:40:27.551093
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e8b24c6a1f37"
+down_revision: Union[str, None] = "5c1e0f7b9d42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_meal_logs_meal_id_served_at",
+        "meal_logs",
+        ["meal_id", "served_at"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_meal_logs_user_id_served_at",
+        "meal_logs",
+        ["user_id", "served_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_meal_logs_user_id_served_at", table_name="meal_logs")
+    op.drop_index("ix_meal_logs_meal_id_served_at", table_name="meal_logs")
@@ -1,4 +1,6 @@
 from functools import cache
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -41,6 +43,30 @@ class Settings(BaseSettings):
     EMAIL: str
     SMTP_PORT: int
     SMTP_SERVER: str
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT: float = 30
+
+    # MAIL DELIVERY: "inline" sends from the API process, "celery" hands
+    # messages to the worker and "file" writes them to MAIL_FILE_DIR
+    MAIL_BACKEND: Literal["inline", "celery", "file"] = "celery"
+    MAIL_CONCURRENCY: int = 4
+    MAIL_FILE_DIR: str = "media/mail"
+    # templates fall back to this locale when a variant is missing
+    MAIL_LOCALE: str = "en"
+
+    # OTP CODES: "redis" keeps them under a TTL, "postgres" in user_otp rows
+    OTP_BACKEND: Literal["redis", "postgres"] = "redis"
+    OTP_TTL: int = 300
+    # codes sent per user per window, wrong guesses per code
+    OTP_SEND_LIMIT: int = 5
+    OTP_SEND_WINDOW: int = 3600
+    OTP_ATTEMPT_LIMIT: int = 5
+
+    # WEBSOCKET FEEDS
+    WAREHOUSE_FEED_QUEUE_SIZE: int = 32
+
+    # LOCALE
+    TIMEZONE: str = "Asia/Tashkent"
 
     model_config = SettingsConfigDict(env_file=".env")
 
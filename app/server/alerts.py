@@ -0,0 +1,65 @@
+import logging
+import time
+from contextlib import AbstractAsyncContextManager
+from typing import Awaitable, Callable
+
+from app.api.repositories import AlertsRepository, UserRepository
+from app.api.tasks.backends import get_mail_backend
+from app.core.databases.listener import ChannelListener
+from app.core.databases.postgres import LOW_STOCK_CHANNEL, get_session_without_depends
+from app.core.settings import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class LowStockDispatcher(ChannelListener):
+    """Sends one digest per recipient for the low-stock alerts not yet sent.
+
+    Woken by the NOTIFY of the transaction that opened the alerts; quiet
+    heartbeats retry anything a failed round left unsent.
+    """
+
+    def __init__(
+        self,
+        dsn: str = "postgresql://" + settings.get_postgres_url,
+        session_factory: Callable[
+            [], AbstractAsyncContextManager
+        ] = get_session_without_depends,
+        send: Callable[[str, list[str]], Awaitable[None]] | None = None,
+    ):
+        super().__init__(LOW_STOCK_CHANNEL, dsn=dsn)
+        self.__session_factory = session_factory
+        self.__send = send or (
+            lambda email, names: get_mail_backend().send("warnings", email, names)
+        )
+
+    async def handle(self) -> None:
+        await self.dispatch()
+
+    async def idle(self) -> None:
+        await self.dispatch()
+
+    async def dispatch(self) -> int:
+        started = time.perf_counter()
+        async with self.__session_factory() as session:
+            alerts = await AlertsRepository(session).claim_undelivered()
+            if not alerts:
+                await session.rollback()
+                return 0
+            names = [name for _, name in alerts]
+            recipients = await UserRepository(session).get_admin_users()
+            # if a send fails the claim rolls back and the next round retries
+            for user in recipients:
+                await self.__send(user.email, names)
+            await session.commit()
+        logger.info(
+            "Sent %d low-stock alerts to %d recipients in %.3fs",
+            len(alerts),
+            len(recipients),
+            time.perf_counter() - started,
+        )
+        return len(alerts)
+
+
+dispatcher = LowStockDispatcher()
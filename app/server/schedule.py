@@ -1,10 +1,16 @@
 import logging
+import time
+from datetime import date, datetime
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.triggers.cron import CronTrigger
 
-from app.api.routers.ingredients_router import low_stock_ingredients
+from app.api.repositories import ReportRepository, StockSnapshotRepository
+from app.api.tasks.backends import get_mail_backend
+from app.api.websocket.hub import hub
+from app.server.alerts import dispatcher
+from app.core.databases.postgres import get_session_without_depends
 from app.core.settings import get_settings
 
 logging.basicConfig(level=logging.INFO)
@@ -14,21 +20,64 @@ settings = get_settings()
 scheduler = AsyncIOScheduler()
 
 
+async def monthly_reports():
+    started = time.perf_counter()
+    async with get_session_without_depends() as session:
+        reports = await ReportRepository(session).generate_reports(until=date.today())
+    logger.info(
+        "Generated %d monthly reports in %.3fs",
+        len(reports),
+        time.perf_counter() - started,
+    )
+
+
+async def stock_snapshot():
+    # taken at the last UTC midnight, a few minutes late, so that every
+    # movement before it has been committed
+    taken_at = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    started = time.perf_counter()
+    async with get_session_without_depends() as session:
+        rows = await StockSnapshotRepository(session).take_snapshot(taken_at)
+    logger.info(
+        "Stored the %s stock snapshot of %d ingredients in %.3fs",
+        taken_at.date(),
+        rows,
+        time.perf_counter() - started,
+    )
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # months that already have a report are skipped, so the startup run only
+    # catches up on what was missed while the server was down
+    scheduler.add_job(
+        monthly_reports,
+        trigger=CronTrigger(day=1, hour=0, minute=30),
+        id="monthly_reports",
+        replace_existing=True,
+        next_run_time=datetime.now(),
+        misfire_grace_time=60 * 60,
+        coalesce=True,
+        max_instances=1,
+    )
     scheduler.add_job(
-        low_stock_ingredients,
-        trigger=IntervalTrigger(seconds=60 * 60 * 3),
-        id="low_stock_every_minute",
+        stock_snapshot,
+        trigger=CronTrigger(hour=0, minute=10, timezone="UTC"),
+        id="stock_snapshot",
         replace_existing=True,
-        misfire_grace_time=30,
+        misfire_grace_time=60 * 60,
         coalesce=True,
         max_instances=1,
     )
     logger.info("Starting scheduler…")
     scheduler.start()
+    await hub.start()
+    await dispatcher.start()
 
     yield
 
+    await dispatcher.stop()
+    await hub.stop()
+    await get_mail_backend().close()
     logger.info("Shutting down scheduler…")
     scheduler.shutdown()
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from uuid import uuid4
+
+import typer
+from sqlalchemy import delete
+from typer import echo
+
+from app.api.controllers import ImportController
+from app.api.models import Ingredient, Meal, Unit
+from app.api.repositories import ImportRepository
+from app.api.schemas.import_schemas import ImportSchema
+from app.core.databases.postgres import get_session_without_depends
+
+app = typer.Typer()
+
+
+def build(prefix: str, rows: int, units: int) -> ImportSchema:
+    # a tenth of the rows are meals, each using ten ingredients
+    meals = max(rows // 10, 1)
+    return ImportSchema(
+        units=[
+            {"code": f"{prefix[-6:]}{i}", "description": "benchmark"}
+            for i in range(units)
+        ],
+        ingredients=[
+            {
+                "name": f"{prefix} ingredient {i}",
+                "unit": f"{prefix[-6:]}{i % units}",
+                "min_threshold": i % 50,
+            }
+            for i in range(rows)
+        ],
+        meals=[{"name": f"{prefix} meal {i}"} for i in range(meals)],
+        recipes=[
+            {
+                "meal": f"{prefix} meal {i}",
+                "ingredient": f"{prefix} ingredient {(i * 10 + j) % rows}",
+                "required_qty": j + 1,
+            }
+            for i in range(meals)
+            for j in range(10)
+        ],
+    )
+
+
+async def import_once(payload: ImportSchema) -> float:
+    async with get_session_without_depends() as session:
+        started = time.perf_counter()
+        await ImportController(ImportRepository(session)).import_data(payload)
+        return time.perf_counter() - started
+
+
+async def drop(prefix: str) -> None:
+    # recipes and stored portions go with their meals
+    async with get_session_without_depends() as session:
+        await session.execute(delete(Meal).where(Meal.name.startswith(f"{prefix} ")))
+        await session.execute(
+            delete(Ingredient).where(Ingredient.name.startswith(f"{prefix} "))
+        )
+        await session.execute(delete(Unit).where(Unit.code.startswith(prefix[-6:])))
+        await session.commit()
+
+
+async def run(rows: int, units: int) -> None:
+    prefix = f"import-{uuid4().hex[:8]}"
+    payload = build(prefix, rows, units)
+    try:
+        created = await import_once(payload)
+        updated = await import_once(payload)
+        total = sum(len(section) for section in payload.model_dump().values())
+        echo(f"rows: {total} ({rows} ingredients)")
+        echo(f"insert: {created:.3f}s, update: {updated:.3f}s")
+    finally:
+        await drop(prefix)
+
+
+@app.command(help="Time a bulk import of ingredients, meals and recipes.")
+def main(
+    rows: int = typer.Option(10_000, help="Number of ingredients to import."),
+    units: int = typer.Option(20, help="Number of units to import."),
+):
+    asyncio.run(run(rows, units))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,105 @@
+import asyncio
+import resource
+import time
+from uuid import uuid4
+
+import typer
+from sqlalchemy import delete, text
+from typer import echo, style
+
+from app.api.controllers import ExportController
+from app.api.models import Meal, MealLog, User
+from app.api.schemas.export_schema import ExportQuery
+from app.core.databases.postgres import get_session_without_depends
+
+app = typer.Typer()
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed(rows: int) -> tuple[int, int]:
+    suffix = uuid4().hex[:8]
+    async with get_session_without_depends() as session:
+        user = User(
+            first_name="Export",
+            last_name="Benchmark",
+            email=f"export-{suffix}@example.com",
+            password="-",
+            role_id=3,
+            is_active=True,
+        )
+        meal = Meal(name=f"export-meal-{suffix}")
+        session.add_all([user, meal])
+        await session.flush()
+        await session.execute(
+            text(
+                """
+                INSERT INTO meal_logs
+                    (meal_id, user_id, portion_qty, served_at, created_at, updated_at)
+                SELECT :meal_id, :user_id, 1 + i % 5,
+                       now() - make_interval(secs => i), now(), now()
+                FROM generate_series(1, :rows) AS i
+                """
+            ),
+            {"meal_id": meal.id, "user_id": user.id, "rows": rows},
+        )
+        await session.commit()
+        return meal.id, user.id
+
+
+async def drop(meal_id: int, user_id: int) -> None:
+    async with get_session_without_depends() as session:
+        await session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+        await session.execute(delete(Meal).where(Meal.id == meal_id))
+        await session.execute(delete(User).where(User.id == user_id))
+        await session.commit()
+
+
+async def export(fmt: str) -> tuple[int, float, float]:
+    response = await ExportController().export("meal_logs", ExportQuery(format=fmt))
+    size, started = 0, time.perf_counter()
+    async for chunk in response.body_iterator:
+        size += len(chunk)
+    return size, time.perf_counter() - started, peak_rss_mb()
+
+
+async def run(rows: int, formats: list[str], budget: float) -> bool:
+    echo(f"seeding {rows} meal logs…")
+    meal_id, user_id = await seed(rows)
+    baseline = peak_rss_mb()
+    within = True
+    try:
+        echo(
+            f"{'format':<10}{'MB out':>10}{'seconds':>10}{'rows/s':>12}{'peak RSS':>10}"
+        )
+        for fmt in formats:
+            size, elapsed, peak = await export(fmt)
+            within = within and peak - baseline <= budget
+            echo(
+                f"{fmt:<10}{size / 2**20:>10.1f}{elapsed:>10.1f}"
+                f"{rows / elapsed:>12.0f}{peak:>10.1f}"
+            )
+    finally:
+        await drop(meal_id, user_id)
+    echo(f"baseline RSS {baseline:.1f} MB, budget +{budget:.0f} MB")
+    return within
+
+
+@app.command(help="Export meal logs and check the peak RSS stays within budget.")
+def main(
+    rows: int = typer.Option(10_000_000, help="Meal logs to seed."),
+    fmt: list[str] = typer.Option(["csv", "parquet"], "--format"),
+    budget: float = typer.Option(
+        200, help="Allowed peak RSS growth over the baseline, in MB."
+    ),
+):
+    if not asyncio.run(run(rows, fmt, budget)):
+        echo(style("Peak RSS exceeded the budget.", fg=typer.colors.RED, bold=True))
+        raise typer.Exit(1)
+    echo(style("Peak RSS within budget.", fg=typer.colors.GREEN, bold=True))
+
+
+if __name__ == "__main__":
+    app()
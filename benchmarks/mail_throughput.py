@@ -0,0 +1,73 @@
+import asyncio
+import socket
+import time
+
+import typer
+from aiosmtpd.controller import Controller
+from typer import echo
+
+from app.api.tasks.mailer import SMTPMailer
+from app.api.tasks.messages import warnings_message
+
+app = typer.Typer()
+
+
+class Counter:
+    def __init__(self):
+        self.received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+async def measure(
+    controller: Controller, messages: int, pooled: bool, concurrency: int
+) -> float:
+    names = [f"ingredient {i}" for i in range(10)]
+    mailer = SMTPMailer(
+        controller.hostname, controller.port, starttls=False, concurrency=concurrency
+    )
+
+    async def send(i: int) -> None:
+        await mailer.send(warnings_message(f"admin{i}@example.com", names))
+        if not pooled:
+            # what every task did before: connect, send, quit
+            await mailer.close()
+
+    started = time.perf_counter()
+    if pooled:
+        await asyncio.gather(*(send(i) for i in range(messages)))
+    else:
+        for i in range(messages):
+            await send(i)
+    await mailer.close()
+    return messages / (time.perf_counter() - started)
+
+
+@app.command(help="Measure digest delivery throughput against a local SMTP sink.")
+def main(
+    messages: int = typer.Option(2000, help="Digests to send per run."),
+    concurrency: int = typer.Option(4, help="Pooled connections."),
+):
+    counter = Counter()
+    controller = Controller(counter, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        per_message = asyncio.run(measure(controller, messages, False, 1))
+        pooled = asyncio.run(measure(controller, messages, True, concurrency))
+    finally:
+        controller.stop()
+    echo(f"messages: {messages} per run, {counter.received} received")
+    echo(f"connection per message: {per_message:.0f} msg/s")
+    echo(f"pooled, {concurrency} connections: {pooled:.0f} msg/s")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,104 @@
+import asyncio
+import smtplib
+import socket
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import typer
+from aiosmtpd.controller import Controller
+from typer import echo
+
+from app.api.tasks.backends import InlineBackend
+from app.api.tasks.mailer import SMTPMailer
+from app.api.tasks.messages import verification_message
+
+app = typer.Typer()
+
+
+class SlowSink:
+    # records when each recipient's message arrived, after a simulated delay
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received: dict[str, float] = {}
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        for recipient in envelope.rcpt_tos:
+            self.received[recipient] = time.perf_counter()
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def report(name: str, sink: SlowSink, started: float, emails: list[str]) -> None:
+    latencies = sorted((sink.received[email] - started) * 1000 for email in emails)
+    echo(
+        f"{name:<26}"
+        f"{statistics.median(latencies):>9.0f}"
+        f"{latencies[int(len(latencies) * 0.95) - 1]:>9.0f}"
+        f"{latencies[-1]:>9.0f}"
+    )
+
+
+def blocking_worker(host: str, port: int, email: str, code: int) -> None:
+    # the task body before pooling: a connection per message
+    with smtplib.SMTP(host, port) as server:
+        server.send_message(verification_message(email, code))
+
+
+def celery_like(controller: Controller, emails: list[str], workers: int) -> float:
+    started = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        for code, email in enumerate(emails):
+            pool.submit(
+                blocking_worker, controller.hostname, controller.port, email, code
+            )
+    return started
+
+
+async def inline(controller: Controller, emails: list[str], concurrency: int) -> float:
+    backend = InlineBackend(
+        SMTPMailer(
+            controller.hostname,
+            controller.port,
+            starttls=False,
+            concurrency=concurrency,
+        )
+    )
+    started = time.perf_counter()
+    for code, email in enumerate(emails):
+        backend.submit("verification", email, code)
+    await backend.close()
+    return started
+
+
+@app.command(help="Measure OTP delivery latency for a burst of registrations.")
+def main(
+    registrations: int = typer.Option(500, help="Registrations in the burst."),
+    concurrency: int = typer.Option(8, help="MAIL_CONCURRENCY of the inline path."),
+    workers: int = typer.Option(2, help="Celery worker concurrency to compare."),
+    delay: float = typer.Option(0.02, help="Seconds the SMTP server takes per DATA."),
+):
+    sink = SlowSink(delay)
+    controller = Controller(sink, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    try:
+        echo(f"registrations: {registrations}, smtp delay: {delay * 1000:.0f}ms")
+        echo(f"{'delivery latency in ms':<26}{'p50':>9}{'p95':>9}{'max':>9}")
+        emails = [f"worker{i}@example.com" for i in range(registrations)]
+        started = celery_like(controller, emails, workers)
+        report(f"blocking, {workers} workers", sink, started, emails)
+        emails = [f"inline{i}@example.com" for i in range(registrations)]
+        started = asyncio.run(inline(controller, emails, concurrency))
+        report(f"inline async, {concurrency} conns", sink, started, emails)
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    app()
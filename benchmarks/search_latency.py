@@ -0,0 +1,112 @@
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+import typer
+from sqlalchemy import delete, text
+from typer import echo
+
+from app.api.models import Ingredient, Unit
+from app.api.repositories import IngredientRepository
+from app.api.schemas.ingredients_schemas import IngredientListQuery
+from app.core.databases.postgres import get_session_without_depends
+
+app = typer.Typer()
+
+WORDS = [
+    "tomato",
+    "onion",
+    "carrot",
+    "rice",
+    "beef",
+    "mutton",
+    "chickpea",
+    "garlic",
+    "pepper",
+    "cumin",
+    "raisin",
+    "quince",
+]
+SEQUENTIAL = (
+    "SET enable_indexscan = off",
+    "SET enable_bitmapscan = off",
+)
+
+
+async def seed(rows: int) -> tuple[int, str]:
+    prefix = f"search-{uuid4().hex[:8]}"
+    async with get_session_without_depends() as session:
+        unit = Unit(code=f"s{prefix[-8:]}", description="benchmark")
+        session.add(unit)
+        await session.flush()
+        await session.execute(
+            text(
+                """
+                INSERT INTO ingredients
+                    (name, unit_id, quantity, min_threshold, created_at, updated_at)
+                SELECT words[1 + i % cardinality(words)] || ' '
+                           || words[1 + (i / 7) % cardinality(words)] || ' '
+                           || CAST(:prefix AS text) || '-' || i,
+                       :unit_id, 0, 0, now(), now()
+                FROM generate_series(1, :rows) AS i,
+                     CAST(:words AS text[]) AS words
+                """
+            ),
+            {"words": WORDS, "prefix": prefix, "unit_id": unit.id, "rows": rows},
+        )
+        await session.commit()
+        await session.execute(text("ANALYZE ingredients"))
+        return unit.id, prefix
+
+
+async def drop(unit_id: int) -> None:
+    async with get_session_without_depends() as session:
+        await session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+        await session.execute(delete(Unit).where(Unit.id == unit_id))
+        await session.commit()
+
+
+async def measure(payload: IngredientListQuery, repeat: int, indexed: bool) -> float:
+    async with get_session_without_depends() as session:
+        if not indexed:
+            for statement in SEQUENTIAL:
+                await session.execute(text(statement))
+        repository = IngredientRepository(session)
+        await repository.get_all_ingredients(payload)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            await repository.get_all_ingredients(payload)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+
+async def run(rows: int, repeat: int, terms: list[str]) -> None:
+    unit_id, prefix = await seed(rows)
+    try:
+        echo(f"rows: {rows}, repeat: {repeat}, median latency in ms")
+        echo(f"{'search':<28}{'sort':<12}{'indexed':>10}{'seq scan':>10}")
+        for term in [*terms, f"{prefix}-{rows // 2}"]:
+            for sort in ("id", "relevance"):
+                payload = IngredientListQuery(search=term, size=20, sort=sort)
+                indexed = await measure(payload, repeat, indexed=True)
+                sequential = await measure(payload, repeat, indexed=False)
+                echo(f"{term:<28}{sort:<12}{indexed:>10.2f}{sequential:>10.2f}")
+    finally:
+        await drop(unit_id)
+
+
+@app.command(help="Compare search latency with and without the search indexes.")
+def main(
+    rows: int = typer.Option(100_000, help="Number of ingredients to seed."),
+    repeat: int = typer.Option(20, help="Runs per measurement."),
+    term: list[str] = typer.Option(
+        ["quince", "rice beef", "pepp"], help="Search terms to measure."
+    ),
+):
+    asyncio.run(run(rows, repeat, term))
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,158 @@
+import asyncio
+import time
+from decimal import Decimal
+from uuid import uuid4
+
+import typer
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from typer import echo, style
+
+from app.api.controllers import MealController
+from app.api.models import (
+    Ingredient,
+    Meal,
+    MealIngredient,
+    MealLog,
+    Role,
+    Unit,
+    User,
+)
+from app.api.repositories import IngredientRepository, MealRepository
+from app.api.schemas.meal_schemas import PortionQty
+from app.core.databases.postgres import get_session_without_depends
+
+app = typer.Typer()
+
+
+async def create_fixtures(stock: Decimal, required_qty: Decimal) -> dict[str, int]:
+    suffix = uuid4().hex[:8]
+    async with get_session_without_depends() as session:
+        unit = Unit(code=f"b{suffix}", description="benchmark")
+        # a role of its own, since the ids of the seeded roles vary
+        role = Role(name=f"stress-{suffix}")
+        meal = Meal(name=f"stress-meal-{suffix}")
+        session.add_all([unit, role, meal])
+        await session.flush()
+        user = User(
+            first_name="Stress",
+            last_name="Benchmark",
+            email=f"stress-{suffix}@example.com",
+            password="-",
+            role_id=role.id,
+            is_active=True,
+        )
+        ingredients = [
+            Ingredient(name=f"stress-{suffix}-{i}", unit_id=unit.id, quantity=stock)
+            for i in range(3)
+        ]
+        session.add_all([user, *ingredients])
+        await session.flush()
+        session.add_all(
+            MealIngredient(
+                meal_id=meal.id, ingredient_id=ingredient.id, required_qty=required_qty
+            )
+            for ingredient in ingredients
+        )
+        await session.commit()
+        return {
+            "unit_id": unit.id,
+            "role_id": role.id,
+            "user_id": user.id,
+            "meal_id": meal.id,
+        }
+
+
+async def drop_fixtures(fixtures: dict[str, int]) -> None:
+    async with get_session_without_depends() as session:
+        await session.execute(
+            delete(MealLog).where(MealLog.meal_id == fixtures["meal_id"])
+        )
+        await session.execute(delete(Meal).where(Meal.id == fixtures["meal_id"]))
+        await session.execute(
+            delete(Ingredient).where(Ingredient.unit_id == fixtures["unit_id"])
+        )
+        await session.execute(delete(Unit).where(Unit.id == fixtures["unit_id"]))
+        await session.execute(delete(User).where(User.id == fixtures["user_id"]))
+        await session.execute(delete(Role).where(Role.id == fixtures["role_id"]))
+        await session.commit()
+
+
+async def serve_once(meal_id: int, user_id: int, portion_qty: int) -> bool:
+    async with get_session_without_depends() as session:
+        controller = MealController(
+            meal_repository=MealRepository(session),
+            ingredient_repository=IngredientRepository(session),
+        )
+        try:
+            await controller.serve_meal(
+                user_id=user_id,
+                meal_id=meal_id,
+                payload=PortionQty(portion_qty=portion_qty),
+            )
+        except HTTPException:
+            return False
+        return True
+
+
+async def run(requests: int, portion_qty: int, stock: Decimal) -> bool:
+    required_qty = Decimal("0.25")
+    fixtures = await create_fixtures(stock, required_qty)
+    try:
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                serve_once(fixtures["meal_id"], fixtures["user_id"], portion_qty)
+                for _ in range(requests)
+            )
+        )
+        elapsed = time.perf_counter() - started
+
+        served = sum(results)
+        async with get_session_without_depends() as session:
+            rows = await MealRepository(session).get_meal_ingredients_with_stock(
+                fixtures["meal_id"]
+            )
+            logged = (
+                await session.execute(
+                    select(func.count()).where(MealLog.meal_id == fixtures["meal_id"])
+                )
+            ).scalar_one()
+        expected = stock - served * portion_qty * required_qty
+        quantities = [ingredient.quantity for _, ingredient in rows]
+
+        echo(f"requests:  {requests}")
+        echo(f"served:    {served}")
+        echo(f"rejected:  {requests - served}")
+        echo(f"elapsed:   {elapsed:.2f}s ({requests / elapsed:.0f} req/s)")
+        echo(f"expected:  {expected}")
+        echo(f"final:     {', '.join(str(q) for q in quantities)}")
+        ok = (
+            all(q == expected for q in quantities)
+            and expected >= 0
+            and logged == served
+        )
+        echo(
+            style("exact", fg=typer.colors.GREEN, bold=True)
+            if ok
+            else style("MISMATCH", fg=typer.colors.RED, bold=True)
+        )
+        return ok
+    finally:
+        await drop_fixtures(fixtures)
+
+
+@app.command(help="Fire parallel serve requests at one meal and verify stock.")
+def main(
+    requests: int = typer.Option(300, help="Number of parallel serve requests."),
+    portion_qty: int = typer.Option(2, help="Portions per request."),
+    stock: str = typer.Option(
+        "100", help="Initial quantity of every ingredient of the meal."
+    ),
+):
+    if not asyncio.run(run(requests, portion_qty, Decimal(stock))):
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,54 @@
+import time
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from html import escape
+
+import typer
+from typer import echo
+
+from app.api.tasks.email_template import EMAIL_TEMPLATE_FOR_WARNINGS
+from app.api.tasks.messages import warnings_message
+
+app = typer.Typer()
+
+
+def replace_message(email: str, product_names: list[str]) -> bytes:
+    # what every digest did before: replace on the raw template, then build
+    # and serialize a fresh MIME tree
+    html_body = EMAIL_TEMPLATE_FOR_WARNINGS.replace(
+        "{{PRODUCT_NAME}}", ", ".join(escape(name) for name in product_names)
+    ).replace("{{EMAIL}}", escape(email))
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = f"⚠️ Low Stock Alert: {len(product_names)} ingredients"
+    msg["From"] = "warehouse@example.com"
+    msg["To"] = email
+    msg.attach(MIMEText(html_body, "html"))
+    return msg.as_bytes()
+
+
+def compiled_message(email: str, product_names: list[str]) -> bytes:
+    return warnings_message(email, product_names).data
+
+
+def measure(render, recipients: int, names: list[str]) -> float:
+    started = time.perf_counter()
+    for i in range(recipients):
+        render(f"admin{i}@example.com", names)
+    return (time.perf_counter() - started) / recipients * 1e6
+
+
+@app.command()
+def main(
+    recipients: int = typer.Option(10000, help="Digests to render."),
+    ingredients: int = typer.Option(10, help="Ingredients named in each digest."),
+):
+    names = [f"ingredient {i}" for i in range(ingredients)]
+    before = measure(replace_message, recipients, names)
+    after = measure(compiled_message, recipients, names)
+    echo(f"recipients: {recipients}, ingredients per digest: {ingredients}")
+    echo(f"replace + MIME tree: {before:.1f} µs per message")
+    echo(f"compiled template:   {after:.1f} µs per message ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    app()
@@ -1,10 +1,25 @@
 import asyncio
+import csv
+import json
+import time
+from datetime import date, datetime
+from pathlib import Path
+from typing import Optional
 
 import typer
+from fastapi import HTTPException
 from typer import Typer, echo, style
 import re
 from app.core.databases.postgres import get_session_without_depends
 from app.api.models import User
+from app.api.controllers import ImportController
+from app.api.repositories import (
+    ImportRepository,
+    PortionCalculationRepository,
+    PortionRollupRepository,
+    ReportRepository,
+)
+from app.api.schemas.import_schemas import ImportSchema
 from sqlalchemy.future import select
 from app.core.utils.security import security
 
@@ -117,5 +132,124 @@ def allsuperusers():
             )
 
 
+@app.command(help="Recompute the stored possible portions of every meal.")
+def refreshportions():
+    async def refresh():
+        async with get_session_without_depends() as session:
+            await PortionCalculationRepository(session).rebuild_portions()
+
+    event_loop.run_until_complete(refresh())
+    echo(style("Meal portions refreshed.", fg=typer.colors.GREEN, bold=True))
+
+
+@app.command(help="Recompute the daily and monthly portion rollups from meal logs.")
+def rebuildrollups(
+    since: Optional[datetime] = typer.Option(
+        None, formats=["%Y-%m-%d"], help="First day to rebuild, all history if empty."
+    ),
+):
+    async def rebuild():
+        async with get_session_without_depends() as session:
+            await PortionRollupRepository(session).rebuild(
+                since.date() if since else None
+            )
+
+    event_loop.run_until_complete(rebuild())
+    echo(style("Portion rollups rebuilt.", fg=typer.colors.GREEN, bold=True))
+
+
+@app.command(help="Store the monthly reports of every complete month without one.")
+def generatereports(
+    since: Optional[datetime] = typer.Option(
+        None,
+        formats=["%Y-%m"],
+        help="First month to backfill, the first served month if empty.",
+    ),
+):
+    async def generate():
+        async with get_session_without_depends() as session:
+            return await ReportRepository(session).generate_reports(
+                until=date.today(), since=since.date() if since else None
+            )
+
+    started = time.perf_counter()
+    reports = event_loop.run_until_complete(generate())
+    elapsed = time.perf_counter() - started
+    for report in reports:
+        echo(
+            style(
+                f"{report.report_year}-{report.report_month:02d}: "
+                f"served {report.total_served_portions}, "
+                f"possible {report.possible_served_portions}, "
+                f"difference {report.difference_percentage}%",
+                fg=typer.colors.BLUE,
+            )
+        )
+    echo(
+        style(
+            f"Generated {len(reports)} reports in {elapsed:.3f}s.",
+            fg=typer.colors.GREEN,
+            bold=True,
+        )
+    )
+
+
+@app.command(
+    "import",
+    help="Create or update units, ingredients, meals and recipes from a file.",
+)
+def import_data(
+    path: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="JSON file, or CSV with --section."
+    ),
+    section: Optional[str] = typer.Option(
+        None, help="Section the rows of a CSV file belong to, e.g. ingredients."
+    ),
+):
+    if path.suffix.lower() == ".csv":
+        if section not in ImportSchema.model_fields:
+            raise typer.BadParameter(
+                f"CSV files need --section, one of {', '.join(ImportSchema.model_fields)}."
+            )
+        with path.open(encoding="utf-8-sig", newline="") as file:
+            # empty cells fall back to the column defaults
+            rows = [
+                {key: value for key, value in row.items() if value != ""}
+                for row in csv.DictReader(file)
+            ]
+        payload = ImportSchema(**{section: rows})
+    else:
+        payload = ImportSchema.model_validate(json.loads(path.read_text()))
+
+    async def run():
+        async with get_session_without_depends() as session:
+            return await ImportController(ImportRepository(session)).import_data(
+                payload
+            )
+
+    started = time.perf_counter()
+    try:
+        counts = event_loop.run_until_complete(run())
+    except HTTPException as error:
+        echo(style(error.detail["message"], fg=typer.colors.RED, bold=True))
+        for row in error.detail["errors"]:
+            echo(
+                style(
+                    f"{row['section']} row {row['row']}: {'; '.join(row['errors'])}",
+                    fg=typer.colors.RED,
+                )
+            )
+        raise typer.Exit(1)
+    elapsed = time.perf_counter() - started
+    echo(
+        style(
+            f"Imported {counts.units} units, {counts.ingredients} ingredients, "
+            f"{counts.meals} meals and {counts.recipes} recipes in {elapsed:.3f}s.",
+            fg=typer.colors.GREEN,
+            bold=True,
+        )
+    )
+
+
 if __name__ == "__main__":
     app()
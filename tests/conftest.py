@@ -1,6 +1,8 @@
 import pytest
+import pytest_asyncio
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from fastapi.testclient import TestClient
 from app.api.models import *
 from app.core.models.base import BaseModel
@@ -51,6 +53,19 @@ def create_roles(db_session):
     db_session.commit()
 
 
+@pytest_asyncio.fixture
+async def async_session():
+    async_engine = create_async_engine(
+        "postgresql+asyncpg://" + settings.get_test_database_url
+    )
+    session_maker = async_sessionmaker(
+        bind=async_engine, autoflush=False, expire_on_commit=False
+    )
+    async with session_maker() as session:
+        yield session
+    await async_engine.dispose()
+
+
 @pytest.fixture(scope="session")
 def http_client():
     app = get_app()
@@ -0,0 +1,89 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pyarrow.parquet as pq
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete
+
+from app.api.models import Meal, MealLog, Role, User
+from app.api.repositories import ExportRepository
+from app.api.utils.export import csv_chunks, parquet_chunks
+
+START = datetime(2021, 6, 1, 8, 30)
+
+
+@pytest_asyncio.fixture
+async def exported_logs(async_session):
+    suffix = uuid4().hex[:8]
+    role = Role(name=f"role-{suffix}")
+    meal = Meal(name=f"export-{suffix}")
+    async_session.add_all([role, meal])
+    await async_session.flush()
+    user = User(
+        first_name="Export",
+        last_name=suffix,
+        email=f"export-{suffix}@example.com",
+        password="-",
+        role_id=role.id,
+    )
+    async_session.add(user)
+    await async_session.flush()
+    logs = [
+        MealLog(
+            meal_id=meal.id,
+            user_id=user.id,
+            portion_qty=day + 1,
+            served_at=START + timedelta(days=day),
+        )
+        for day in range(7)
+    ]
+    async_session.add_all(logs)
+    await async_session.commit()
+    meal_id, user_id = meal.id, user.id
+
+    yield logs
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+    await async_session.execute(delete(User).where(User.id == user_id))
+    await async_session.execute(delete(Meal).where(Meal.id == meal_id))
+    await async_session.commit()
+
+
+async def collect(async_session, writer, chunk_size=2):
+    batches = ExportRepository(async_session).stream(
+        "meal_logs",
+        date_from=START + timedelta(days=1),
+        date_to=START + timedelta(days=6),
+        chunk_size=chunk_size,
+    )
+    return [
+        chunk async for chunk in writer(ExportRepository.columns("meal_logs"), batches)
+    ]
+
+
+class TestExport:
+    @pytest.mark.asyncio
+    async def test_csv_streams_filtered_rows(self, async_session, exported_logs):
+        chunks = await collect(async_session, csv_chunks)
+        # one chunk per batch of two rows, the header goes with the first
+        assert len(chunks) == 3
+        rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+        assert rows[0] == ["id", "meal_id", "user_id", "portion_qty", "served_at"]
+        assert [int(row[0]) for row in rows[1:]] == [
+            log.id for log in exported_logs[1:6]
+        ]
+        assert rows[1][3:] == ["2", str(START + timedelta(days=1))]
+
+    @pytest.mark.asyncio
+    async def test_parquet_row_group_per_batch(self, async_session, exported_logs):
+        chunks = await collect(async_session, parquet_chunks)
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+        assert parquet.metadata.num_row_groups == 3
+        table = parquet.read()
+        assert table.column("id").to_pylist() == [log.id for log in exported_logs[1:6]]
+        assert table.column("served_at").to_pylist()[0] == START + timedelta(days=1)
@@ -0,0 +1,213 @@
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import delete, update
+from sqlalchemy.future import select
+
+from app.api.controllers import ImportController
+from app.api.models import (
+    Alert,
+    Ingredient,
+    Meal,
+    MealIngredient,
+    MealPortion,
+    Unit,
+)
+from app.api.repositories import ImportRepository
+from app.api.schemas.import_schemas import ImportSchema
+
+
+@pytest_asyncio.fixture
+async def prefix(async_session):
+    prefix = uuid4().hex[:6]
+
+    yield prefix
+
+    # other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(Meal).where(Meal.name.startswith(prefix)))
+    await async_session.execute(
+        delete(Ingredient).where(Ingredient.name.startswith(prefix))
+    )
+    await async_session.execute(delete(Unit).where(Unit.code.startswith(prefix)))
+    await async_session.commit()
+
+
+def payload(prefix: str, threshold: float = 1, qty: float = 2) -> ImportSchema:
+    return ImportSchema(
+        units=[{"code": f"{prefix}g", "description": "gram"}],
+        ingredients=[
+            {
+                "name": f"{prefix} rice",
+                "unit": f"{prefix}g",
+                "min_threshold": threshold,
+            },
+            {"name": f"{prefix} salt", "unit": f"{prefix}g"},
+        ],
+        meals=[{"name": f"{prefix} plov", "picture": "plov.png"}],
+        recipes=[
+            {
+                "meal": f"{prefix} plov",
+                "ingredient": f"{prefix} rice",
+                "required_qty": 1,
+            },
+            {
+                "meal": f"{prefix} plov",
+                "ingredient": f"{prefix} salt",
+                "required_qty": 1,
+            },
+            # the later row for the same recipe wins
+            {
+                "meal": f"{prefix} plov",
+                "ingredient": f"{prefix} salt",
+                "required_qty": qty,
+            },
+        ],
+    )
+
+
+class TestImport:
+    @pytest.mark.asyncio
+    async def test_upsert_is_idempotent(self, async_session, prefix):
+        controller = ImportController(ImportRepository(async_session))
+        counts = await controller.import_data(payload(prefix))
+        assert (counts.units, counts.ingredients, counts.meals, counts.recipes) == (
+            1,
+            2,
+            1,
+            2,
+        )
+        await controller.import_data(payload(prefix, threshold=5, qty=3))
+
+        ingredients = (
+            await async_session.execute(
+                select(Ingredient.name, Ingredient.min_threshold)
+                .where(Ingredient.name.startswith(prefix))
+                .order_by(Ingredient.name)
+            )
+        ).all()
+        assert [(name, float(threshold)) for name, threshold in ingredients] == [
+            (f"{prefix} rice", 5),
+            (f"{prefix} salt", 0),
+        ]
+        meal = (
+            await async_session.execute(
+                select(Meal).where(Meal.name.startswith(prefix))
+            )
+        ).scalar_one()
+        recipes = (
+            await async_session.execute(
+                select(Ingredient.name, MealIngredient.required_qty)
+                .join(Ingredient)
+                .where(MealIngredient.meal_id == meal.id)
+                .order_by(Ingredient.name)
+            )
+        ).all()
+        assert [(name, float(qty)) for name, qty in recipes] == [
+            (f"{prefix} rice", 1),
+            (f"{prefix} salt", 3),
+        ]
+        portion = await async_session.execute(
+            select(MealPortion.portion_count).where(MealPortion.meal_id == meal.id)
+        )
+        assert portion.scalar_one() == 0
+
+    @pytest.mark.asyncio
+    async def test_left_out_fields_keep_their_values(self, async_session, prefix):
+        controller = ImportController(ImportRepository(async_session))
+        await controller.import_data(payload(prefix, threshold=5))
+        await controller.import_data(
+            ImportSchema(
+                units=[{"code": f"{prefix}g"}],
+                ingredients=[{"name": f"{prefix} rice", "unit": f"{prefix}g"}],
+                meals=[{"name": f"{prefix} plov"}],
+            )
+        )
+
+        unit = await async_session.execute(
+            select(Unit.description).where(Unit.code == f"{prefix}g")
+        )
+        assert unit.scalar_one() == "gram"
+        threshold = await async_session.execute(
+            select(Ingredient.min_threshold).where(Ingredient.name == f"{prefix} rice")
+        )
+        assert threshold.scalar_one() == 5
+        picture = await async_session.execute(
+            select(Meal.picture).where(Meal.name == f"{prefix} plov")
+        )
+        assert picture.scalar_one() == "plov.png"
+        alerts = await async_session.execute(
+            select(Alert.is_resolved)
+            .join(Ingredient, Alert.ingredient_id == Ingredient.id)
+            .where(Ingredient.name == f"{prefix} rice")
+        )
+        assert alerts.scalars().all() == [False]
+
+    @pytest.mark.asyncio
+    async def test_thresholds_open_and_resolve_alerts(self, async_session, prefix):
+        controller = ImportController(ImportRepository(async_session))
+        rice = f"{prefix} rice"
+
+        async def open_alerts() -> list[str]:
+            result = await async_session.execute(
+                select(Ingredient.name)
+                .join(Alert, Alert.ingredient_id == Ingredient.id)
+                .where(Ingredient.name.startswith(prefix), Alert.is_resolved.is_(False))
+                .order_by(Ingredient.name)
+            )
+            return list(result.scalars())
+
+        # new ingredients start empty, at or below any minimum
+        await controller.import_data(payload(prefix, threshold=1))
+        assert await open_alerts() == [rice, f"{prefix} salt"]
+        await async_session.execute(
+            update(Ingredient).where(Ingredient.name == rice).values(quantity=3)
+        )
+        await async_session.commit()
+
+        await controller.import_data(payload(prefix, threshold=5))
+        assert await open_alerts() == [rice, f"{prefix} salt"]
+        # lowering the minimum under the stock resolves the alert
+        await controller.import_data(payload(prefix, threshold=2))
+        assert await open_alerts() == [f"{prefix} salt"]
+        # and raising it again opens a new one
+        await controller.import_data(payload(prefix, threshold=3))
+        assert await open_alerts() == [rice, f"{prefix} salt"]
+
+    @pytest.mark.asyncio
+    async def test_invalid_rows_are_reported_and_nothing_is_saved(
+        self, async_session, prefix
+    ):
+        controller = ImportController(ImportRepository(async_session))
+        data = payload(prefix)
+        data.ingredients.append({"name": f"{prefix} oil", "unit": "missing"})
+        data.recipes.append({"meal": f"{prefix} soup", "ingredient": f"{prefix} rice"})
+        data.meals.append({"picture": "soup.png"})
+        # stored as 0.00, it would divide the portion count by zero
+        data.recipes.append(
+            {
+                "meal": f"{prefix} plov",
+                "ingredient": f"{prefix} rice",
+                "required_qty": 0.004,
+            }
+        )
+
+        with pytest.raises(HTTPException) as error:
+            await controller.import_data(data)
+        assert error.value.status_code == 400
+        reported = [
+            (row["section"], row["row"], len(row["errors"]))
+            for row in error.value.detail["errors"]
+        ]
+        assert reported == [
+            ("ingredients", 3, 1),
+            ("meals", 2, 1),
+            ("recipes", 4, 1),
+            ("recipes", 5, 1),
+        ]
+        units = await async_session.execute(
+            select(Unit.id).where(Unit.code.startswith(prefix))
+        )
+        assert units.all() == []
@@ -0,0 +1,193 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event, select
+
+from app.api.controllers import MealController
+from app.api.models import (
+    Ingredient,
+    IngredientTransaction,
+    Meal,
+    MealIngredient,
+    MealLog,
+    Role,
+    Unit,
+    User,
+)
+from app.api.models.transactions import TransactionType
+from app.api.repositories import IngredientRepository, MealRepository, UnitRepository
+from app.api.schemas.ingredients_schemas import (
+    IngredientCreateSchema,
+    IngredientUpdateSchema,
+)
+from app.api.schemas.meal_schemas import MealServeBatchSchema
+from app.api.schemas.transactions_schemas import IngredientTransactionQuery
+from app.api.schemas.units_schemas import UnitCreateSchema
+
+
+@pytest_asyncio.fixture
+async def kitchen(async_session):
+    suffix = uuid4().hex[:8]
+    unit = await UnitRepository(async_session).create_unit(
+        UnitCreateSchema(code=suffix[:6])
+    )
+    repository = IngredientRepository(async_session)
+    rice, salt = [
+        await repository.create_ingredient(
+            IngredientCreateSchema(
+                name=f"{name}-{suffix}", unit_id=unit.id, quantity=quantity
+            )
+        )
+        for name, quantity in (("rice", 50), ("salt", 20))
+    ]
+    role = Role(name=f"role-{suffix}")
+    meals = [Meal(name=f"ledger-{suffix}-{i}") for i in range(2)]
+    async_session.add_all([role, *meals])
+    await async_session.flush()
+    user = User(
+        first_name="Ledger",
+        last_name=suffix,
+        email=f"ledger-{suffix}@example.com",
+        password="-",
+        role_id=role.id,
+    )
+    async_session.add_all(
+        [
+            user,
+            MealIngredient(meal_id=meals[0].id, ingredient_id=rice.id, required_qty=2),
+            MealIngredient(meal_id=meals[0].id, ingredient_id=salt.id, required_qty=1),
+            MealIngredient(
+                meal_id=meals[1].id, ingredient_id=rice.id, required_qty=Decimal("1.5")
+            ),
+        ]
+    )
+    await async_session.commit()
+    meal_ids, user_id, unit_id = [meal.id for meal in meals], user.id, unit.id
+
+    yield meal_ids, user_id, rice.id, salt.id
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id.in_(meal_ids)))
+    await async_session.execute(delete(User).where(User.id == user_id))
+    await async_session.execute(delete(Meal).where(Meal.id.in_(meal_ids)))
+    await async_session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+    await async_session.execute(delete(Unit).where(Unit.id == unit_id))
+    await async_session.commit()
+
+
+async def update(session, ingredient_id, quantity):
+    ingredient = await session.get(Ingredient, ingredient_id)
+    await IngredientRepository(session).update_ingredient(
+        ingredient_id,
+        IngredientUpdateSchema(
+            name=ingredient.name,
+            unit_id=ingredient.unit_id,
+            quantity=quantity,
+            min_threshold=ingredient.min_threshold,
+        ),
+    )
+
+
+async def balance(session, ingredient_id):
+    result = await session.execute(
+        select(
+            IngredientTransaction.transaction_type, IngredientTransaction.quantity
+        ).where(IngredientTransaction.ingredient_id == ingredient_id)
+    )
+    return sum(
+        quantity if transaction_type == TransactionType.IN else -quantity
+        for transaction_type, quantity in result
+    )
+
+
+class TestIngredientLedger:
+    @pytest.mark.asyncio
+    async def test_every_movement_is_recorded(self, async_session, kitchen):
+        meal_ids, user_id, rice_id, salt_id = kitchen
+        controller = MealController(
+            MealRepository(async_session), IngredientRepository(async_session)
+        )
+        connection = await async_session.connection()
+        inserts = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO ingredient_transactions"):
+                inserts.append(statement)
+
+        event.listen(connection.sync_engine, "before_cursor_execute", record)
+        try:
+            await controller.serve_meals(
+                user_id=user_id,
+                payload=MealServeBatchSchema(
+                    items=[
+                        {"meal_id": meal_ids[0], "portion_qty": 3},
+                        {"meal_id": meal_ids[1], "portion_qty": 4},
+                    ]
+                ),
+            )
+        finally:
+            event.remove(connection.sync_engine, "before_cursor_execute", record)
+        assert len(inserts) == 1
+
+        logs = dict(
+            (
+                await async_session.execute(
+                    select(MealLog.meal_id, MealLog.id).where(
+                        MealLog.meal_id.in_(meal_ids)
+                    )
+                )
+            ).all()
+        )
+        served = (
+            await async_session.execute(
+                select(
+                    IngredientTransaction.reference_id,
+                    IngredientTransaction.ingredient_id,
+                    IngredientTransaction.quantity,
+                )
+                .where(IngredientTransaction.transaction_type == TransactionType.OUT)
+                .where(IngredientTransaction.ingredient_id.in_([rice_id, salt_id]))
+            )
+        ).all()
+        assert sorted(served) == sorted(
+            [
+                (logs[meal_ids[0]], rice_id, 6),
+                (logs[meal_ids[0]], salt_id, 3),
+                (logs[meal_ids[1]], rice_id, 6),
+            ]
+        )
+
+        await update(async_session, salt_id, quantity=30.5)
+        for ingredient_id, quantity in ((rice_id, 38), (salt_id, Decimal("30.5"))):
+            assert await balance(async_session, ingredient_id) == quantity
+            ingredient = await async_session.get(Ingredient, ingredient_id)
+            assert ingredient.quantity == quantity
+
+    @pytest.mark.asyncio
+    async def test_keyset_pages(self, async_session, kitchen):
+        _, _, rice_id, salt_id = kitchen
+        repository = IngredientRepository(async_session)
+        for quantity in (40, 45, 44):
+            await update(async_session, rice_id, quantity=quantity)
+
+        seen, cursor = [], None
+        while True:
+            page = await repository.get_transactions(
+                IngredientTransactionQuery(
+                    ingredient_id=rice_id, size=1, cursor=cursor, count_mode="exact"
+                )
+            )
+            assert page.total == 4
+            seen.extend((t.transaction_type, t.quantity) for t in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == [
+            (TransactionType.OUT, Decimal("1.00")),
+            (TransactionType.IN, Decimal("5.00")),
+            (TransactionType.OUT, Decimal("10.00")),
+            (TransactionType.IN, Decimal("50.00")),
+        ]
@@ -0,0 +1,166 @@
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+
+from app.api.models import Alert, Ingredient, Meal, MealLog, Role, Unit, User
+from app.api.repositories import (
+    AlertsRepository,
+    IngredientRepository,
+    MealRepository,
+    UnitRepository,
+)
+from app.api.schemas.alerts_schemas import AlertsQuery
+from app.api.schemas.ingredients_schemas import IngredientCreateSchema
+from app.api.schemas.units_schemas import UnitCreateSchema
+from app.server.alerts import LowStockDispatcher
+
+
+@pytest_asyncio.fixture
+async def pantry(async_session):
+    suffix = uuid4().hex[:8]
+    unit = await UnitRepository(async_session).create_unit(
+        UnitCreateSchema(code=suffix[:6])
+    )
+    repository = IngredientRepository(async_session)
+    rice, salt = [
+        await repository.create_ingredient(
+            IngredientCreateSchema(
+                name=f"{name}-{suffix}",
+                unit_id=unit.id,
+                quantity=10,
+                min_threshold=4,
+            )
+        )
+        for name in ("rice", "salt")
+    ]
+    # get_admin_users picks recipients by role id
+    role = await async_session.get(Role, 3)
+    created_role = role is None
+    if created_role:
+        role = Role(id=3, name=f"chef-{suffix}")
+        async_session.add(role)
+        await async_session.flush()
+    meal = Meal(name=f"alerts-{suffix}")
+    user = User(
+        first_name="Alert",
+        last_name=suffix,
+        email=f"alert-{suffix}@example.com",
+        password="-",
+        role_id=role.id,
+    )
+    async_session.add_all([meal, user])
+    await async_session.commit()
+    meal_id, user_id, unit_id = meal.id, user.id, unit.id
+
+    yield rice.id, salt.id, meal_id, user_id
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+    await async_session.execute(delete(User).where(User.id == user_id))
+    if created_role:
+        await async_session.execute(delete(Role).where(Role.id == 3))
+    await async_session.execute(delete(Meal).where(Meal.id == meal_id))
+    await async_session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+    await async_session.execute(delete(Unit).where(Unit.id == unit_id))
+    await async_session.commit()
+
+
+@asynccontextmanager
+async def shared(session):
+    # hands the test session to the dispatcher without closing it
+    yield session
+
+
+async def open_alerts(session, ingredient_ids) -> list[int]:
+    result = await session.execute(
+        select(Alert.ingredient_id)
+        .where(Alert.ingredient_id.in_(ingredient_ids), Alert.is_resolved.is_(False))
+        .order_by(Alert.ingredient_id)
+    )
+    return list(result.scalars().all())
+
+
+class TestLowStockAlerts:
+    @pytest.mark.asyncio
+    async def test_one_alert_per_crossing(self, async_session, pantry):
+        rice_id, salt_id, _, _ = pantry
+        repository = IngredientRepository(async_session)
+
+        await repository.take_stock(rice_id, 5)
+        assert await open_alerts(async_session, [rice_id, salt_id]) == []
+
+        await repository.take_stock(rice_id, 1)
+        await repository.take_stock(rice_id, 1)
+        assert await open_alerts(async_session, [rice_id, salt_id]) == [rice_id]
+
+        await repository.receive_stock({rice_id: 10})
+        assert await open_alerts(async_session, [rice_id]) == []
+
+        await repository.take_stock(rice_id, 10)
+        total = await async_session.execute(
+            select(Alert.id).where(Alert.ingredient_id == rice_id)
+        )
+        assert len(total.all()) == 2
+        assert await open_alerts(async_session, [rice_id]) == [rice_id]
+
+    @pytest.mark.asyncio
+    async def test_search_by_ingredient_name(self, async_session, pantry):
+        rice_id, salt_id, _, _ = pantry
+        await IngredientRepository(async_session).take_stock(rice_id, 7)
+        await IngredientRepository(async_session).take_stock(salt_id, 7)
+        rice = (
+            await async_session.execute(
+                select(Ingredient.name).where(Ingredient.id == rice_id)
+            )
+        ).scalar_one()
+
+        page = await AlertsRepository(async_session).get_alerts(
+            AlertsQuery(search=rice)
+        )
+        assert [alert.ingredient_id for alert in page.items] == [rice_id]
+        assert page.total == 1
+
+    @pytest.mark.asyncio
+    async def test_serve_sends_one_digest_per_recipient(self, async_session, pantry):
+        rice_id, salt_id, meal_id, user_id = pantry
+        await MealRepository(async_session).serve_meal(
+            meal_id=meal_id,
+            user_id=user_id,
+            portion_qty=1,
+            required={rice_id: 7, salt_id: 8},
+        )
+        assert await open_alerts(async_session, [rice_id, salt_id]) == [
+            rice_id,
+            salt_id,
+        ]
+
+        sent = []
+
+        async def send(email, names):
+            sent.append((email, names))
+
+        dispatcher = LowStockDispatcher(
+            session_factory=lambda: shared(async_session), send=send
+        )
+        assert await dispatcher.dispatch() == 2
+        digests = dict(sent)
+        assert len(digests) == len(sent)
+        email = (
+            await async_session.execute(select(User.email).where(User.id == user_id))
+        ).scalar_one()
+        rice, salt = (
+            await async_session.execute(
+                select(Ingredient.name)
+                .where(Ingredient.id.in_([rice_id, salt_id]))
+                .order_by(Ingredient.id)
+            )
+        ).scalars()
+        assert digests[email] == [rice, salt]
+
+        sent.clear()
+        assert await dispatcher.dispatch() == 0
+        assert sent == []
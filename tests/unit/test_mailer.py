@@ -0,0 +1,205 @@
+import asyncio
+import socket
+from email import message_from_bytes, policy
+
+import aiosmtplib
+import pytest
+from aiosmtpd.controller import Controller
+
+from app.api.tasks import mailer as mailer_module
+from app.api.tasks.backends import FileBackend, InlineBackend, MailBackend
+from app.api.tasks.mailer import SMTPMailer, TemporaryMailError
+from app.api.tasks.send_warnings import send_warnings
+from app.api.tasks.messages import warnings_message
+
+
+class Sink:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append(message_from_bytes(envelope.content))
+        return "250 OK"
+
+
+class Busy(Sink):
+    """Answers DATA with a 451 the first ``failures`` times."""
+
+    def __init__(self, failures: int, code: int = 451):
+        super().__init__()
+        self.failures = failures
+        self.code = code
+        self.attempts = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return f"{self.code} Try again later"
+        return await super().handle_DATA(server, session, envelope)
+
+
+class Refusing(Sink):
+    """Refuses every recipient at the refused.example.com domain."""
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.endswith("@refused.example.com"):
+            return "550 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def smtp_server():
+    sink = Sink()
+    controller = Controller(sink, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    servers = [controller]
+    yield servers, sink
+    servers[-1].stop()
+
+
+class TestMailer:
+    @pytest.mark.asyncio
+    async def test_connections_are_pooled(self, smtp_server):
+        (controller,), sink = smtp_server
+        mailer = SMTPMailer(
+            controller.hostname, controller.port, starttls=False, concurrency=2
+        )
+        try:
+            for i in range(3):
+                await mailer.send(warnings_message(f"admin{i}@example.com", ["rice"]))
+            await asyncio.gather(
+                *(
+                    mailer.send(warnings_message(f"chef{i}@example.com", ["salt"]))
+                    for i in range(10)
+                )
+            )
+        finally:
+            await mailer.close()
+        assert len(sink.messages) == 13
+        # never more connections than messages allowed in flight
+        assert mailer.connections == len(sink.sessions) == 2
+
+    @pytest.mark.asyncio
+    async def test_reconnects_after_the_server_drops(self, smtp_server):
+        servers, sink = smtp_server
+        controller = servers[0]
+        mailer = SMTPMailer(
+            controller.hostname, controller.port, starttls=False, backoff=0
+        )
+        try:
+            await mailer.send(warnings_message("admin@example.com", ["rice"]))
+            # the server restarts on the same port, closing the connection
+            controller.stop()
+            servers.append(Controller(sink, hostname="127.0.0.1", port=controller.port))
+            servers[-1].start()
+            await mailer.send(warnings_message("admin@example.com", ["salt"]))
+        finally:
+            await mailer.close()
+        assert len(sink.messages) == 2
+        assert mailer.connections == 2
+
+    @pytest.mark.asyncio
+    async def test_refused_recipient_keeps_the_connection(self):
+        sink = Refusing()
+        controller = Controller(sink, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        mailer = SMTPMailer(
+            controller.hostname, controller.port, starttls=False, concurrency=1
+        )
+        try:
+            await mailer.send(warnings_message("admin@example.com", ["rice"]))
+            with pytest.raises(aiosmtplib.SMTPRecipientsRefused):
+                await mailer.send(warnings_message("x@refused.example.com", ["rice"]))
+            await mailer.send(warnings_message("chef@example.com", ["salt"]))
+        finally:
+            await mailer.close()
+            controller.stop()
+        assert [message["To"] for message in sink.messages] == [
+            "admin@example.com",
+            "chef@example.com",
+        ]
+        assert mailer.connections == len(sink.sessions) == 1
+
+    def test_digest_names_every_ingredient(self):
+        mail = warnings_message("admin@example.com", ["rice", "salt & pepper"])
+        message = message_from_bytes(mail.data, policy=policy.default)
+        html = message.get_body(("html",)).get_content()
+        assert message["Subject"].endswith("2 ingredients")
+        assert "rice,\r\nsalt &amp; pepper" in html
+
+
+class TestMailBackends:
+    @pytest.mark.asyncio
+    async def test_inline_backend_sends_in_the_background(self, smtp_server):
+        (controller,), sink = smtp_server
+        backend = InlineBackend(
+            SMTPMailer(controller.hostname, controller.port, starttls=False)
+        )
+        for i in range(5):
+            backend.submit("verification", f"user{i}@example.com", 1000 + i)
+        # close waits for everything submitted
+        await backend.close()
+        assert sorted(message["To"] for message in sink.messages) == [
+            f"user{i}@example.com" for i in range(5)
+        ]
+
+    def test_backend_must_send(self):
+        class Forgetful(MailBackend):
+            pass
+
+        # caught when constructed rather than inside the submitted task
+        with pytest.raises(TypeError):
+            Forgetful()
+
+    @pytest.mark.asyncio
+    async def test_file_backend_writes_messages(self, tmp_path):
+        backend = FileBackend(tmp_path / "mail")
+        await backend.send("verification", "user@example.com", 123456)
+        (path,) = (tmp_path / "mail").iterdir()
+        message = message_from_bytes(path.read_bytes())
+        assert message["To"] == "user@example.com"
+        assert "123456" in message["Subject"]
+
+
+class TestMailTasks:
+    @pytest.fixture
+    def busy_server(self, monkeypatch):
+        def start(failures: int, code: int = 451) -> Busy:
+            handler = Busy(failures, code)
+            controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+            controller.start()
+            controllers.append(controller)
+            mailer = SMTPMailer(controller.hostname, controller.port, starttls=False)
+            mailers.append(mailer)
+            monkeypatch.setattr(mailer_module, "get_mailer", lambda: mailer)
+            return handler
+
+        controllers, mailers = [], []
+        yield start
+        for mailer in mailers:
+            mailer_module.run(mailer.close())
+        for controller in controllers:
+            controller.stop()
+
+    def test_temporary_failure_is_retried(self, busy_server):
+        handler = busy_server(failures=2)
+        result = send_warnings.apply(args=["admin@example.com", ["rice"]])
+        assert result.successful()
+        assert handler.attempts == 3
+        assert len(handler.messages) == 1
+
+    def test_permanent_failure_is_not_retried(self, busy_server):
+        handler = busy_server(failures=1, code=554)
+        result = send_warnings.apply(args=["admin@example.com", ["rice"]])
+        assert result.failed()
+        assert not isinstance(result.result, TemporaryMailError)
+        assert handler.attempts == 1
@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event
+
+from app.api.models import Meal, MealLog, Role, User
+from app.api.repositories import MealRepository
+from app.api.schemas.meal_schemas import MealLogQuery
+
+START = datetime(2025, 3, 1, 12, 0)
+
+
+@pytest_asyncio.fixture
+async def meal_logs(async_session):
+    suffix = uuid4().hex[:8]
+    role = Role(name=f"role-{suffix}")
+    meal = Meal(name=f"logs-{suffix}")
+    async_session.add_all([role, meal])
+    await async_session.flush()
+    users = [
+        User(
+            first_name="Log",
+            last_name=str(i),
+            email=f"log-{suffix}-{i}@example.com",
+            password="-",
+            role_id=role.id,
+        )
+        for i in range(2)
+    ]
+    async_session.add_all(users)
+    await async_session.flush()
+    logs = [
+        MealLog(
+            meal_id=meal.id,
+            user_id=users[day % 2].id,
+            portion_qty=day + 1,
+            served_at=START + timedelta(days=day),
+        )
+        for day in range(8)
+    ]
+    async_session.add_all(logs)
+    await async_session.commit()
+    meal_id, user_ids = meal.id, [user.id for user in users]
+
+    yield meal_id, user_ids, logs
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+    await async_session.execute(delete(User).where(User.id.in_(user_ids)))
+    await async_session.execute(delete(Meal).where(Meal.id == meal_id))
+    await async_session.commit()
+
+
+class TestMealLogQueries:
+    @pytest.mark.asyncio
+    async def test_filters_and_keyset_paging(self, async_session, meal_logs):
+        meal_id, user_ids, logs = meal_logs
+        repository = MealRepository(async_session)
+        # user 0 served on even days with portions 1, 3, 5, 7
+        query = MealLogQuery(
+            meal_id=meal_id,
+            user_id=user_ids[0],
+            served_from=START + timedelta(days=1),
+            served_to=START + timedelta(days=7),
+            min_portions=2,
+            size=1,
+            count_mode="exact",
+        )
+        expected = [logs[6].id, logs[4].id, logs[2].id]
+
+        seen, cursor = [], None
+        while True:
+            page = await repository.list_meal_logs(
+                query.model_copy(update={"cursor": cursor})
+            )
+            assert page.total == 3
+            seen.extend(log.id for log in page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert seen == expected
+
+        ascending = await repository.list_meal_logs(
+            query.model_copy(update={"order": "asc", "size": 10})
+        )
+        assert [log.id for log in ascending.items] == expected[::-1]
+
+    @pytest.mark.asyncio
+    async def test_query_plans_use_composite_indexes(self, async_session, meal_logs):
+        meal_id, user_ids, _ = meal_logs
+        repository = MealRepository(async_session)
+        connection = await async_session.connection()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        cases = [
+            (MealLogQuery(meal_id=meal_id, size=2), "ix_meal_logs_meal_id_served_at"),
+            (
+                MealLogQuery(user_id=user_ids[1], size=2),
+                "ix_meal_logs_user_id_served_at",
+            ),
+        ]
+        # the tables are tiny here, so keep the planner off sequential scans
+        await connection.exec_driver_sql("SET enable_seqscan = off")
+        for query, index in cases:
+            first = await repository.list_meal_logs(query)
+            statements.clear()
+            event.listen(connection.sync_engine, "before_cursor_execute", record)
+            try:
+                await repository.list_meal_logs(
+                    query.model_copy(update={"cursor": first.next_cursor})
+                )
+            finally:
+                event.remove(connection.sync_engine, "before_cursor_execute", record)
+            assert statements
+            for statement, parameters in statements:
+                plan = await connection.exec_driver_sql(
+                    f"EXPLAIN {statement}", parameters
+                )
+                assert index in "\n".join(row[0] for row in plan.all())
@@ -0,0 +1,61 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import event
+
+from app.api.controllers import MealController
+from app.api.repositories import IngredientRepository, MealRepository, UnitRepository
+from app.api.schemas.ingredients_schemas import IngredientCreateSchema
+from app.api.schemas.meal_schemas import AddIngredientToMealSchema, MealCreateSchema
+from app.api.schemas.units_schemas import UnitCreateSchema
+
+
+class TestMealIngredientQueries:
+    async def create_meal(self, session, unit_id: int, ingredient_count: int) -> int:
+        suffix = uuid4().hex[:6]
+        ingredients = IngredientRepository(session)
+        meals = MealRepository(session)
+        meal = await meals.create_meal(MealCreateSchema(name=f"meal-{suffix}"))
+        for i in range(ingredient_count):
+            ingredient = await ingredients.create_ingredient(
+                IngredientCreateSchema(
+                    name=f"ingredient-{suffix}-{i}", unit_id=unit_id, quantity=100
+                )
+            )
+            await meals.add_ingredient_to_meal(
+                meal.id,
+                AddIngredientToMealSchema(ingredient_id=ingredient.id, required_qty=1),
+            )
+        return meal.id
+
+    async def count_queries(self, session, meal_id: int) -> tuple[int, int]:
+        controller = MealController(
+            meal_repository=MealRepository(session),
+            ingredient_repository=IngredientRepository(session),
+        )
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = session.bind.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            ingredients = await controller.get_meal_ingredients(meal_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+        return len(statements), len(ingredients)
+
+    @pytest.mark.asyncio
+    async def test_query_count_does_not_grow_with_ingredients(self, async_session):
+        unit = await UnitRepository(async_session).create_unit(
+            UnitCreateSchema(code=uuid4().hex[:6])
+        )
+        small = await self.create_meal(async_session, unit.id, 1)
+        large = await self.create_meal(async_session, unit.id, 10)
+
+        small_queries, small_count = await self.count_queries(async_session, small)
+        large_queries, large_count = await self.count_queries(async_session, large)
+
+        assert (small_count, large_count) == (1, 10)
+        assert small_queries == large_queries <= 2
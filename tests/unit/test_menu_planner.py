@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.api.utils.menu_planner import InfeasibleMenuError, plan_menu
+
+
+class TestMenuPlanner:
+    def plan(self, requirements, stock, minimums=None, maximums=None, ratios=None):
+        meals = requirements.shape[1]
+        return plan_menu(
+            requirements,
+            stock,
+            np.zeros(meals) if minimums is None else minimums,
+            np.full(meals, np.nan) if maximums is None else maximums,
+            np.zeros(meals) if ratios is None else ratios,
+        )
+
+    def test_shares_stock_between_meals(self):
+        requirements = np.array([[2.0, 1.0], [1.0, 0.0]])
+        portions = self.plan(requirements, np.array([10.0, 3.0]))
+        assert portions.tolist() == [0, 10]
+
+    def test_keeps_ratios(self):
+        requirements = np.array([[2.0, 1.0], [1.0, 0.0]])
+        portions = self.plan(
+            requirements, np.array([10.0, 3.0]), ratios=np.array([1.0, 1.0])
+        )
+        assert portions.tolist() == [3, 4]
+
+    def test_respects_minimums_and_maximums(self):
+        requirements = np.array([[1.0, 2.0]])
+        portions = self.plan(
+            requirements,
+            np.array([10.0]),
+            minimums=np.array([0, 2]),
+            maximums=np.array([4, np.nan]),
+        )
+        assert portions.tolist() == [4, 3]
+
+    def test_infeasible_minimums(self):
+        with pytest.raises(InfeasibleMenuError):
+            self.plan(np.array([[1.0]]), np.array([3.0]), minimums=np.array([5]))
+
+    def test_few_hundred_meals_under_a_second(self):
+        rng = np.random.default_rng(0)
+        requirements = rng.random((300, 300)) * (rng.random((300, 300)) < 0.05)
+        requirements[rng.integers(0, 300, 300), np.arange(300)] += 0.5
+        stock = rng.random(300) * 1000
+
+        started = time.perf_counter()
+        portions = self.plan(
+            requirements, stock, ratios=(rng.random(300) < 0.3).astype(float)
+        )
+        assert time.perf_counter() - started < 1
+        assert (requirements @ portions <= stock + 1e-6).all()
@@ -0,0 +1,146 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, text
+from sqlalchemy.future import select
+
+from app.api.models import Ingredient
+from app.api.utils.pagination import estimated_count, exact_count
+
+from app.api.repositories import IngredientRepository, UnitRepository
+from app.api.schemas.ingredients_schemas import (
+    IngredientCreateSchema,
+    IngredientListQuery,
+)
+from app.api.schemas.units_schemas import UnitCreateSchema
+
+
+class TestKeysetPagination:
+    async def create_ingredients(self, session, count: int) -> tuple[str, list[int]]:
+        suffix = uuid4().hex[:6]
+        unit = await UnitRepository(session).create_unit(UnitCreateSchema(code=suffix))
+        repository = IngredientRepository(session)
+        ids = []
+        for i in range(count):
+            ingredient = await repository.create_ingredient(
+                IngredientCreateSchema(name=f"page-{suffix}-{i}", unit_id=unit.id)
+            )
+            ids.append(ingredient.id)
+        return f"page-{suffix}", ids
+
+    @pytest.mark.asyncio
+    async def test_cursors_walk_forward_and_back(self, async_session):
+        search, ids = await self.create_ingredients(async_session, 7)
+        repository = IngredientRepository(async_session)
+
+        pages, cursor = [], None
+        while True:
+            page = await repository.get_all_ingredients(
+                IngredientListQuery(search=search, size=3, cursor=cursor)
+            )
+            pages.append([ingredient.id for ingredient in page.items])
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert pages == [ids[0:3], ids[3:6], ids[6:7]]
+        assert page.prev_cursor is not None
+
+        back = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=3, cursor=page.prev_cursor)
+        )
+        assert [ingredient.id for ingredient in back.items] == ids[3:6]
+        first = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=3, cursor=back.prev_cursor)
+        )
+        assert [ingredient.id for ingredient in first.items] == ids[0:3]
+        assert first.prev_cursor is None
+        assert first.next_cursor is not None
+
+    @pytest.mark.asyncio
+    async def test_offset_fallback_matches_keyset(self, async_session):
+        search, ids = await self.create_ingredients(async_session, 5)
+        repository = IngredientRepository(async_session)
+
+        page = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=2, page=2)
+        )
+        assert [ingredient.id for ingredient in page.items] == ids[2:4]
+        following = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=2, cursor=page.next_cursor)
+        )
+        assert [ingredient.id for ingredient in following.items] == ids[4:5]
+
+    @pytest.mark.asyncio
+    async def test_exact_total_ignores_cursor_position(self, async_session):
+        search, ids = await self.create_ingredients(async_session, 5)
+        repository = IngredientRepository(async_session)
+
+        first = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=2)
+        )
+        following = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=2, cursor=first.next_cursor)
+        )
+        beyond = await repository.get_all_ingredients(
+            IngredientListQuery(search=search, size=2, page=4)
+        )
+        assert (first.total, following.total, beyond.total) == (5, 5, 5)
+        assert beyond.items == []
+
+    @pytest.mark.asyncio
+    async def test_exact_cursor_page_uses_the_index(self, async_session):
+        await self.create_ingredients(async_session, 5)
+        repository = IngredientRepository(async_session)
+        connection = await async_session.connection()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "LIMIT" in statement:
+                statements.append((statement, parameters))
+
+        first = await repository.get_all_ingredients(IngredientListQuery(size=2))
+        # the table is tiny here, so keep the planner off sequential scans
+        await connection.exec_driver_sql("SET enable_seqscan = off")
+        event.listen(connection.sync_engine, "before_cursor_execute", record)
+        try:
+            following = await repository.get_all_ingredients(
+                IngredientListQuery(size=2, cursor=first.next_cursor)
+            )
+        finally:
+            event.remove(connection.sync_engine, "before_cursor_execute", record)
+        assert following.total == first.total
+
+        ((statement, parameters),) = statements
+        plan = "\n".join(
+            row[0]
+            for row in await connection.exec_driver_sql(
+                f"EXPLAIN {statement}", parameters
+            )
+        )
+        # the keyset condition is an index range, not a filter over a count
+        assert "Index Cond" in plan
+        assert "WindowAgg" not in plan
+
+    @pytest.mark.asyncio
+    async def test_estimated_total(self, async_session):
+        search, ids = await self.create_ingredients(async_session, 5)
+        await async_session.execute(text("ANALYZE ingredients"))
+
+        query = select(Ingredient)
+        assert await estimated_count(async_session, query) == await exact_count(
+            async_session, query
+        )
+        page = await IngredientRepository(async_session).get_all_ingredients(
+            IngredientListQuery(search=search, size=2, count_mode="estimated")
+        )
+        assert len(page.items) == 2
+        assert page.total >= 1
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self, async_session):
+        with pytest.raises(HTTPException) as error:
+            await IngredientRepository(async_session).get_all_ingredients(
+                IngredientListQuery(cursor="not-a-cursor")
+            )
+        assert error.value.status_code == 400
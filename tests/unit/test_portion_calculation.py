@@ -0,0 +1,108 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import delete
+from sqlalchemy.future import select
+
+from app.api.models import MealPortion
+from app.api.repositories import (
+    IngredientRepository,
+    MealRepository,
+    PortionCalculationRepository,
+    UnitRepository,
+)
+from app.api.schemas.ingredients_schemas import (
+    IngredientCreateSchema,
+    IngredientUpdateSchema,
+)
+from app.api.schemas.meal_schemas import AddIngredientToMealSchema, MealCreateSchema
+from app.api.schemas.units_schemas import UnitCreateSchema
+
+
+class TestPortionMaterialization:
+    async def stored(self, session) -> dict[int, int]:
+        res = await session.execute(
+            select(MealPortion.meal_id, MealPortion.portion_count)
+        )
+        return dict(res.all())
+
+    async def recomputed(self, session) -> dict[int, int]:
+        res = await session.execute(
+            PortionCalculationRepository.possible_portions_query()
+        )
+        return {meal_id: int(count) for meal_id, count in res.all()}
+
+    @pytest.mark.asyncio
+    async def test_matches_full_recompute(self, async_session):
+        suffix = uuid4().hex[:6]
+        unit = await UnitRepository(async_session).create_unit(
+            UnitCreateSchema(code=suffix)
+        )
+        ingredients = IngredientRepository(async_session)
+        meals = MealRepository(async_session)
+
+        rice = await ingredients.create_ingredient(
+            IngredientCreateSchema(name=f"rice-{suffix}", unit_id=unit.id, quantity=10)
+        )
+        meat = await ingredients.create_ingredient(
+            IngredientCreateSchema(name=f"meat-{suffix}", unit_id=unit.id, quantity=3)
+        )
+        plov = await meals.create_meal(MealCreateSchema(name=f"plov-{suffix}"))
+        porridge = await meals.create_meal(MealCreateSchema(name=f"porridge-{suffix}"))
+        assert (await self.stored(async_session))[plov.id] == 0
+
+        await meals.add_ingredient_to_meal(
+            plov.id, AddIngredientToMealSchema(ingredient_id=rice.id, required_qty=2)
+        )
+        await meals.add_ingredient_to_meal(
+            plov.id, AddIngredientToMealSchema(ingredient_id=meat.id, required_qty=1)
+        )
+        await meals.add_ingredient_to_meal(
+            porridge.id,
+            AddIngredientToMealSchema(ingredient_id=rice.id, required_qty=1),
+        )
+        assert await self.stored(async_session) == await self.recomputed(async_session)
+        assert (await self.stored(async_session))[plov.id] == 3
+
+        await ingredients.take_stock(rice.id, 5)
+        assert await self.stored(async_session) == await self.recomputed(async_session)
+        assert (await self.stored(async_session))[porridge.id] == 5
+
+        await ingredients.update_ingredient(
+            meat.id,
+            IngredientUpdateSchema(
+                name=meat.name, unit_id=unit.id, quantity=0, min_threshold=0
+            ),
+        )
+        assert (await self.stored(async_session))[plov.id] == 0
+
+        await meals.remove_ingredient_from_meal(plov.id, meat.id)
+        assert await self.stored(async_session) == await self.recomputed(async_session)
+        assert (await self.stored(async_session))[plov.id] == 2
+
+        # an ingredient still in a recipe is not deleted
+        rice_id, plov_id, porridge_id = rice.id, plov.id, porridge.id
+        before = await self.stored(async_session)
+        with pytest.raises(HTTPException) as error:
+            await ingredients.delete_ingredient(rice_id)
+        assert error.value.status_code == 409
+        assert [meal["name"] for meal in error.value.detail["meals"]] == [
+            f"plov-{suffix}",
+            f"porridge-{suffix}",
+        ]
+        assert await ingredients.get_ingredient(rice_id) is not None
+        assert await self.stored(async_session) == before
+
+        await meals.remove_ingredient_from_meal(plov_id, rice_id)
+        await meals.remove_ingredient_from_meal(porridge_id, rice_id)
+        await ingredients.delete_ingredient(rice_id)
+        assert await ingredients.get_ingredient(rice_id) is None
+        portions = PortionCalculationRepository(async_session)
+        assert (await portions.get_portion(plov_id)).portion_count == 0
+
+        # a meal without a stored row still has 0 portions rather than none
+        await async_session.execute(
+            delete(MealPortion).where(MealPortion.meal_id == plov_id)
+        )
+        assert (await portions.get_portion(plov_id)).portion_count == 0
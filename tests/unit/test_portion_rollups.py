@@ -0,0 +1,113 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, select
+
+from app.api.models import (
+    Meal,
+    MealLog,
+    MealPortionDaily,
+    MealPortionMonthly,
+    Role,
+    User,
+)
+from app.api.repositories import MealRepository, PortionRollupRepository
+from app.api.repositories.portion_rollup_repository import ROLLUPS
+
+
+@pytest_asyncio.fixture
+async def rollup_meal(async_session):
+    suffix = uuid4().hex[:8]
+    role = Role(name=f"role-{suffix}")
+    meal = Meal(name=f"rollups-{suffix}")
+    async_session.add_all([role, meal])
+    await async_session.flush()
+    user = User(
+        first_name="Rollup",
+        last_name=suffix,
+        email=f"rollup-{suffix}@example.com",
+        password="-",
+        role_id=role.id,
+    )
+    async_session.add(user)
+    await async_session.commit()
+    meal_id, user_id = meal.id, user.id
+
+    yield meal_id, user_id
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+    await async_session.execute(delete(User).where(User.id == user_id))
+    await async_session.execute(delete(Meal).where(Meal.id == meal_id))
+    await async_session.commit()
+
+
+async def stored(session, meal_id):
+    rows = {}
+    for model, bucket, field in ROLLUPS:
+        result = await session.execute(
+            select(bucket, model.total_portions)
+            .where(model.meal_id == meal_id)
+            .order_by(bucket)
+        )
+        rows[field] = result.all()
+    return rows
+
+
+async def recomputed(session, meal_id):
+    rows = {}
+    for _, _, field in ROLLUPS:
+        query = PortionRollupRepository.rollup_query(field).where(
+            MealLog.meal_id == meal_id
+        )
+        rows[field] = [
+            (bucket, total) for bucket, _, total in await session.execute(query)
+        ]
+    return rows
+
+
+class TestPortionRollups:
+    @pytest.mark.asyncio
+    async def test_logs_are_rolled_up_on_write(self, async_session, rollup_meal):
+        meal_id, user_id = rollup_meal
+        repository = MealRepository(async_session)
+        now = datetime.now()
+        before = await repository.get_meal_portion_by_time(now.year, now.month)
+
+        for portions in (1, 2, 4):
+            await repository.write_meal_logs(
+                meal_id=meal_id, user_id=user_id, portion_qty=portions
+            )
+
+        rows = await stored(async_session, meal_id)
+        assert rows == await recomputed(async_session, meal_id)
+        assert sum(total for _, total in rows["month"]) == 7
+
+        after = await repository.get_meal_portion_by_time(now.year, now.month)
+        assert after.year - before.year == 7
+        assert after.month - before.month == 7
+        assert after.last_day == now.date()
+
+    @pytest.mark.asyncio
+    async def test_rebuild_matches_write_through(self, async_session, rollup_meal):
+        meal_id, user_id = rollup_meal
+        repository = MealRepository(async_session)
+        for portions in (3, 5):
+            await repository.write_meal_logs(
+                meal_id=meal_id, user_id=user_id, portion_qty=portions
+            )
+        written = await stored(async_session, meal_id)
+
+        await async_session.execute(
+            delete(MealPortionDaily).where(MealPortionDaily.meal_id == meal_id)
+        )
+        await async_session.execute(
+            delete(MealPortionMonthly).where(MealPortionMonthly.meal_id == meal_id)
+        )
+        await async_session.commit()
+        await PortionRollupRepository(async_session).rebuild(datetime.now().date())
+
+        assert await stored(async_session, meal_id) == written
@@ -0,0 +1,127 @@
+from datetime import date, datetime
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete, event
+
+from app.api.controllers import MealController
+from app.api.models import Meal, MealLog, Role, User
+from app.api.repositories import IngredientRepository, MealRepository
+from app.api.schemas.report_schema import PortionSeriesQuery
+
+
+@pytest_asyncio.fixture
+async def series_logs(async_session):
+    suffix = uuid4().hex[:8]
+    role = Role(name=f"role-{suffix}")
+    meal = Meal(name=f"series-{suffix}")
+    async_session.add_all([role, meal])
+    await async_session.flush()
+    users = [
+        User(
+            first_name="Series",
+            last_name=str(i),
+            email=f"series-{suffix}-{i}@example.com",
+            password="-",
+            role_id=role.id,
+        )
+        for i in range(2)
+    ]
+    async_session.add_all(users)
+    await async_session.flush()
+    # served_at is UTC, Tashkent is five hours ahead
+    async_session.add_all(
+        MealLog(
+            meal_id=meal.id,
+            user_id=users[user].id,
+            portion_qty=portions,
+            served_at=served_at,
+        )
+        for served_at, user, portions in (
+            (datetime(2022, 12, 31, 20), 0, 1),
+            (datetime(2023, 1, 15, 10), 1, 2),
+            (datetime(2023, 1, 31, 19, 30), 0, 4),
+            (datetime(2023, 2, 1, 10), 1, 8),
+        )
+    )
+    await async_session.commit()
+    meal_id, user_ids = meal.id, [user.id for user in users]
+
+    yield user_ids
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+    await async_session.execute(delete(User).where(User.id.in_(user_ids)))
+    await async_session.execute(delete(Meal).where(Meal.id == meal_id))
+    await async_session.commit()
+
+
+def controller(session) -> MealController:
+    return MealController(MealRepository(session), IngredientRepository(session))
+
+
+class TestPortionSeries:
+    @pytest.mark.asyncio
+    async def test_local_day_buckets_in_one_query(self, async_session, series_logs):
+        connection = await async_session.connection()
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(connection.sync_engine, "before_cursor_execute", record)
+        try:
+            series = await controller(async_session).get_portion_series(
+                PortionSeriesQuery(
+                    date_from=date(2023, 1, 1),
+                    date_to=date(2023, 2, 1),
+                    timezone="Asia/Tashkent",
+                )
+            )
+        finally:
+            event.remove(connection.sync_engine, "before_cursor_execute", record)
+
+        assert len(statements) == 1
+        assert [(d.date.date(), d.total_portions) for d in series.daily] == [
+            (date(2023, 1, 1), 1),
+            (date(2023, 1, 15), 2),
+            (date(2023, 2, 1), 12),
+        ]
+        assert [(m.month, m.total_portions) for m in series.monthly] == [
+            (1, 3),
+            (2, 12),
+        ]
+        assert [(y.year, y.total_portions) for y in series.yearly] == [(2023, 15)]
+        assert series.total_portions == 15
+
+        utc = await controller(async_session).get_portion_series(
+            PortionSeriesQuery(
+                date_from=date(2023, 1, 1),
+                date_to=date(2023, 2, 1),
+                timezone="UTC",
+                granularity="month",
+            )
+        )
+        assert utc.daily == []
+        assert [(m.month, m.total_portions) for m in utc.monthly] == [(1, 6), (2, 8)]
+        assert utc.total_portions == 14
+
+    @pytest.mark.asyncio
+    async def test_breakdown_per_user(self, async_session, series_logs):
+        series = await controller(async_session).get_portion_series(
+            PortionSeriesQuery(
+                date_from=date(2023, 1, 1),
+                date_to=date(2023, 12, 31),
+                timezone="Asia/Tashkent",
+                granularity="year",
+                breakdown="user",
+            )
+        )
+        assert series.total_portions == 15
+        assert [(b.user_id, b.total_portions) for b in series.breakdown] == [
+            (series_logs[0], 5),
+            (series_logs[1], 10),
+        ]
+        assert [y.total_portions for y in series.breakdown[0].yearly] == [5]
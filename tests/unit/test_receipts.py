@@ -0,0 +1,151 @@
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import delete, event, select
+
+from app.api.controllers import IngredientController
+from app.api.models import Ingredient, IngredientTransaction, Unit
+from app.api.models.transactions import TransactionType
+from app.api.repositories import IngredientRepository, UnitRepository
+from app.api.schemas.ingredients_schemas import IngredientCreateSchema, ReceiptSchema
+from app.api.schemas.units_schemas import UnitCreateSchema
+
+
+@pytest_asyncio.fixture
+async def stock(async_session):
+    suffix = uuid4().hex[:8]
+    unit = await UnitRepository(async_session).create_unit(
+        UnitCreateSchema(code=suffix[:6])
+    )
+    repository = IngredientRepository(async_session)
+    ingredients = [
+        await repository.create_ingredient(
+            IngredientCreateSchema(
+                name=f"receipt-{suffix}-{i}", unit_id=unit.id, quantity=10
+            )
+        )
+        for i in range(3)
+    ]
+    unit_id = unit.id
+
+    yield [ingredient.id for ingredient in ingredients]
+
+    await async_session.rollback()
+    await async_session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+    await async_session.execute(delete(Unit).where(Unit.id == unit_id))
+    await async_session.commit()
+
+
+def controller(session) -> IngredientController:
+    return IngredientController(
+        ingredient_repository=IngredientRepository(session),
+        unit_repository=UnitRepository(session),
+    )
+
+
+async def quantities(session, ingredient_ids):
+    result = await session.execute(
+        select(Ingredient.quantity)
+        .where(Ingredient.id.in_(ingredient_ids))
+        .order_by(Ingredient.id)
+    )
+    return result.scalars().all()
+
+
+async def chunked(data: bytes, size: int = 7):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+class TestReceipts:
+    @pytest.mark.asyncio
+    async def test_bulk_receipt_is_additive(self, async_session, stock):
+        connection = await async_session.connection()
+        writes = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith(("UPDATE ingredients", "INSERT INTO ingredient_")):
+                writes.append(statement.split()[0])
+
+        event.listen(connection.sync_engine, "before_cursor_execute", record)
+        try:
+            receipt = await controller(async_session).receive_stock(
+                ReceiptSchema(
+                    note="INV-17",
+                    lines=[
+                        {"ingredient_id": stock[2], "quantity": 1.5},
+                        {"ingredient_id": stock[0], "quantity": 4},
+                        {"ingredient_id": stock[2], "quantity": 0.25},
+                    ],
+                )
+            )
+        finally:
+            event.remove(connection.sync_engine, "before_cursor_execute", record)
+
+        assert writes == ["UPDATE", "INSERT"]
+        assert receipt.total_lines == 3
+        assert [item.id for item in receipt.items] == [stock[0], stock[2]]
+        assert await quantities(async_session, stock) == [
+            Decimal("14.00"),
+            Decimal("10.00"),
+            Decimal("11.75"),
+        ]
+        ledger = await async_session.execute(
+            select(IngredientTransaction.ingredient_id, IngredientTransaction.quantity)
+            .where(
+                IngredientTransaction.note == "INV-17",
+                IngredientTransaction.transaction_type == TransactionType.IN,
+                IngredientTransaction.ingredient_id.in_(stock),
+            )
+            .order_by(IngredientTransaction.ingredient_id)
+        )
+        assert ledger.all() == [
+            (stock[0], Decimal("4.00")),
+            (stock[2], Decimal("1.75")),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_unknown_ingredient_changes_nothing(self, async_session, stock):
+        with pytest.raises(HTTPException) as error:
+            await controller(async_session).receive_stock(
+                ReceiptSchema(
+                    lines=[
+                        {"ingredient_id": stock[0], "quantity": 1},
+                        {"ingredient_id": -1, "quantity": 1},
+                    ]
+                )
+            )
+        assert error.value.status_code == 404
+        assert await quantities(async_session, stock) == [Decimal("10.00")] * 3
+
+    @pytest.mark.asyncio
+    async def test_csv_upload(self, async_session, stock):
+        body = (
+            "\ufeffingredient_id,quantity\r\n"
+            f"{stock[1]},2.5\r\n"
+            "\r\n"
+            f"{stock[0]},1\r\n"
+            f"{stock[1]},0.5"
+        ).encode()
+        receipt = await controller(async_session).receive_stock_csv(
+            chunked(body), note="INV-18"
+        )
+        assert receipt.total_lines == 3
+        assert await quantities(async_session, stock) == [
+            Decimal("11.00"),
+            Decimal("13.00"),
+            Decimal("10.00"),
+        ]
+
+        with pytest.raises(HTTPException) as error:
+            await controller(async_session).receive_stock_csv(
+                chunked(f"ingredient_id,quantity\n{stock[0]},-1\nx,2\n".encode())
+            )
+        assert error.value.status_code == 400
+        assert [message.split(",")[0] for message in error.value.detail["errors"]] == [
+            "line 2",
+            "line 3",
+        ]
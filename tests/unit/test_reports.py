@@ -0,0 +1,152 @@
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete
+
+from app.api.models import (
+    Ingredient,
+    IngredientTransaction,
+    Meal,
+    MealIngredient,
+    MealLog,
+    Report,
+    Role,
+    Unit,
+    User,
+)
+from app.api.models.transactions import TransactionType
+from app.api.repositories import PortionRollupRepository, ReportRepository
+from app.api.repositories.report_repository import difference_percentage
+
+MONTH = date(2024, 2, 1)
+
+
+@pytest_asyncio.fixture
+async def served_month(async_session):
+    suffix = uuid4().hex[:8]
+    role = Role(name=f"role-{suffix}")
+    unit = Unit(code=suffix[:6])
+    meal = Meal(name=f"report-{suffix}")
+    async_session.add_all([role, unit, meal])
+    await async_session.flush()
+    flour, salt = (
+        Ingredient(name=f"{name}-{suffix}", unit_id=unit.id, quantity=quantity)
+        for name, quantity in (("flour", 15), ("salt", 5))
+    )
+    user = User(
+        first_name="Report",
+        last_name=suffix,
+        email=f"report-{suffix}@example.com",
+        password="-",
+        role_id=role.id,
+    )
+    async_session.add_all([flour, salt, user])
+    await async_session.flush()
+    async_session.add_all(
+        [
+            MealIngredient(meal_id=meal.id, ingredient_id=flour.id, required_qty=2),
+            MealIngredient(meal_id=meal.id, ingredient_id=salt.id, required_qty=1),
+            *(
+                MealLog(
+                    meal_id=meal.id,
+                    user_id=user.id,
+                    portion_qty=portions,
+                    served_at=datetime(2024, 2, day, 12),
+                )
+                for day, portions in ((5, 4), (20, 6))
+            ),
+            # February opens empty and receives 40 flour and 15 salt; each
+            # serve takes its recipe use and 5 flour goes to waste. The salt,
+            # with no extra OUT, bounds the month to 15 portions
+            *(
+                IngredientTransaction(
+                    ingredient_id=ingredient.id,
+                    quantity=quantity,
+                    transaction_type=transaction_type,
+                    happened_at=datetime(2024, 2, day, 12),
+                )
+                for ingredient, quantity, transaction_type, day in (
+                    (flour, 40, TransactionType.IN, 3),
+                    (salt, 15, TransactionType.IN, 3),
+                    (flour, 8, TransactionType.OUT, 5),
+                    (salt, 4, TransactionType.OUT, 5),
+                    (flour, 5, TransactionType.OUT, 10),
+                    (flour, 12, TransactionType.OUT, 20),
+                    (salt, 6, TransactionType.OUT, 20),
+                )
+            ),
+        ]
+    )
+    await async_session.commit()
+    await PortionRollupRepository(async_session).rebuild(MONTH)
+    ids = meal.id, user.id, unit.id
+
+    yield ids
+
+    # the roles fixture recreates roles and other tests compare all meals
+    meal_id, user_id, unit_id = ids
+    await async_session.rollback()
+    await async_session.execute(delete(Report).where(Report.report_year == 2024))
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id == meal_id))
+    await async_session.execute(delete(User).where(User.id == user_id))
+    await async_session.execute(delete(Meal).where(Meal.id == meal_id))
+    await async_session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+    await async_session.execute(delete(Unit).where(Unit.id == unit_id))
+    await async_session.commit()
+
+
+class TestMonthlyReports:
+    @pytest.mark.asyncio
+    async def test_generates_each_month_once(self, async_session, served_month):
+        repository = ReportRepository(async_session)
+
+        reports = await repository.generate_reports(until=date(2024, 4, 1), since=MONTH)
+        assert [(r.report_year, r.report_month) for r in reports] == [
+            (2024, 2),
+            (2024, 3),
+        ]
+        february = await repository.get_report(2024, 2)
+        assert february.total_served_portions == 10
+        assert february.possible_served_portions == 15
+        assert february.difference_percentage == Decimal("33.33")
+        march = await repository.get_report(2024, 3)
+        assert march.total_served_portions == march.possible_served_portions == 0
+
+        # the current month is incomplete and stored months are skipped
+        assert (
+            await repository.generate_reports(until=date(2024, 4, 20), since=MONTH)
+            == []
+        )
+        assert len(await repository.get_reports(year=2024)) == 2
+
+    @pytest.mark.asyncio
+    async def test_skips_months_before_the_ledger(self, async_session, served_month):
+        meal_id, user_id, _ = served_month
+        # January was served before the ledger recorded any OUT rows
+        async_session.add(
+            MealLog(
+                meal_id=meal_id,
+                user_id=user_id,
+                portion_qty=5,
+                served_at=datetime(2024, 1, 15, 12),
+            )
+        )
+        await async_session.commit()
+        repository = ReportRepository(async_session)
+        await PortionRollupRepository(async_session).rebuild(date(2024, 1, 1))
+        assert await repository.served_portions(date(2024, 1, 1)) == 5
+
+        reports = await repository.generate_reports(
+            until=date(2024, 3, 1), since=date(2024, 1, 1)
+        )
+        assert [(r.report_year, r.report_month) for r in reports] == [(2024, 2)]
+        assert await repository.get_report(2024, 1) is None
+
+    def test_difference_percentage(self):
+        assert difference_percentage(10, 0) == Decimal("0.00")
+        assert difference_percentage(10, 10) == Decimal("0.00")
+        assert difference_percentage(1, 3) == Decimal("66.67")
+        assert difference_percentage(5000, 1) == Decimal("-999.99")
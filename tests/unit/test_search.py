@@ -0,0 +1,101 @@
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.models import Role, User
+from app.api.repositories import (
+    IngredientRepository,
+    MealRepository,
+    PortionCalculationRepository,
+    UnitRepository,
+    UserRepository,
+)
+from app.api.schemas.ingredients_schemas import (
+    IngredientCreateSchema,
+    IngredientListQuery,
+)
+from app.api.schemas.meal_schemas import MealCreateSchema
+from app.api.schemas.portion_calculation_schema import PortionCalculationQuery
+from app.api.schemas.units_schemas import UnitCreateSchema
+from app.api.schemas.users_schemas import UserListQuery
+
+
+class TestSearch:
+    @pytest.mark.asyncio
+    async def test_relevance_sort(self, async_session):
+        suffix = uuid4().hex[:8]
+        unit = await UnitRepository(async_session).create_unit(
+            UnitCreateSchema(code=suffix[:6])
+        )
+        repository = IngredientRepository(async_session)
+        inside = await repository.create_ingredient(
+            IngredientCreateSchema(name=f"salt q{suffix}", unit_id=unit.id)
+        )
+        leading = await repository.create_ingredient(
+            IngredientCreateSchema(name=f"q{suffix} salt", unit_id=unit.id)
+        )
+
+        by_id = await repository.get_all_ingredients(
+            IngredientListQuery(search=f"q{suffix}")
+        )
+        ranked = await repository.get_all_ingredients(
+            IngredientListQuery(search=f"q{suffix}", sort="relevance")
+        )
+        assert [i.id for i in by_id.items] == [inside.id, leading.id]
+        assert [i.id for i in ranked.items] == [leading.id, inside.id]
+        assert ranked.total == 2
+        assert ranked.next_cursor is None
+
+        first = await repository.get_all_ingredients(
+            IngredientListQuery(search=f"q{suffix}", size=1)
+        )
+        with pytest.raises(HTTPException) as error:
+            await repository.get_all_ingredients(
+                IngredientListQuery(
+                    search=f"q{suffix}", sort="relevance", cursor=first.next_cursor
+                )
+            )
+        assert error.value.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_full_name_search(self, async_session):
+        suffix = uuid4().hex[:8]
+        role = Role(name=f"role-{suffix}")
+        async_session.add(role)
+        await async_session.flush()
+        user = User(
+            first_name=f"Dilnoza{suffix}",
+            last_name=f"Karimova{suffix}",
+            email=f"search-{suffix}@example.com",
+            password="-",
+            role_id=role.id,
+        )
+        async_session.add(user)
+        await async_session.commit()
+
+        try:
+            page = await UserRepository(async_session).get_all_users(
+                UserListQuery(search=f"dilnoza{suffix} karim")
+            )
+            assert [u.id for u in page.items] == [user.id]
+        finally:
+            # the roles fixture recreates roles before every test
+            await async_session.delete(user)
+            await async_session.commit()
+
+    @pytest.mark.asyncio
+    async def test_portion_search_matches_words(self, async_session):
+        suffix = uuid4().hex[:8]
+        meals = MealRepository(async_session)
+        meal = await meals.create_meal(MealCreateSchema(name=f"q{suffix} plov"))
+
+        try:
+            rows = await PortionCalculationRepository(async_session).list_portions(
+                PortionCalculationQuery(search=f"plov q{suffix}")
+            )
+            assert [(m.id, count) for m, count in rows] == [(meal.id, 0)]
+        finally:
+            # other tests compare all meals
+            await async_session.delete(meal)
+            await async_session.commit()
@@ -0,0 +1,247 @@
+import asyncio
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.controllers import MealController
+from app.api.models import (
+    Ingredient,
+    IngredientTransaction,
+    Meal,
+    MealIngredient,
+    MealLog,
+    Role,
+    Unit,
+    User,
+)
+from app.api.models.transactions import TransactionType
+from app.api.repositories import IngredientRepository, MealRepository, UnitRepository
+from app.api.schemas.ingredients_schemas import IngredientCreateSchema
+from app.api.schemas.meal_schemas import MealServeBatchSchema, PortionQty
+from app.api.schemas.units_schemas import UnitCreateSchema
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+@pytest_asyncio.fixture
+async def session_maker():
+    # one connection per concurrent serve, as separate requests would have
+    engine = create_async_engine(
+        "postgresql+asyncpg://" + settings.get_test_database_url, pool_size=10
+    )
+    yield async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def pantry(async_session):
+    suffix = uuid4().hex[:8]
+    unit = await UnitRepository(async_session).create_unit(
+        UnitCreateSchema(code=suffix[:6])
+    )
+    repository = IngredientRepository(async_session)
+    rice, salt = [
+        await repository.create_ingredient(
+            IngredientCreateSchema(
+                name=f"{name}-{suffix}", unit_id=unit.id, quantity=quantity
+            )
+        )
+        for name, quantity in (("rice", 50), ("salt", 20))
+    ]
+    role = Role(name=f"role-{suffix}")
+    meals = [Meal(name=f"serving-{suffix}-{i}") for i in range(2)]
+    async_session.add_all([role, *meals])
+    await async_session.flush()
+    user = User(
+        first_name="Serving",
+        last_name=suffix,
+        email=f"serving-{suffix}@example.com",
+        password="-",
+        role_id=role.id,
+    )
+    async_session.add_all(
+        [
+            user,
+            MealIngredient(meal_id=meals[0].id, ingredient_id=rice.id, required_qty=2),
+            MealIngredient(meal_id=meals[0].id, ingredient_id=salt.id, required_qty=1),
+            MealIngredient(
+                meal_id=meals[1].id, ingredient_id=rice.id, required_qty=Decimal("1.5")
+            ),
+        ]
+    )
+    await async_session.commit()
+    meal_ids, user_id, unit_id = [meal.id for meal in meals], user.id, unit.id
+
+    yield meal_ids, user_id, rice.id, salt.id
+
+    # the roles fixture recreates roles and other tests compare all meals
+    await async_session.rollback()
+    await async_session.execute(delete(MealLog).where(MealLog.meal_id.in_(meal_ids)))
+    await async_session.execute(delete(User).where(User.id == user_id))
+    await async_session.execute(delete(Meal).where(Meal.id.in_(meal_ids)))
+    await async_session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+    await async_session.execute(delete(Unit).where(Unit.id == unit_id))
+    await async_session.commit()
+
+
+async def stock(session, *ingredient_ids) -> list[Decimal]:
+    session.expire_all()
+    result = await session.execute(
+        select(Ingredient.quantity)
+        .where(Ingredient.id.in_(ingredient_ids))
+        .order_by(Ingredient.id)
+    )
+    return list(result.scalars())
+
+
+async def logs(session, meal_ids) -> int:
+    result = await session.execute(
+        select(func.count()).where(MealLog.meal_id.in_(meal_ids))
+    )
+    return result.scalar_one()
+
+
+class TestServeMeal:
+    @pytest.mark.asyncio
+    async def test_decrements_every_ingredient(self, async_session, pantry):
+        meal_ids, user_id, rice_id, salt_id = pantry
+        ingredients = await MealRepository(async_session).serve_meal(
+            meal_id=meal_ids[0],
+            user_id=user_id,
+            portion_qty=3,
+            required={rice_id: 6, salt_id: 3},
+        )
+        assert [(i.id, i.quantity) for i in ingredients] == [
+            (rice_id, Decimal("44")),
+            (salt_id, Decimal("17")),
+        ]
+        assert await stock(async_session, rice_id, salt_id) == [44, 17]
+        assert await logs(async_session, meal_ids) == 1
+
+    @pytest.mark.asyncio
+    async def test_insufficient_stock_conflicts(self, async_session, pantry):
+        meal_ids, user_id, rice_id, salt_id = pantry
+        with pytest.raises(HTTPException) as error:
+            await MealRepository(async_session).serve_meal(
+                meal_id=meal_ids[0],
+                user_id=user_id,
+                portion_qty=25,
+                required={rice_id: 50, salt_id: 25},
+            )
+        assert error.value.status_code == 409
+        # rice alone had enough, but nothing is taken unless everything is
+        assert await stock(async_session, rice_id, salt_id) == [50, 20]
+        assert await logs(async_session, meal_ids) == 0
+
+
+class TestServeBatch:
+    @pytest.mark.asyncio
+    async def test_short_line_serves_nothing(self, async_session, pantry):
+        meal_ids, user_id, rice_id, salt_id = pantry
+        controller = MealController(
+            MealRepository(async_session), IngredientRepository(async_session)
+        )
+        # 10 rice for the first meal and 45 for the second: 55 of 50
+        payload = MealServeBatchSchema(
+            items=[
+                {"meal_id": meal_ids[0], "portion_qty": 5},
+                {"meal_id": meal_ids[1], "portion_qty": 30},
+            ]
+        )
+        with pytest.raises(HTTPException) as error:
+            await controller.serve_meals(user_id, payload)
+
+        assert error.value.status_code == 400
+        shortfalls = error.value.detail["shortfalls"]
+        assert [
+            (row["meal_id"], row["ingredient_id"], row["required_qty"])
+            for row in shortfalls
+        ] == [(meal_ids[0], rice_id, 10), (meal_ids[1], rice_id, 45)]
+        assert all(
+            row["total_required_qty"] == 55 and row["available_qty"] == 50
+            for row in shortfalls
+        )
+        assert await stock(async_session, rice_id, salt_id) == [50, 20]
+        assert await logs(async_session, meal_ids) == 0
+        withdrawals = await async_session.execute(
+            select(func.count()).where(
+                IngredientTransaction.ingredient_id.in_([rice_id, salt_id]),
+                IngredientTransaction.transaction_type == TransactionType.OUT,
+            )
+        )
+        assert withdrawals.scalar_one() == 0
+
+    @pytest.mark.asyncio
+    async def test_conflict_rolls_back_every_line(self, async_session, pantry):
+        meal_ids, user_id, rice_id, salt_id = pantry
+        # stock moved after the check: the salt line no longer fits
+        with pytest.raises(HTTPException) as error:
+            await MealRepository(async_session).serve_meals(
+                user_id=user_id,
+                portions={meal_ids[0]: 25, meal_ids[1]: 2},
+                required={
+                    meal_ids[0]: {rice_id: 10, salt_id: 25},
+                    meal_ids[1]: {rice_id: 3},
+                },
+            )
+        assert error.value.status_code == 409
+        assert await stock(async_session, rice_id, salt_id) == [50, 20]
+        assert await logs(async_session, meal_ids) == 0
+
+
+class TestConcurrentServes:
+    async def serve_all(self, session_maker, serve, count: int) -> list[bool]:
+        async def attempt() -> bool:
+            async with session_maker() as session:
+                try:
+                    await serve(session)
+                except HTTPException as error:
+                    assert error.status_code in (400, 409)
+                    return False
+                return True
+
+        return await asyncio.gather(*(attempt() for _ in range(count)))
+
+    @pytest.mark.asyncio
+    async def test_locked_serves_never_overdraw(
+        self, async_session, session_maker, pantry
+    ):
+        meal_ids, user_id, rice_id, salt_id = pantry
+
+        async def serve(session):
+            controller = MealController(
+                MealRepository(session), IngredientRepository(session)
+            )
+            await controller.serve_meal(user_id, meal_ids[0], PortionQty(portion_qty=3))
+
+        served = await self.serve_all(session_maker, serve, 10)
+        # 20 salt covers six serves of three portions
+        assert served.count(True) == 6
+        assert await stock(async_session, rice_id, salt_id) == [50 - 6 * 6, 2]
+        assert await logs(async_session, meal_ids) == served.count(True)
+
+    @pytest.mark.asyncio
+    async def test_conditional_update_alone_never_overdraws(
+        self, async_session, session_maker, pantry
+    ):
+        meal_ids, user_id, rice_id, salt_id = pantry
+
+        async def serve(session):
+            await MealRepository(session).serve_meal(
+                meal_id=meal_ids[0],
+                user_id=user_id,
+                portion_qty=3,
+                required={rice_id: 6, salt_id: 3},
+            )
+
+        served = await self.serve_all(session_maker, serve, 10)
+        rice, salt = await stock(async_session, rice_id, salt_id)
+        assert served.count(True) == 6
+        assert (rice, salt) == (50 - 6 * 6, 2)
+        assert await logs(async_session, meal_ids) == served.count(True)
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import delete
+
+from app.api.models import Ingredient, IngredientSnapshot, IngredientTransaction, Unit
+from app.api.models.transactions import TransactionType
+from app.api.repositories import StockSnapshotRepository
+
+START = datetime(2020, 5, 1)
+
+
+@pytest_asyncio.fixture
+async def history(async_session):
+    suffix = uuid4().hex[:8]
+    unit = Unit(code=suffix[:6])
+    async_session.add(unit)
+    await async_session.flush()
+    ingredients = [
+        Ingredient(name=f"state-{suffix}-{i}", unit_id=unit.id) for i in range(3)
+    ]
+    async_session.add_all(ingredients)
+    await async_session.flush()
+
+    rng = np.random.default_rng(17)
+    movements, stock = [], {ingredient.id: Decimal(0) for ingredient in ingredients}
+    for minutes in np.sort(rng.integers(0, 10 * 24 * 60, 80)):
+        ingredient = ingredients[rng.integers(len(ingredients))]
+        quantity = Decimal(int(rng.integers(1, 5000))) / 100
+        kind = TransactionType.IN
+        if stock[ingredient.id] >= quantity and rng.random() < 0.6:
+            kind = TransactionType.OUT
+        stock[ingredient.id] += quantity if kind == TransactionType.IN else -quantity
+        movements.append(
+            IngredientTransaction(
+                ingredient_id=ingredient.id,
+                quantity=quantity,
+                transaction_type=kind,
+                happened_at=START + timedelta(minutes=int(minutes)),
+            )
+        )
+    async_session.add_all(movements)
+    for ingredient in ingredients:
+        ingredient.quantity = stock[ingredient.id]
+    await async_session.commit()
+    unit_id = unit.id
+
+    yield [
+        (m.ingredient_id, m.transaction_type, m.quantity, m.happened_at)
+        for m in movements
+    ]
+
+    await async_session.rollback()
+    await async_session.execute(
+        delete(IngredientSnapshot).where(
+            IngredientSnapshot.taken_at < START + timedelta(days=30)
+        )
+    )
+    await async_session.execute(delete(Ingredient).where(Ingredient.unit_id == unit_id))
+    await async_session.execute(delete(Unit).where(Unit.id == unit_id))
+    await async_session.commit()
+
+
+def full_replay(movements, at):
+    stock = {ingredient_id: Decimal(0) for ingredient_id, *_ in movements}
+    for ingredient_id, kind, quantity, happened_at in movements:
+        if happened_at < at:
+            stock[ingredient_id] += (
+                quantity if kind == TransactionType.IN else -quantity
+            )
+    return stock
+
+
+async def state(repository, movements, at):
+    result = await repository.get_state(at)
+    stock = {
+        int(ingredient_id): Decimal(int(amount)) / 100
+        for ingredient_id, amount in zip(result.ingredient_ids, result.cents)
+    }
+    return result.snapshot_at, {key: stock[key] for key in full_replay(movements, at)}
+
+
+class TestStockState:
+    @pytest.mark.asyncio
+    async def test_matches_full_replay(self, async_session, history):
+        repository = StockSnapshotRepository(async_session)
+        points = [START + timedelta(hours=hours) for hours in range(-5, 11 * 24, 17)]
+
+        for at in points:
+            snapshot_at, stock = await state(repository, history, at)
+            assert snapshot_at is None
+            assert stock == full_replay(history, at)
+
+        snapshots = [START + timedelta(days=3), START + timedelta(days=7)]
+        for taken_at in snapshots:
+            await repository.take_snapshot(taken_at)
+
+        for at in points:
+            snapshot_at, stock = await state(repository, history, at)
+            assert stock == full_replay(history, at)
+            nearest = [taken_at for taken_at in snapshots if taken_at <= at]
+            assert snapshot_at == (nearest[-1] if nearest else snapshots[0])
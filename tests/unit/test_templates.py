@@ -0,0 +1,66 @@
+from email import message_from_bytes, policy
+
+from app.api.tasks.messages import (
+    TEMPLATES,
+    get_template,
+    register_template,
+    warnings_message,
+)
+from app.api.tasks.templates import CompiledTemplate, MailTemplate, html_to_text
+
+
+def parse(data: bytes):
+    return message_from_bytes(data, policy=policy.default)
+
+
+class TestTemplates:
+    def test_compiled_template_renders_segments(self):
+        template = CompiledTemplate("Hi {{NAME}},\n{{CODE}} is yours")
+        assert template.placeholders == {"NAME", "CODE"}
+        assert (
+            template.render({"NAME": b"Ann", "CODE": b"42"})
+            == b"Hi Ann,\r\n42 is yours"
+        )
+
+    def test_text_alternative_skips_markup(self):
+        text = html_to_text(
+            "<html><head><style>p {}</style></head>"
+            "<body><p>Hello</p><p>Low: <b>rice</b></p></body></html>"
+        )
+        assert text == "Hello\n\nLow: rice\n"
+
+    def test_message_has_both_alternatives(self):
+        message = parse(warnings_message("chef@example.com", ["rice", "salt"]).data)
+        assert message["To"] == "chef@example.com"
+        assert message["Subject"] == "⚠️ Low Stock Alert: 2 ingredients"
+        assert [part.get_content_type() for part in message.iter_parts()] == [
+            "text/plain",
+            "text/html",
+        ]
+        assert "rice,\r\nsalt" in message.get_body(("plain",)).get_content()
+
+    def test_values_are_escaped_in_html_only(self):
+        message = parse(warnings_message("chef@example.com", ["<salt & pepper>"]).data)
+        assert "<salt & pepper>" in message.get_body(("plain",)).get_content()
+        html = message.get_body(("html",)).get_content()
+        assert "&lt;salt &amp; pepper&gt;" in html
+        assert "<salt" not in html
+
+    def test_values_cannot_inject_headers(self):
+        template = MailTemplate("Hi {{NAME}}", "<p>{{NAME}}</p>")
+        mail = template.render("a@example.com", "b@example.com", NAME="x\nBcc: c@x")
+        message = parse(mail.data)
+        assert message["Bcc"] is None
+        assert message["Subject"] == "Hi x Bcc: c@x"
+
+    def test_locale_variant_and_fallback(self):
+        register_template(
+            "warnings", "uz", MailTemplate("Kam qoldi: {{SUMMARY}}", "{{PRODUCT_NAME}}")
+        )
+        try:
+            assert get_template("warnings", "uz") is TEMPLATES[("warnings", "uz")]
+            assert get_template("warnings", "fr") is TEMPLATES[("warnings", "en")]
+            message = parse(warnings_message("chef@example.com", ["guruch"], "uz").data)
+            assert message["Subject"] == "Kam qoldi: guruch"
+        finally:
+            del TEMPLATES[("warnings", "uz")]
@@ -0,0 +1,166 @@
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+import pytest_asyncio
+from fakeredis import FakeAsyncRedis
+from fakeredis.aioredis import FakeBaseAsyncConnection
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+
+from app.api.models import Role, User, UserOTP
+from app.api.repositories import RedisOtpRepository, UserOtpRepository
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+@pytest_asyncio.fixture
+async def redis():
+    client = FakeAsyncRedis(decode_responses=True)
+    yield client
+    await client.flushall()
+    await client.aclose()
+
+
+@pytest.fixture
+def round_trips(monkeypatch):
+    # every reply yields to the event loop, as a network round trip would, so
+    # concurrent checks interleave between their commands
+    read_response = FakeBaseAsyncConnection.read_response
+
+    async def yielding(self, *args, **kwargs):
+        await asyncio.sleep(0)
+        return await read_response(self, *args, **kwargs)
+
+    monkeypatch.setattr(FakeBaseAsyncConnection, "read_response", yielding)
+
+
+@pytest_asyncio.fixture
+async def user_id(async_session):
+    role_id = await async_session.scalar(select(Role.id).limit(1))
+    user = User(
+        first_name="Otp",
+        last_name="User",
+        email=f"otp-{uuid4().hex[:8]}@example.com",
+        password="-",
+        role_id=role_id,
+    )
+    async_session.add(user)
+    await async_session.commit()
+    user_id = user.id
+    yield user_id
+    await async_session.rollback()
+    await async_session.execute(delete(User).where(User.id == user_id))
+    await async_session.commit()
+
+
+class TestRedisOtpRepository:
+    @pytest.mark.asyncio
+    async def test_code_expires_with_ttl(self, redis):
+        repository = RedisOtpRepository(redis)
+        await repository.create_user_otp(1, 123456)
+        assert await repository.get_user_otp_by_user_id(1) == 123456
+        ttl = await redis.ttl(RedisOtpRepository.key(1))
+        assert 0 < ttl <= settings.OTP_TTL
+
+    @pytest.mark.asyncio
+    async def test_code_is_used_once(self, redis, round_trips):
+        repository = RedisOtpRepository(redis)
+        await repository.create_user_otp(1, 123456)
+        results = await asyncio.gather(
+            *(repository.check_user_otp(1, 123456) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert results.count(True) == 1
+        assert all(
+            isinstance(result, HTTPException) and result.status_code == 404
+            for result in results
+            if result is not True
+        )
+
+    @pytest.mark.asyncio
+    async def test_wrong_guesses_never_hide_the_code(self, redis, round_trips):
+        repository = RedisOtpRepository(redis)
+        await repository.create_user_otp(1, 123456)
+        results = await asyncio.gather(
+            repository.check_user_otp(1, 111111),
+            repository.check_user_otp(1, 123456),
+            repository.check_user_otp(1, 222222),
+            return_exceptions=True,
+        )
+        assert results[1] is True
+        assert all(
+            isinstance(result, HTTPException) for result in (results[0], results[2])
+        )
+
+    @pytest.mark.asyncio
+    async def test_wrong_guesses_burn_the_code(self, redis):
+        repository = RedisOtpRepository(redis)
+        await repository.create_user_otp(1, 123456)
+        for _ in range(settings.OTP_ATTEMPT_LIMIT - 1):
+            with pytest.raises(HTTPException) as error:
+                await repository.check_user_otp(1, 111111)
+            assert error.value.status_code == 400
+        # the right code still works until the limit is reached
+        assert await repository.get_user_otp_by_user_id(1) == 123456
+        with pytest.raises(HTTPException):
+            await repository.check_user_otp(1, 111111)
+        with pytest.raises(HTTPException) as error:
+            await repository.check_user_otp(1, 123456)
+        assert error.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_resend_is_rate_limited(self, redis):
+        repository = RedisOtpRepository(redis)
+        for code in range(settings.OTP_SEND_LIMIT):
+            await repository.create_user_otp(1, 100000 + code)
+        with pytest.raises(HTTPException) as error:
+            await repository.create_user_otp(1, 999999)
+        assert error.value.status_code == 429
+        # only the last code sent is valid
+        assert await repository.get_user_otp_by_user_id(1) == 100000 + code
+        await repository.create_user_otp(2, 123456)
+
+
+class TestUserOtpRepository:
+    @pytest.mark.asyncio
+    async def test_create_replaces_previous_code(self, async_session, user_id):
+        repository = UserOtpRepository(async_session)
+        await repository.create_user_otp(user_id, 111111)
+        await repository.create_user_otp(user_id, 222222)
+        codes = await async_session.scalars(
+            select(UserOTP.otp_code).where(UserOTP.user_id == user_id)
+        )
+        assert codes.all() == [222222]
+        with pytest.raises(HTTPException) as error:
+            await repository.check_user_otp(user_id, 111111)
+        assert error.value.status_code == 400
+        assert await repository.check_user_otp(user_id, 222222) is True
+        with pytest.raises(HTTPException) as error:
+            await repository.check_user_otp(user_id, 222222)
+        assert error.value.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_expired_code_is_rejected(self, async_session, user_id):
+        repository = UserOtpRepository(async_session)
+        async_session.add(
+            UserOTP(
+                user_id=user_id,
+                otp_code=123456,
+                expires_at=datetime.now() - timedelta(seconds=1),
+            )
+        )
+        await async_session.commit()
+        assert await repository.get_user_otp_by_user_id(user_id) is None
+        with pytest.raises(HTTPException) as error:
+            await repository.check_user_otp(user_id, 123456)
+        assert error.value.status_code == 404
+
+    def test_expiry_follows_the_ttl_setting(self, monkeypatch):
+        monkeypatch.setattr(settings, "OTP_TTL", 60)
+        started = datetime.now()
+        expires_at = UserOTP.__table__.c.expires_at.default.arg(None)
+        assert started + timedelta(seconds=60) <= expires_at
+        assert expires_at <= datetime.now() + timedelta(seconds=60)
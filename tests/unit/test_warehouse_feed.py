@@ -0,0 +1,111 @@
+import asyncio
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.models import Ingredient, Unit
+from app.api.repositories import IngredientRepository, UnitRepository
+from app.api.schemas.ingredients_schemas import IngredientCreateSchema
+from app.api.schemas.units_schemas import UnitCreateSchema
+from app.api.websocket.hub import WarehouseHub
+from app.core.databases.listener import ChannelListener
+from app.core.settings import get_settings
+
+settings = get_settings()
+
+
+class TestWarehouseFeed:
+    def test_slow_client_is_dropped(self):
+        hub = WarehouseHub(queue_size=2)
+        slow = hub.subscribe("state")
+        other = hub.subscribe("warnings")
+        message = {"type": "diff", "changed": [], "removed": [1]}
+
+        hub.publish("state", message)
+        assert not slow.dropped.is_set()
+        hub.publish("state", message)
+        assert slow.dropped.is_set()
+        assert not other.dropped.is_set()
+        assert hub.subscribers == 1
+
+    def test_listener_must_handle(self):
+        class Forgetful(ChannelListener):
+            pass
+
+        # caught when constructed rather than on the first NOTIFY
+        with pytest.raises(TypeError):
+            Forgetful("channel")
+
+    def test_diff(self):
+        previous = {1: {"id": 1, "quantity": 5}, 2: {"id": 2, "quantity": 1}}
+        current = {1: {"id": 1, "quantity": 4}, 3: {"id": 3, "quantity": 0}}
+        assert WarehouseHub.diff(previous, previous) is None
+        assert WarehouseHub.diff(previous, current) == {
+            "type": "diff",
+            "changed": [current[1], current[3]],
+            "removed": [2],
+        }
+
+    @pytest.mark.asyncio
+    async def test_commits_are_broadcast(self, async_session):
+        engine = create_async_engine(
+            "postgresql+asyncpg://" + settings.get_test_database_url
+        )
+        session_maker = async_sessionmaker(
+            bind=engine, autoflush=False, expire_on_commit=False
+        )
+        refreshes = 0
+
+        @asynccontextmanager
+        async def session_factory():
+            nonlocal refreshes
+            refreshes += 1
+            async with session_maker() as session:
+                yield session
+
+        hub = WarehouseHub(
+            dsn="postgresql://" + settings.get_test_database_url,
+            session_factory=session_factory,
+        )
+        suffix = uuid4().hex[:6]
+        unit = await UnitRepository(async_session).create_unit(
+            UnitCreateSchema(code=suffix)
+        )
+        await hub.start()
+        try:
+            await asyncio.wait_for(hub.wait_ready(), 5)
+            state = hub.subscribe("state")
+            warnings = hub.subscribe("warnings")
+            await state.queue.get()
+            await warnings.queue.get()
+            before = refreshes
+
+            repository = IngredientRepository(async_session)
+            ingredient = await repository.create_ingredient(
+                IngredientCreateSchema(
+                    name=f"feed {suffix}", unit_id=unit.id, quantity=5, min_threshold=2
+                )
+            )
+            message = await asyncio.wait_for(state.queue.get(), 5)
+            assert [row["id"] for row in message["changed"]] == [ingredient.id]
+            assert warnings.queue.empty()
+            # one refresh for the create and its ledger entry
+            assert refreshes == before + 1
+
+            await repository.take_stock(ingredient.id, 4)
+            message = await asyncio.wait_for(warnings.queue.get(), 5)
+            assert message["changed"][0]["quantity"] == 1
+            message = await asyncio.wait_for(state.queue.get(), 5)
+            assert message["changed"][0]["quantity"] == 1
+        finally:
+            await hub.stop()
+            await engine.dispose()
+            await async_session.rollback()
+            await async_session.execute(
+                delete(Ingredient).where(Ingredient.unit_id == unit.id)
+            )
+            await async_session.execute(delete(Unit).where(Unit.id == unit.id))
+            await async_session.commit()